@@ -0,0 +1,77 @@
+# Benchmark e paridade dos backends de parse das listagens da OA: BeautifulSoup (referência) contra lxml
+#
+# Uso: python benchmarks/bench_backends.py [PAGINAS ...] [--repeticoes 10]
+#
+# PAGINAS são ficheiros .html guardados (p.ex. os error_page_*.html) ou pastas com eles. Sem páginas,
+# usa as páginas sintéticas do bench_parse.py. Para cada tipo de registo, confirma página a página que os
+# dois backends devolvem os mesmos registos e o mesmo botão 'Próximo', e mede páginas/segundo do
+# _extrair_pagina completo (parse do HTML + seleção dos resultados + extração). Termina com código 1 se
+# algum resultado for diferente.
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from bench_parse import ler_paginas, paginas_sinteticas  # noqa: E402
+
+TIPOS = ('advogado', 'sociedade', 'estagiario')
+
+
+def resultado_comparavel(resultado):
+    if resultado is None:
+        return None
+    registos, tem_seguinte = resultado
+    return [registo.como_dict() for registo in registos], tem_seguinte
+
+
+def diferencas(paginas, tipo):
+    diferentes = 0
+    for numero, html in enumerate(paginas, 1):
+        referencia = resultado_comparavel(
+            main._extrair_pagina(html, main.CSS_RESULTADOS_OA, '', tipo, parser='bs4'))
+        rapido = resultado_comparavel(main._extrair_pagina(html, main.CSS_RESULTADOS_OA, '', tipo, parser='lxml'))
+        if referencia != rapido:
+            diferentes += 1
+            print(f"  ✗ página {numero} ({tipo}): resultados diferentes entre bs4 e lxml", file=sys.__stdout__)
+    return diferentes
+
+
+def medir(parser, paginas, tipo, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for html in paginas:
+            main._extrair_pagina(html, main.CSS_RESULTADOS_OA, '', tipo, parser=parser)
+    return len(paginas) * repeticoes / (time.perf_counter() - inicio)
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark e paridade dos backends de parse das listagens da OA")
+    parser.add_argument('paginas', nargs='*', help="Ficheiros .html ou pastas com páginas de resultados guardadas")
+    parser.add_argument('--repeticoes', type=int, default=10)
+    args = parser.parse_args()
+
+    paginas = ler_paginas(args.paginas) if args.paginas else paginas_sinteticas()
+    print(f"{len(paginas)} páginas")
+
+    total_diferentes = 0
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        for tipo in TIPOS:
+            diferentes = diferencas(paginas, tipo)
+            total_diferentes += diferentes
+            bs4 = medir('bs4', paginas, tipo, args.repeticoes)
+            lxml = medir('lxml', paginas, tipo, args.repeticoes)
+            print(f"{tipo:<12} bs4 {bs4:>8,.1f} páginas/s   lxml {lxml:>8,.1f} páginas/s   "
+                  f"({lxml / bs4:.1f}x)   páginas diferentes: {diferentes}", file=sys.__stdout__)
+
+    if total_diferentes:
+        print(f"❌ {total_diferentes} páginas com resultados diferentes entre os backends")
+        sys.exit(1)
+    print("✅ Os dois backends produzem os mesmos registos em todas as páginas")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,89 @@
+# Micro-benchmark do caminho de inserção: linhas/segundo antes e depois do rastreio por amostragem
+#
+# Uso: python benchmarks/bench_insercao.py [--linhas 20000] [--amostragem 0]
+#
+# Não precisa de base de dados: a conexão é substituída por uma conexão nula, para medir apenas
+# o custo do Python (montagem da query, logging, print e commit por linha).
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+class CursorNulo:
+    def execute(self, query, dados):
+        pass
+
+    def executemany(self, query, linhas):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConexaoNula:
+    def cursor(self):
+        return CursorNulo()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+
+# Versão anterior de inserir_advogado: formata a query para o log e para o stdout em cada linha
+def inserir_advogado_antigo(conexao, nome, cedula, conselho_regional, morada, estado_text, email='N/D',
+                            site='N/D', tipo='N/D', localidade='N/D', codigo_postal='N/D', telefone='N/D',
+                            data_inscricao='N/D', fax='N/D'):
+    cursor = conexao.cursor()
+    query = """
+        INSERT INTO advogados (name, cedula, conselho, morada, estado, email, site, tipo, localidade, codigo_postal, telefone, data_inscricao, fax)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    dados = tuple(str(v or 'N/D') for v in (nome, cedula, conselho_regional, morada, estado_text, email, site,
+                                            tipo, localidade, codigo_postal, telefone, data_inscricao, fax))
+    logging.info(f"Executando query: {query % dados}")
+    print(f"Executando query: {query % dados}")
+    cursor.execute(query, dados)
+    conexao.commit()
+    cursor.close()
+
+
+def medir(nome, func, conexao, linhas):
+    inicio = time.perf_counter()
+    for i in range(linhas):
+        func(conexao, f"Advogado {i}", f"{i}L", 'Lisboa', 'Rua Exemplo, 1', 'Ativo',
+             email=f"adv{i}@exemplo.pt", localidade='Lisboa', codigo_postal='1000-001', telefone='210000000')
+    if isinstance(conexao, main.EscritorEmLote):
+        conexao.flush()
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<45} {linhas / duracao:>12,.0f} linhas/s", file=sys.__stdout__)
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Micro-benchmark do caminho de inserção")
+    parser.add_argument('--linhas', type=int, default=20000)
+    parser.add_argument('--amostragem', type=int, default=0,
+                        help="Amostragem do rastreio SQL no caminho novo (0 = desligado)")
+    args = parser.parse_args()
+
+    main.configurar_rastreio_sql(args.amostragem)
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        medir("antes (query % dados + log + print + commit)", inserir_advogado_antigo, ConexaoNula(), args.linhas)
+        medir("depois (rastreio, commit por linha)", main.inserir_advogado, ConexaoNula(), args.linhas)
+        medir("depois (rastreio, escritor em lote)", main.inserir_advogado,
+              main.EscritorEmLote(ConexaoNula()), args.linhas)
+
+
+if __name__ == "__main__":
+    main_benchmark()
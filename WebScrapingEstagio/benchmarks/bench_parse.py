@@ -0,0 +1,162 @@
+# Benchmark do parse das listagens da OA: itens/segundo do extract_item_data antes e depois da tabela de rótulos
+#
+# Uso: python benchmarks/bench_parse.py [PAGINAS ...] [--tipo advogado] [--repeticoes 20]
+#
+# PAGINAS são ficheiros .html guardados (p.ex. os error_page_*.html) ou pastas com eles. Sem páginas,
+# usa páginas sintéticas com a mesma estrutura das listagens do portal. O parse do HTML (BeautifulSoup)
+# é feito uma vez fora da medição, para medir apenas a extração dos campos.
+import argparse
+import contextlib
+import glob
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+ROTULOS_SINTETICOS = ('Cédula', 'Conselho Regional', 'Morada', 'Código Postal', 'Localidade', 'Telefone', 'Fax',
+                      'Email', 'Data de Inscrição', 'Registo')
+
+
+def item_sintetico(i):
+    detalhes = ''.join(
+        f'<li class="search-results__details-list-item">'
+        f'<span class="search-results__details-list-item-label">{rotulo}</span>'
+        f'<span class="search-results__details-list-item-description">{rotulo} {i}</span></li>'
+        for rotulo in ROTULOS_SINTETICOS)
+    return (f'<article class="search-results__article-person">'
+            f'<h4 class="search-results__article-person-title"> Pessoa {i} </h4>'
+            f'<div class="search-results__article-person-status">Ativo</div>'
+            f'<ul class="search-results__article-person-details-list">{detalhes}</ul></article>')
+
+
+def paginas_sinteticas(quantidade=10, por_pagina=20):
+    return [f'<html><body><div class="search-results">'
+            f'{"".join(item_sintetico(p * por_pagina + i) for i in range(por_pagina))}</div></body></html>'
+            for p in range(quantidade)]
+
+
+def ler_paginas(caminhos):
+    ficheiros = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            ficheiros.extend(sorted(glob.glob(os.path.join(caminho, '*.html'))))
+        else:
+            ficheiros.append(caminho)
+    paginas = []
+    for ficheiro in ficheiros:
+        with open(ficheiro, encoding='utf-8') as f:
+            paginas.append(f.read())
+    return paginas
+
+
+# Versão anterior do extract_item_data: duas procuras do título e cadeias de `in` por rótulo
+def extract_item_data_antigo(item, base_url, tipo):
+    item_data = {}
+    estado = item.find('div', class_='search-results__article-person-status')
+    estado_text = estado.text.strip() if estado else "Sem estado"
+    nome = item.find('h4', class_='search-results__article-person-title').text.strip() if item.find(
+        'h4', class_='search-results__article-person-title') else 'N/D'
+
+    item_data['Nome'] = nome
+    item_data['Estado'] = estado_text
+    item_data['Tipo'] = tipo
+
+    details = item.find_all('ul', class_=['search-results__article-person-details-list', 'details-list'])
+    for detail in details:
+        items = detail.find_all('li', class_='search-results__details-list-item')
+        for sub_item in items:
+            label = sub_item.find('span', class_='search-results__details-list-item-label')
+            value = sub_item.find('span', class_='search-results__details-list-item-description')
+            if label and value:
+                label_text = label.text.strip().lower()
+                value_text = value.text.strip()
+                if tipo == 'estagiario':
+                    print(f"  DEBUG: Extracted Label: '{label_text}', Value: '{value_text}'")
+                if "cédula" in label_text:
+                    item_data['Cédula'] = value_text
+                elif "conselho regional" in label_text:
+                    item_data['Conselho Regional'] = value_text
+                elif "morada" in label_text:
+                    item_data['Morada'] = value_text
+                elif "localidade" in label_text:
+                    item_data['Localidade'] = value_text
+                if tipo == 'estagiario':
+                    if "data de inscrição" in label_text or "data de inscricao" in label_text:
+                        item_data['Data de Inscrição'] = value_text
+                    elif "fax" in label_text or "fax registado" in label_text:
+                        item_data['Fax'] = value_text
+                    elif "telefone" in label_text:
+                        item_data['Telefone'] = value_text
+                    elif "email" in label_text:
+                        item_data['Email'] = value_text
+                    elif "código postal" in label_text or "codigo postal" in label_text:
+                        item_data['Código Postal'] = value_text
+                else:
+                    if "telefone" in label_text:
+                        item_data['Telefone'] = value_text
+                    elif "email" in label_text:
+                        item_data['Email'] = value_text
+                    elif "registo" in label_text:
+                        item_data['Registo'] = value_text
+                    elif "código postal" in label_text or "codigo postal" in label_text:
+                        item_data['Código Postal'] = value_text
+                    elif "data de constituição" in label_text or "data de constituicao" in label_text:
+                        item_data['Data de Constituição'] = value_text
+                    elif "fax" in label_text or "fax registado" in label_text:
+                        item_data['Fax'] = value_text
+                    elif "data de inscrição" in label_text or "data de inscricao" in label_text:
+                        item_data['Data de Inscrição'] = value_text
+
+    expected_keys = ['Nome', 'Estado', 'Tipo', 'Cédula', 'Conselho Regional', 'Morada', 'Localidade',
+                     'Telefone', 'Email', 'Registo', 'Código Postal', 'Data de Constituição',
+                     'Fax', 'Data de Inscrição', 'Site']
+    for key in expected_keys:
+        if key not in item_data:
+            item_data[key] = 'N/D'
+    if 'Site' not in item_data or item_data['Site'] == 'N/D':
+        item_data['Site'] = 'N/D'
+    return item_data
+
+
+def medir(nome, func, itens, tipo, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for item in itens:
+            func(item, '', tipo)
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<40} {len(itens) * repeticoes / duracao:>12,.0f} itens/s", file=sys.__stdout__)
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark do parse das listagens da OA")
+    parser.add_argument('paginas', nargs='*', help="Ficheiros .html ou pastas com páginas de resultados guardadas")
+    parser.add_argument('--tipo', choices=['advogado', 'sociedade', 'estagiario'], default='advogado')
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    paginas = ler_paginas(args.paginas) if args.paginas else paginas_sinteticas()
+    itens = []
+    for html in paginas:
+        itens.extend(BeautifulSoup(html, 'lxml').select(main.CSS_RESULTADOS_OA))
+    if not itens:
+        print("Nenhum item encontrado nas páginas indicadas.")
+        return
+    print(f"{len(paginas)} páginas, {len(itens)} itens, tipo {args.tipo}")
+
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        diferentes = sum(extract_item_data_antigo(item, '', args.tipo)
+                         != main.extract_item_data(item, '', args.tipo).como_dict()
+                         for item in itens)
+        medir("antes (cadeias de if/elif)", extract_item_data_antigo, itens, args.tipo, args.repeticoes)
+        medir("depois (tabela de rótulos, uma passagem)", main.extract_item_data, itens, args.tipo,
+              args.repeticoes)
+    print(f"Itens com resultado diferente entre as duas versões: {diferentes}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -1,46 +1,340 @@
 import mysql.connector
+from mysql.connector import pooling
 from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
 import time
 import random
 import csv
 from datetime import datetime
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException, \
+    StaleElementReferenceException, SessionNotCreatedException
 import logging
 import os
+import argparse
+import sys
+import itertools
+import functools
+import signal
+import atexit
+import json
+import threading
+import sqlite3
+import contextlib
 from urllib.parse import urlparse, parse_qs, urlencode
 import uuid
 from selenium.webdriver.support.ui import Select
-
-# Set up logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+import multiprocessing
+import queue
+import re
+import asyncio
+import unicodedata
+import hashlib
+import gzip
+import glob
+import fnmatch
+import shutil
+import subprocess
+
+# O backend de fetch HTTP é opcional; sem o requests usa-se sempre o Selenium
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
+# O webdriver-manager só é preciso para descarregar o chromedriver; offline usa-se um chromedriver local
+try:
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.driver_cache import DriverCacheManager
+except ImportError:
+    ChromeDriverManager = None
+
+# A exportação Parquet é opcional (--parquet); precisa do pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# O arquivo de HTML comprime com zstd se o zstandard estiver instalado; sem ele usa gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Log da execução em logs/scraper_log_<timestamp>.log. É configurado no arranque do script e não na
+# importação: os processos de parse (spawn) reimportam o módulo e recebem o ficheiro da execução
 log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-logging.basicConfig(
-    filename=f"{log_dir}/scraper_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
+FICHEIRO_LOG = None
+
+
+def configurar_logging(ficheiro=None):
+    global FICHEIRO_LOG
+    if ficheiro is None:
+        os.makedirs(log_dir, exist_ok=True)
+        ficheiro = f"{log_dir}/scraper_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    FICHEIRO_LOG = ficheiro
+    logging.basicConfig(
+        filename=ficheiro,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+
+
+# Inicializador dos processos de parse e de reparse: escrevem no log da execução, se houver um
+def _iniciar_processo_log(ficheiro):
+    if ficheiro:
+        configurar_logging(ficheiro)
+
+
+# Configurações da base de dados
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "advogados",
+}
+DB_POOL_SIZE = int(os.environ.get("SCRAPER_DB_POOL_SIZE", "5"))  # Conexões no pool (máx. 32)
+DB_TENTATIVAS_RECONEXAO = 3
+DB_ESPERA_RECONEXAO = 2  # Segundos entre tentativas de reconexão
+
+# Erros que indicam que a conexão caiu e vale a pena reconectar e repetir
+ERROS_CONEXAO = (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+
+# Configurações da escrita em lote na base de dados
+TAMANHO_LOTE = 500  # Número de linhas pendentes que força um flush
+INTERVALO_MAX_LOTE = 30  # Segundos máximos entre flushes
+
+# Rastreio das queries de inserção: desligado por defeito (0); com N > 0 regista 1 em cada N queries
+# no logger 'scraper.sql', ao nível DEBUG
+AMOSTRAGEM_RASTREIO_SQL = int(os.environ.get("SCRAPER_RASTREIO_SQL", "0"))
+
+# Configurações do agendador de coletores em paralelo
+WORKERS_PADRAO = 4  # WebDrivers em simultâneo
+SITE_OA = 'portal.oa.pt'
+LIMITES_POR_SITE = {SITE_OA: 2}  # Coletores em simultâneo por site
+LIMITE_PADRAO_POR_SITE = 1
+
+# Backend de fetch das páginas de resultados: 'http' (requests, com fallback para o Selenium) ou 'selenium'
+BACKEND_FETCH = 'http' if requests is not None else 'selenium'
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/91.0.4472.124 Safari/537.36')
+RE_CAPTCHA = re.compile(r"<div[^>]+class=[\"'][^\"']*g-recaptcha")
+
+# Perfil dos WebDrivers: 'rapido' (headless, sem imagens/media/fontes nem scripts de terceiros, carregamento
+# 'eager') ou 'completo' (o Chrome normal). Só lemos o page_source; com CAPTCHA abre-se uma janela à parte
+PERFIL_DRIVER = 'rapido'
+TEMPO_CAPTCHA = 120  # Segundos dados a um humano para resolver o CAPTCHA na janela visível
+# Resolução do chromedriver, feita uma vez por execução: caminho pré-instalado (--chromedriver), cache local
+# com manifesto da versão instalada, ou download pelo webdriver-manager para essa cache. Em modo offline
+# (--offline-driver) nunca se vai à rede: cache local ou chromedriver do PATH
+CHROMEDRIVER = os.environ.get("SCRAPER_CHROMEDRIVER")  # Caminho de um chromedriver pré-instalado
+VERSAO_CHROMEDRIVER = os.environ.get("SCRAPER_CHROMEDRIVER_VERSAO")  # Versão fixada; None aceita a da cache
+DIRETORIO_CHROMEDRIVER = os.environ.get("SCRAPER_CHROMEDRIVER_DIR", ".chromedriver")
+MODO_OFFLINE_DRIVER = os.environ.get("SCRAPER_CHROMEDRIVER_OFFLINE") == "1"
+
+# Padrões bloqueados via CDP no perfil rápido. O CSS e os scripts do reCAPTCHA não são bloqueados: o formulário
+# de recurso precisa de elementos visíveis e clicáveis
+URLS_BLOQUEADOS = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+    '*connect.facebook.com*', '*hotjar.com*', '*youtube.com/embed*', '*addthis.com*',
 )
 
+# Pipeline assíncrono de páginas (só com o backend HTTP): várias páginas em voo por coletor,
+# com um token bucket por host partilhado por todos os coletores desse host
+CONCORRENCIA_PAGINAS = 3  # Páginas em voo por coletor; 1 mantém a paginação sequencial
+TAXA_POR_HOST = {SITE_OA: 0.25}  # Pedidos por segundo (2 coletores x 1 página a cada ~8s, como antes)
+TAXA_PADRAO_POR_HOST = 0.2
+RAJADA_POR_HOST = 2
+
+# Seletor dos resultados das pesquisas do portal da OA
+CSS_RESULTADOS_OA = 'article.search-results__article-person, .search-results article, .result-item'
+# Backend do parse das listagens da OA: 'lxml' (árvore lxml com XPath pré-compilados) ou 'bs4' (BeautifulSoup,
+# a implementação de referência); os dois produzem os mesmos registos
+PARSER_PAGINAS = 'lxml'
+# Verificação sem parse de que um HTML traz resultados (decide o fallback do HTTP para o Selenium)
+RE_RESULTADOS_OA = re.compile(r"<article\b|result-item")
+
+# Parse das páginas de resultados num pool de processos, fora da thread do browser; 0 faz o parse na thread
+PROCESSOS_PARSE = max(1, (os.cpu_count() or 2) - 1)
+FILA_PAGINAS = 4  # Páginas obtidas à espera de parse e gravação na paginação sequencial
+
+# Controlo de ritmo: as pausas base são multiplicadas por um fator adaptativo de cada coletor,
+# que encolhe com respostas rápidas e sem erros, sobe com respostas lentas e duplica a cada timeout,
+# CAPTCHA ou erro HTTP
+FATOR_RITMO_MIN = 0.3
+FATOR_RITMO_MAX = 8.0
+REDUCAO_RITMO = 0.9  # Multiplicador do fator após cada resposta rápida
+AUMENTO_RITMO = 2.0  # Multiplicador do fator após cada falha
+AUMENTO_RITMO_LENTO = 1.25  # Multiplicador do fator após cada resposta lenta
+RESPOSTA_RAPIDA = 3.0  # Segundos: abaixo disto a resposta conta como rápida e o fator encolhe
+RESPOSTA_LENTA = 10.0  # Segundos: acima disto o site está sobrecarregado e o fator sobe; entre os dois mantém-se
+
+# Checkpoints da paginação (ativados no main); com MODO_RETOMAR cada coletor continua onde parou
+FICHEIRO_ESTADO = "estado_scraper.sqlite3"
+CHECKPOINTS = None
+MODO_RETOMAR = False
+CHECKPOINT_COLETOR = '*'  # base_url usada para marcar um coletor inteiro como concluído
+
+# Deteção de alterações (desligada com --completo): só são gravadas na base de dados as linhas novas ou
+# alteradas desde a execução anterior, comparando impressões guardadas no ficheiro de estado
+DETETOR_ALTERACOES = None
+
+# Cache de páginas (opcional, --cache-paginas): impressão dos resultados de cada URL de página; uma página
+# igual à da execução anterior não é interpretada nem gravada, e as suas linhas contam como vistas. Os registos
+# dessas páginas também não chegam aos CSV nem ao Parquet, que passam a conter só as páginas alteradas
+CACHE_PAGINAS = None
+RE_ARTIGOS_OA = re.compile(r"<article\b[^>]*search-results__article-person.*?</article>", re.S)
+RE_PAGINA_SEGUINTE_OA = re.compile(r"icon-chevron-right")
+
+# Arquivo de HTML opcional (--arquivo-html DIR): cada página de resultados obtida fica guardada comprimida,
+# endereçada pelo hash do conteúdo, com um índice (coletor, url, página, data) para a poder reinterpretar
+ARQUIVO_HTML = None
+
+# Pesquisas da OA: abre diretamente o URL dos resultados (parâmetros cg, a=on, o, page) em vez do formulário
+PESQUISA_DIRETA_OA = True
+TIMEOUT_PESQUISA_DIRETA = 15  # Segundos à espera de resultados no URL direto antes de voltar ao formulário
+
+# Saída CSV global da execução (todos_dados_<timestamp>.csv), aberta no main e escrita em streaming
+SAIDA_TODOS = None
+
+# Exportação Parquet opcional (--parquet DIR): um dataset por entidade, ao lado dos CSV
+SAIDA_PARQUET = None
+TAMANHO_LOTE_PARQUET = 5000  # Registos em memória por entidade antes de escrever um ficheiro
+
+# Reinterpretação offline (main.py reparse): lote maior, porque só há um escritor e nenhum site à espera
+TAMANHO_LOTE_REPARSE = 5000
+
+# Modo upsert: os inserir_* atualizam a linha existente em vez de duplicar; sem upsert mantêm a existente.
+# As colunas das chaves naturais vão sempre como NULL quando o valor é desconhecido ('N/D'), nos dois modos
+MODO_UPSERT = True
+
+# Colunas gravadas pelos inserir_*, pela ordem dos parâmetros da query
+COLUNAS_TABELAS = {
+    'advogados': ('name', 'cedula', 'conselho', 'morada', 'estado', 'email', 'site', 'tipo', 'localidade',
+                  'codigo_postal', 'telefone', 'data_inscricao', 'fax'),
+    'sociedades': ('name', 'conselho', 'morada', 'estado', 'telefone', 'email', 'site', 'tipo', 'localidade',
+                   'registo', 'codigo_postal', 'data_constituicao', 'fax'),
+    'estagiarios': ('name', 'cedula', 'conselho', 'morada', 'estado', 'email', 'site', 'tipo', 'localidade',
+                    'codigo_postal', 'data_inscricao', 'telefone', 'fax'),
+    'agentes_execucao': ('nome', 'situacao', 'cedula', 'localidade', 'telefone', 'email', 'tipo'),
+    'tribunais': ('nome', 'morada', 'telefone', 'email'),
+}
+
+# Chaves naturais usadas nos índices únicos e no upsert
+CHAVES_NATURAIS = {
+    'advogados': ('cedula', 'conselho'),
+    'estagiarios': ('cedula', 'conselho'),
+    'sociedades': ('registo', 'conselho'),
+    'agentes_execucao': ('cedula',),
+    'tribunais': ('nome',),
+}
+
+
+# Pool de conexões partilhado por todos os coletores do processo
+_pool_conexoes = None
+_pool_lock = threading.Lock()
+_tabelas_verificadas = False
+
+
+def obter_pool(pool_size=None):
+    global _pool_conexoes
+    with _pool_lock:
+        if _pool_conexoes is None:
+            _pool_conexoes = pooling.MySQLConnectionPool(pool_name="scraper",
+                                                         pool_size=pool_size or DB_POOL_SIZE,
+                                                         pool_reset_session=True,
+                                                         **DB_CONFIG)
+            logging.info(f"Pool de conexões criado com {_pool_conexoes.pool_size} conexões")
+        return _pool_conexoes
+
 
 # Conectar ao banco de dados MySQL e criar a tabela se não existir
-def conectar_mysql():
+def conectar_mysql(pool_size=None):
+    """
+    Obtém uma conexão do pool (criado na primeira chamada) e garante que as
+    tabelas existem. Cada coletor em paralelo deve pedir a sua própria conexão;
+    ao chamar close() a conexão volta ao pool.
+    """
+    global _tabelas_verificadas
     try:
-        conexao = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="advogados"
-        )
+        pool = obter_pool(pool_size)
+        for tentativa in range(DB_TENTATIVAS_RECONEXAO):
+            try:
+                conexao = pool.get_connection()
+                break
+            except pooling.PoolError:
+                # Pool esgotado: aguarda que outro coletor devolva uma conexão
+                if tentativa == DB_TENTATIVAS_RECONEXAO - 1:
+                    raise
+                time.sleep(DB_ESPERA_RECONEXAO)
+        # Verificação de saúde: a conexão do pool pode ter caído enquanto estava parada
+        conexao.ping(reconnect=True, attempts=DB_TENTATIVAS_RECONEXAO, delay=DB_ESPERA_RECONEXAO)
         logging.info("Conexão com o banco de dados estabelecida!")
         print("Conexão com o banco de dados estabelecida!")
 
+        with _pool_lock:
+            if not _tabelas_verificadas:
+                criar_tabelas(conexao)
+                _tabelas_verificadas = True
+        return conexao
+    except mysql.connector.Error as e:
+        logging.error(f"Erro ao conectar ao banco de dados: {e}")
+        print(f"Erro ao conectar ao banco de dados: {e}")
+        return None
+
+
+# Verifica se a conexão está utilizável, reconectando se tiver caído
+def conexao_ativa(conexao):
+    if not conexao:
+        return False
+    if isinstance(conexao, EscritorEmLote):
+        # O escritor só precisa da conexão no flush, que reconecta se for preciso
+        return conexao.conexao is not None
+    try:
+        conexao.ping(reconnect=True, attempts=DB_TENTATIVAS_RECONEXAO, delay=DB_ESPERA_RECONEXAO)
+        return True
+    except mysql.connector.Error as e:
+        logging.error(f"Conexão com o banco de dados indisponível: {e}")
+        print(f"❌ Conexão com o banco de dados indisponível: {e}")
+        return False
+
+
+# Executa uma operação na base de dados; se a conexão caiu, reconecta e repete uma vez
+def com_reconexao(conexao, operacao, *args):
+    try:
+        return operacao(*args)
+    except ERROS_CONEXAO as e:
+        logging.warning(f"Conexão com o banco de dados perdida ({e}). A reconectar e a repetir...")
+        print(f"⚠️ Conexão com o banco de dados perdida ({e}). A reconectar e a repetir...")
+        conexao.reconnect(attempts=DB_TENTATIVAS_RECONEXAO, delay=DB_ESPERA_RECONEXAO)
+        return operacao(*args)
+
+
+def _executar_insercao(conexao, query, dados):
+    cursor = conexao.cursor()
+    try:
+        cursor.execute(query, dados)
+        conexao.commit()
+    finally:
+        cursor.close()
+
+
+# Cria as tabelas se não existirem e aplica as migrações
+def criar_tabelas(conexao):
+    try:
         cursor = conexao.cursor()
 
         cursor.execute("""
@@ -143,29 +437,277 @@ def conectar_mysql():
         logging.info("Tabela 'agentes_execucao' verificada/criada com sucesso!")
         print("Tabela 'agentes_execucao' verificada/criada com sucesso!")
 
+        # --- Criar a tabela tribunais se não existir (usada por inserir_tribunal) ---
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tribunais (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                nome VARCHAR(255),
+                morada TEXT,
+                telefone VARCHAR(255),
+                email VARCHAR(255)
+            )
+        """)
+        logging.info("Tabela 'tribunais' verificada/criada com sucesso!")
+        print("Tabela 'tribunais' verificada/criada com sucesso!")
+
+        migrar_chaves_naturais(cursor)
+
         conexao.commit()
         cursor.close()
-        return conexao
     except mysql.connector.Error as e:
-        logging.error(f"Erro ao conectar ao banco de dados: {e}")
-        print(f"Erro ao conectar ao banco de dados: {e}")
+        logging.error(f"Erro ao criar as tabelas: {e}")
+        print(f"Erro ao criar as tabelas: {e}")
+        raise
+
+
+# Migração: índices únicos nas chaves naturais, para que as execuções repetidas não dupliquem linhas
+def migrar_chaves_naturais(cursor):
+    for tabela, chave in CHAVES_NATURAIS.items():
+        indice = f"uq_{tabela}_chave"
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+            (tabela, indice))
+        if cursor.fetchone()[0]:
+            continue
+
+        logging.info(f"A migrar a tabela '{tabela}' para a chave única {chave}...")
+        print(f"🔧 A migrar a tabela '{tabela}' para a chave única {chave}...")
+        # 'N/D' passa a NULL: as linhas sem chave conhecida não colidem entre si no índice único
+        for coluna in chave:
+            cursor.execute(f"UPDATE {tabela} SET {coluna} = NULL WHERE {coluna} = 'N/D'")
+        # Remove os duplicados acumulados pelas execuções anteriores, mantendo a linha mais recente
+        juncao = ' AND '.join(f"t1.{coluna} = t2.{coluna}" for coluna in chave)
+        cursor.execute(f"DELETE t1 FROM {tabela} t1 JOIN {tabela} t2 ON {juncao} AND t1.id < t2.id")
+        logging.info(f"{cursor.rowcount} duplicados removidos de '{tabela}'")
+        print(f"🧹 {cursor.rowcount} duplicados removidos de '{tabela}'")
+        cursor.execute(f"ALTER TABLE {tabela} ADD UNIQUE KEY {indice} ({', '.join(chave)})")
+        logging.info(f"Chave única {indice} criada com sucesso!")
+        print(f"✅ Chave única {indice} criada com sucesso!")
+
+
+# Rastreio das queries de inserção, com amostragem e formatação preguiçosa dos parâmetros
+logger_sql = logging.getLogger("scraper.sql")
+_contador_rastreio = itertools.count()
+
+
+def configurar_rastreio_sql(amostragem):
+    global AMOSTRAGEM_RASTREIO_SQL
+    AMOSTRAGEM_RASTREIO_SQL = max(0, int(amostragem))
+    logger_sql.setLevel(logging.DEBUG if AMOSTRAGEM_RASTREIO_SQL else logging.INFO)
+
+
+def rastrear_query(tabela, query, dados):
+    # No caminho desligado o custo é uma comparação; a query só é formatada se o registo for emitido
+    if not AMOSTRAGEM_RASTREIO_SQL or not logger_sql.isEnabledFor(logging.DEBUG):
+        return
+    if next(_contador_rastreio) % AMOSTRAGEM_RASTREIO_SQL:
+        return
+    logger_sql.debug("Executando query em %s: %s | parâmetros: %r", tabela, query, dados)
+
+
+configurar_rastreio_sql(AMOSTRAGEM_RASTREIO_SQL)
+
+
+# Monta o INSERT de uma tabela; no modo upsert atualiza as colunas que não fazem parte da chave
+@functools.lru_cache(maxsize=None)
+def _query_insercao(tabela, upsert):
+    colunas = COLUNAS_TABELAS[tabela]
+    query = (f"INSERT INTO {tabela} ({', '.join(colunas)}) "
+             f"VALUES ({', '.join(['%s'] * len(colunas))})")
+    if tabela in CHAVES_NATURAIS:
+        chave = CHAVES_NATURAIS[tabela]
+        if upsert:
+            # O MySQL só reescreve a linha se algum valor mudou (affected rows = 0 quando é igual)
+            atualizacoes = ', '.join(f"{coluna} = VALUES({coluna})" for coluna in colunas if coluna not in chave)
+        else:
+            # Sem upsert, uma linha já existente fica como está (em vez de falhar com IntegrityError)
+            atualizacoes = f"{chave[0]} = {chave[0]}"
+        query += f" ON DUPLICATE KEY UPDATE {atualizacoes}"
+    return query
+
+
+# Valor de uma coluna de chave natural: sem valor conhecido grava NULL em vez de 'N/D'
+def _valor_chave(valor):
+    if valor is None or str(valor).strip() in ('', 'N/D'):
         return None
+    return str(valor)
+
+
+# Escritor em lote: acumula as linhas por tabela e grava-as numa única transação
+class EscritorEmLote:
+    """
+    Substitui o commit por linha dos inserir_*: as linhas ficam num buffer por
+    tabela e são gravadas com executemany numa única transação quando o lote
+    atinge `tamanho_lote` linhas, quando passam `intervalo_max` segundos desde o
+    último flush, no fim de cada coletor e à saída do processo.
+
+    Args:
+        conexao: Conexão MySQL usada para gravar os lotes
+        tamanho_lote: Número de linhas pendentes que dispara um flush
+        intervalo_max: Segundos máximos entre flushes
+    """
+
+    def __init__(self, conexao, tamanho_lote=TAMANHO_LOTE, intervalo_max=INTERVALO_MAX_LOTE):
+        self.conexao = conexao
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_max = intervalo_max
+        self._pendentes = {}  # query -> (tabela, [linhas], [impressões do detetor de alterações])
+        self._total_pendente = 0
+        self._ultimo_flush = time.monotonic()
+        self.linhas_falhadas = 0  # Linhas que não foi possível gravar e foram para o JSONL, desde o início
+        self._lock = threading.RLock()
+        # Garante o flush mesmo que o script termine com uma exceção não tratada
+        atexit.register(self.fechar)
+
+    def is_connected(self):
+        return conexao_ativa(self)
+
+    # `impressao` é a impressão pendente do detetor de alterações, só guardada depois de a linha ser gravada
+    def adicionar(self, tabela, query, dados, impressao=None):
+        with self._lock:
+            _, linhas, impressoes = self._pendentes.setdefault(query, (tabela, [], []))
+            linhas.append(dados)
+            impressoes.append(impressao)
+            self._total_pendente += 1
+            if (self._total_pendente >= self.tamanho_lote
+                    or time.monotonic() - self._ultimo_flush >= self.intervalo_max):
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._ultimo_flush = time.monotonic()
+            if not self._pendentes:
+                return 0
+            pendentes = self._pendentes
+            self._pendentes = {}
+            self._total_pendente = 0
+
+            try:
+                gravadas = com_reconexao(self.conexao, self._gravar_lote, pendentes)
+                _confirmar_impressoes([impressao for _, _, impressoes in pendentes.values()
+                                       for impressao in impressoes])
+            except mysql.connector.Error as e:
+                logging.error(f"Erro ao gravar lote, a tentar linha a linha: {e}")
+                print(f"❌ Erro ao gravar lote, a tentar linha a linha: {e}")
+                try:
+                    self.conexao.rollback()
+                except mysql.connector.Error:
+                    pass
+                gravadas = self._gravar_linha_a_linha(pendentes)
+
+            logging.info(f"Lote gravado: {gravadas} linhas")
+            return gravadas
+
+    def _gravar_lote(self, pendentes):
+        cursor = self.conexao.cursor()
+        try:
+            for query, (tabela, linhas, _) in pendentes.items():
+                cursor.executemany(query, linhas)
+            self.conexao.commit()
+        finally:
+            cursor.close()
+        return sum(len(linhas) for _, linhas, _ in pendentes.values())
+
+    def _gravar_linha_a_linha(self, pendentes):
+        # Isola as linhas com erro para não perder o resto do lote
+        gravadas = 0
+        falhadas = []
+        impressoes_gravadas = []
+        try:
+            if not self.conexao.is_connected():
+                self.conexao.reconnect(attempts=DB_TENTATIVAS_RECONEXAO, delay=DB_ESPERA_RECONEXAO)
+            cursor = self.conexao.cursor()
+            for query, (tabela, linhas, impressoes) in pendentes.items():
+                for dados, impressao in zip(linhas, impressoes):
+                    try:
+                        cursor.execute(query, dados)
+                        gravadas += 1
+                        impressoes_gravadas.append(impressao)
+                    except mysql.connector.Error as e:
+                        logging.error(f"Erro ao inserir linha em {tabela}: {e}")
+                        falhadas.append((tabela, query, dados))
+            self.conexao.commit()
+            cursor.close()
+        except mysql.connector.Error as e:
+            logging.error(f"Erro ao gravar linhas do lote: {e}")
+            falhadas = [(tabela, query, dados) for query, (tabela, linhas, _) in pendentes.items()
+                        for dados in linhas]
+            gravadas = 0
+            impressoes_gravadas = []
+        # As linhas que vão para o JSONL perdem a impressão, para serem reenviadas na execução seguinte
+        _confirmar_impressoes(impressoes_gravadas)
+        if falhadas:
+            self.linhas_falhadas += len(falhadas)
+            self._guardar_falhadas(falhadas)
+        return gravadas
+
+    def _guardar_falhadas(self, falhadas):
+        # As linhas que não foi possível gravar ficam num ficheiro para recuperação manual
+        filename = f"linhas_nao_gravadas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        try:
+            with open(filename, 'a', encoding='utf-8') as f:
+                for tabela, query, dados in falhadas:
+                    f.write(json.dumps({'tabela': tabela, 'query': query, 'dados': dados},
+                                       ensure_ascii=False) + '\n')
+            logging.warning(f"{len(falhadas)} linhas não gravadas guardadas em {filename}")
+            print(f"⚠️ {len(falhadas)} linhas não gravadas guardadas em {filename}")
+        except OSError as e:
+            logging.error(f"Erro ao guardar linhas não gravadas: {e}")
+
+    def fechar(self):
+        with self._lock:
+            if self._pendentes:
+                self.flush()
+
+
+# Guarda no detetor de alterações as impressões das linhas já gravadas na base de dados
+def _confirmar_impressoes(impressoes):
+    impressoes = [impressao for impressao in impressoes if impressao is not None]
+    if DETETOR_ALTERACOES and impressoes:
+        DETETOR_ALTERACOES.guardar_impressoes(impressoes)
+
+
+# Envia uma linha para a base de dados: rastreio SQL, deteção de alterações e escrita em lote ou direta.
+# A impressão da linha só fica no detetor de alterações depois de a linha estar gravada
+def _enviar_linha(conexao, tabela, query, dados):
+    rastrear_query(tabela, query, dados)
+    impressao = None
+    # Linhas sem chave natural conhecida (p.ex. cédula 'N/D') não têm identidade entre execuções: uma alteração
+    # seria vista como linha nova e duplicada no MySQL, por isso seguem sempre, sem deteção de alterações
+    if DETETOR_ALTERACOES and DetetorAlteracoes.chave_natural(tabela, dados) is not None:
+        impressao = DETETOR_ALTERACOES.registar(tabela, dados)
+        if impressao is None:
+            return
+    if isinstance(conexao, EscritorEmLote):
+        conexao.adicionar(tabela, query, dados, impressao)
+        return
+    com_reconexao(conexao, _executar_insercao, conexao, query, dados)
+    _confirmar_impressoes([impressao])
+
+
+# Desfaz a transação em curso após um erro num inserir_*. O EscritorEmLote não tem transação aberta entre
+# flushes (cada lote é gravado e confirmado de uma vez), por isso aí não há nada a desfazer
+def _desfazer_insercao(conexao):
+    if conexao is None or isinstance(conexao, EscritorEmLote):
+        return
+    try:
+        conexao.rollback()
+    except mysql.connector.Error as e:
+        logging.error(f"Erro ao desfazer a transação: {e}")
 
 
 # Função para inserir dados de advogados no banco de dados
 def inserir_advogado(conexao, nome, cedula, conselho_regional, morada, estado_text, email='N/D',
                      site='N/D', tipo='N/D', localidade='N/D', codigo_postal='N/D', telefone='N/D',
-                     data_inscricao='N/D', fax='N/D'):
+                     data_inscricao='N/D', fax='N/D', upsert=None):
     try:
-        cursor = conexao.cursor()
-        query = """
-            INSERT INTO advogados (name, cedula, conselho, morada, estado, email, site, tipo, localidade, codigo_postal, telefone, data_inscricao, fax)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        upsert = MODO_UPSERT if upsert is None else upsert
+        query = _query_insercao('advogados', upsert)
         dados = (
             str(nome or 'N/D'),
-            str(cedula or 'N/D'),
-            str(conselho_regional or 'N/D'),
+            _valor_chave(cedula),
+            _valor_chave(conselho_regional),
             str(morada or 'N/D'),
             str(estado_text or 'N/D'),
             str(email or 'N/D'),
@@ -176,11 +718,7 @@ def inserir_advogado(conexao, nome, cedula, conselho_regional, morada, estado_te
             str(telefone or 'N/D'),
             str(data_inscricao or 'N/D'),
             str(fax or 'N/D'))
-        logging.info(f"Executando query: {query % dados}")
-        print(f"Executando query: {query % dados}")
-        cursor.execute(query, dados)
-        conexao.commit()
-        cursor.close()
+        _enviar_linha(conexao, 'advogados', query, dados)
     except mysql.connector.Error as e:
         logging.error(f"Erro ao inserir advogado no banco de dados: {e}")
         print(f"Erro ao inserir advogado no banco de dados: {e}")
@@ -190,16 +728,13 @@ def inserir_advogado(conexao, nome, cedula, conselho_regional, morada, estado_te
 # Função para inserir dados de sociedades de advogados no banco de dados
 def inserir_sociedades(conexao, nome, conselho_regional, morada, estado_text, telefone='N/D', email='N/D', site='N/D',
                        tipo='sociedade', localidade='N/D', registo='N/D', codigo_postal='N/D', data_constituicao='N/D',
-                       fax='N/D'):
+                       fax='N/D', upsert=None):
     try:
-        cursor = conexao.cursor()
-        query = """
-            INSERT INTO sociedades (name, conselho, morada, estado, telefone, email, site, tipo, localidade, registo, codigo_postal, data_constituicao, fax)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        upsert = MODO_UPSERT if upsert is None else upsert
+        query = _query_insercao('sociedades', upsert)
         dados = (
             str(nome or 'N/D'),
-            str(conselho_regional or 'N/D'),
+            _valor_chave(conselho_regional),
             str(morada or 'N/D'),
             str(estado_text or 'N/D'),
             str(telefone or 'N/D'),
@@ -207,16 +742,12 @@ def inserir_sociedades(conexao, nome, conselho_regional, morada, estado_text, te
             str(site or 'N/D'),
             str(tipo or 'sociedade'),
             str(localidade or 'N/D'),
-            str(registo or 'N/D'),
+            _valor_chave(registo),
             str(codigo_postal or 'N/D'),
             str(data_constituicao or 'N/D'),
             str(fax or 'N/D')
         )
-        logging.info(f"Executando query: {query % dados}")
-        print(f"Executando query: {query % dados}")
-        cursor.execute(query, dados)
-        conexao.commit()
-        cursor.close()
+        _enviar_linha(conexao, 'sociedades', query, dados)
     except mysql.connector.Error as e:
         logging.error(f"Erro ao inserir sociedade no banco de dados: {e}")
         print(f"Erro ao inserir sociedade no banco de dados: {e}")
@@ -226,19 +757,14 @@ def inserir_sociedades(conexao, nome, conselho_regional, morada, estado_text, te
 # Função para inserir dados de estagiários no banco de dados
 def inserir_estagiario(conexao, nome, cedula, conselho_regional, morada, estado_text, email='N/D',
                        site='N/D', tipo='N/D', localidade='N/D', codigo_postal='N/D', data_inscricao='N/D',
-                       telefone='N/D', fax='N/D'):
+                       telefone='N/D', fax='N/D', upsert=None):
     try:
-        cursor = conexao.cursor()
-        query = """
-            INSERT INTO estagiarios 
-            (name, cedula, conselho, morada, estado, email, site, tipo, localidade, codigo_postal, data_inscricao, telefone, fax)
-            VALUES 
-            (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        upsert = MODO_UPSERT if upsert is None else upsert
+        query = _query_insercao('estagiarios', upsert)
         dados = (
             str(nome or 'N/D'),
-            str(cedula or 'N/D'),
-            str(conselho_regional or 'N/D'),
+            _valor_chave(cedula),
+            _valor_chave(conselho_regional),
             str(morada or 'N/D'),
             str(estado_text or 'N/D'),
             str(email or 'N/D'),
@@ -250,1433 +776,2231 @@ def inserir_estagiario(conexao, nome, cedula, conselho_regional, morada, estado_
             str(telefone or 'N/D'),
             str(fax or 'N/D')
         )
-        logging.info(f"Executando query: {query % dados}")
-        cursor.execute(query, dados)
-        conexao.commit()
-        logging.info(f"Estagiário {nome} inserido com sucesso!")
-        print(f"✅ Estagiário {nome} inserido com sucesso!")
-        cursor.close()
+        _enviar_linha(conexao, 'estagiarios', query, dados)
     except Exception as e:
         logging.error(f"Erro ao inserir estagiário {nome}: {e}")
         print(f"❌ Erro ao inserir estagiário {nome}: {e}")
-        conexao.rollback()
+        _desfazer_insercao(conexao)
 
 
 # Função para inserir dados de agentes de execução no banco de dados
 # (usada pelo scraping da OSAE)
-def inserir_agente_execucao(conexao, nome, situacao, cedula, localidade, telefone, email, tipo='agente_execucao'):
+def inserir_agente_execucao(conexao, nome, situacao, cedula, localidade, telefone, email, tipo='agente_execucao',
+                            upsert=None):
     try:
-        cursor = conexao.cursor()
-        query = """
-            INSERT INTO agentes_execucao (nome, situacao, cedula, localidade, telefone, email, tipo)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
+        upsert = MODO_UPSERT if upsert is None else upsert
+        query = _query_insercao('agentes_execucao', upsert)
         dados = (
             str(nome or 'N/D'),
             str(situacao or 'N/D'),
-            str(cedula or 'N/D'),
+            _valor_chave(cedula),
             str(localidade or 'N/D'),
             str(telefone or 'N/D'),
             str(email or 'N/D'),
             str(tipo or 'agente_execucao')
         )
-        logging.info(f"Executando query: {query % dados}")
-        cursor.execute(query, dados)
-        conexao.commit()
-        logging.info(f"Agente de Execução {nome} inserido com sucesso!")
-        print(f"✅ Agente de Execução {nome} inserido com sucesso!")
-        cursor.close()
+        _enviar_linha(conexao, 'agentes_execucao', query, dados)
     except Exception as e:
         logging.error(f"Erro ao inserir agente de execução {nome}: {e}")
         print(f"❌ Erro ao inserir agente de execução {nome}: {e}")
-        conexao.rollback()
+        _desfazer_insercao(conexao)
 
 
-# Salvar em CSV
-def save_to_csv(all_data, filename):
-    if not all_data:
-        logging.warning(f"Nenhum dado para salvar em CSV: {filename}")
-        print(f"Nenhum dado para salvar em CSV: {filename}")
-        return
-    try:
-        keys = set()
-        for item in all_data:
-            keys.update(item.keys())
-        with open(filename, mode='w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=sorted(keys))
-            writer.writeheader()
-            writer.writerows(all_data)
-        logging.info(f"Dados salvos em CSV: {filename}")
-        print(f"📄 Dados salvos em CSV: {filename}")
-    except Exception as e:
-        logging.error(f"Erro ao salvar CSV {filename}: {e}")
-        print(f"Erro ao salvar CSV {filename}: {e}")
+# Registos extraídos: classes com __slots__ em vez de um dicionário com 15 chaves por item.
+# Os valores em falta ficam None; o 'N/D' só aparece na escrita (CSV e base de dados)
+class Registo:
+    """
+    Base dos registos extraídos. Cada subclasse define CAMPOS (os atributos,
+    pela ordem das colunas) e COLUNAS (o nome de cada atributo no CSV).
+    """
 
+    __slots__ = ()
+    CAMPOS = ()
+    COLUNAS = {}
 
-# Configurações do Selenium
-def configurar_driver():
-    options = Options()
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option('excludeSwitches', ['enable-automation'])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument(
-        'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        return driver
-    except WebDriverException as e:
-        logging.error(f"Erro ao configurar o WebDriver: {e}")
-        print(f"Erro ao configurar o WebDriver: {e}")
-        return None
+    def __init__(self, **valores):
+        for campo in self.CAMPOS:
+            setattr(self, campo, valores.pop(campo, None))
+        if valores:
+            raise TypeError(f"Campos desconhecidos em {type(self).__name__}: {', '.join(valores)}")
 
+    # Linha para o CSV, com os nomes de colunas de sempre e 'N/D' nos valores em falta
+    def como_dict(self):
+        linha = {}
+        for campo in self.CAMPOS:
+            valor = getattr(self, campo)
+            linha[self.COLUNAS[campo]] = 'N/D' if valor is None else valor
+        return linha
 
-# Função auxiliar para verificar CAPTCHA
-def check_captcha(driver):
-    for attempt in range(3):
-        try:
-            captcha = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'g-recaptcha')]"))
-            )
-            print("⚠️ CAPTCHA detectado! Por favor, resolva o CAPTCHA manualmente no navegador.")
-            print("Aguardando 45 segundos para você resolver o CAPTCHA...")
-            time.sleep(15)
-            try:
-                driver.find_element(By.XPATH, "//div[contains(@class, 'g-recaptcha')]")
-                print("⚠️ CAPTCHA ainda presente. Tente novamente ou verifique o navegador.")
-                return True
-            except NoSuchElementException:
-                print("CAPTCHA resolvido com sucesso!")
-                return False
-        except Exception:
-            print("Nenhum CAPTCHA detectado.")
-            return False
-    print("⚠️ Falha ao lidar com o CAPTCHA após 3 tentativas.")
-    return True
+    def __repr__(self):
+        valores = ', '.join(f"{campo}={getattr(self, campo)!r}" for campo in self.CAMPOS
+                            if getattr(self, campo) is not None)
+        return f"{type(self).__name__}({valores})"
 
 
-# Função auxiliar para extrair dados de um item
-def extract_item_data(item, base_url, tipo):
-    item_data = {}
-    estado = item.find('div', class_='search-results__article-person-status')
-    estado_text = estado.text.strip() if estado else "Sem estado"
-    nome = item.find('h4', class_='search-results__article-person-title').text.strip() if item.find(
-        'h4', class_='search-results__article-person-title') else 'N/D'
-
-    item_data['Nome'] = nome
-    item_data['Estado'] = estado_text
-    item_data['Tipo'] = tipo
-
-    details = item.find_all('ul', class_=['search-results__article-person-details-list', 'details-list'])
-    for detail in details:
-        items = detail.find_all('li', class_='search-results__details-list-item')
-        for sub_item in items:
-            label = sub_item.find('span', class_='search-results__details-list-item-label')
-            value = sub_item.find('span', class_='search-results__details-list-item-description')
-            if label and value:
-                label_text = label.text.strip().lower()  # Convert label to lowercase for comparison
-                value_text = value.text.strip()
-                # Add print statement to see extracted data
-                if tipo == 'estagiario':
-                    print(f"  DEBUG: Extracted Label: '{label_text}', Value: '{value_text}'")
-                # Use as chaves consistentes para armazenar os dados
-                if "cédula" in label_text:
-                    item_data['Cédula'] = value_text
-                elif "conselho regional" in label_text:
-                    item_data['Conselho Regional'] = value_text
-                elif "morada" in label_text:
-                    item_data['Morada'] = value_text
-                elif "localidade" in label_text:
-                    item_data['Localidade'] = value_text
-                # Lógica aprimorada para Telefone, Data de Inscrição e Fax, especialmente para Estagiários
-                if tipo == 'estagiario':
-                    if "data de inscrição" in label_text or "data de inscricao" in label_text:
-                        item_data['Data de Inscrição'] = value_text
-                    elif "fax" in label_text or "fax registado" in label_text:
-                        item_data['Fax'] = value_text
-                    elif "telefone" in label_text:
-                        item_data['Telefone'] = value_text
-                    elif "email" in label_text:
-                        item_data['Email'] = value_text
-                    elif "código postal" in label_text or "codigo postal" in label_text:
-                        item_data['Código Postal'] = value_text
-                else:
-                    # Existing logic for other types (advogados, sociedades, etc.)
-                    if "telefone" in label_text:
-                        item_data['Telefone'] = value_text
-                    elif "email" in label_text:
-                        item_data['Email'] = value_text
-                    elif "registo" in label_text:
-                        item_data['Registo'] = value_text
-                    elif "código postal" in label_text or "codigo postal" in label_text:
-                        item_data['Código Postal'] = value_text
-                    elif "data de constituição" in label_text or "data de constituicao" in label_text:
-                        item_data['Data de Constituição'] = value_text
-                    elif "fax" in label_text or "fax registado" in label_text:
-                        item_data['Fax'] = value_text
-                    elif "data de inscrição" in label_text or "data de inscricao" in label_text:
-                        item_data['Data de Inscrição'] = value_text
-
-    # Garantir que todas as chaves esperadas existem, mesmo que com valor N/D
-    # Inclui todas as chaves possíveis que podem ser extraídas/usadas
-    expected_keys = ['Nome', 'Estado', 'Tipo', 'Cédula', 'Conselho Regional', 'Morada', 'Localidade',
-                     'Telefone', 'Email', 'Registo', 'Código Postal', 'Data de Constituição',
-                     'Fax', 'Data de Inscrição', 'Site']
-
-    for key in expected_keys:
-        if key not in item_data:
-            item_data[key] = 'N/D'
-
-    # Definir o campo Site (se não foi extraído)
-    if 'Site' not in item_data or item_data['Site'] == 'N/D':
-        # Se o Site não foi extraído, pode ser apropriado usar a base_url ou manter N/D
-        # Vou manter N/D por agora, a menos que especificado o contrário.
-        item_data['Site'] = 'N/D'
+COLUNAS_OA = {
+    'nome': 'Nome',
+    'estado': 'Estado',
+    'tipo': 'Tipo',
+    'cedula': 'Cédula',
+    'conselho_regional': 'Conselho Regional',
+    'morada': 'Morada',
+    'localidade': 'Localidade',
+    'telefone': 'Telefone',
+    'email': 'Email',
+    'registo': 'Registo',
+    'codigo_postal': 'Código Postal',
+    'data_constituicao': 'Data de Constituição',
+    'fax': 'Fax',
+    'data_inscricao': 'Data de Inscrição',
+    'site': 'Site',
+}
 
-    return item_data
 
+# Registos das listagens do portal da OA; as três entidades partilham os campos da listagem
+class RegistoOA(Registo):
+    __slots__ = CAMPOS = tuple(COLUNAS_OA)
+    COLUNAS = COLUNAS_OA
 
-# Função para processar todas as páginas de uma só vez
-def process_all_pages_at_once(driver, base_url, css_selector, max_pages=100, insert_func=None, conn=None,
-                              single_page=False):
-    print(f"Processando dados de {base_url}...")
-    all_data = []
-    # Determine the type based on the insert function provided
-    if insert_func == inserir_estagiario:
-        tipo = 'estagiario'
-    elif insert_func == inserir_sociedades:
-        tipo = 'sociedade'
-    else:
-        # Fallback to URL-based determination for other types if needed
-        tipo = 'sociedade' if 'sociedades' in base_url.lower() else 'advogado'
 
-    try:
-        if single_page:
-            print(f"Processando página única: {base_url}")
-            driver.get(base_url)
-            time.sleep(random.uniform(3, 5))
+class Advogado(RegistoOA):
+    __slots__ = ()
 
-            if check_captcha(driver):
-                driver.refresh()
-                time.sleep(random.uniform(2, 4))
 
-            for attempt in range(3):
-                try:
-                    WebDriverWait(driver, 30).until(
-                        EC.visibility_of_any_elements_located((By.CSS_SELECTOR, css_selector))
-                    )
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(random.uniform(2, 4))
-                    break
-                except Exception as e:
-                    print(f"Tentativa {attempt + 1} falhou ao carregar página. Recarregando...")
-                    logging.error(f"Tentativa {attempt + 1} falhou: {e}")
-                    driver.refresh()
-                    time.sleep(random.uniform(2, 4))
-            else:
-                print(f"⚠️ Não foi possível carregar a página: {base_url}")
-                logging.error(f"Não foi possível carregar a página: {base_url}")
-                with open(f"error_page_{base_url.split('/')[-2]}.html", 'w', encoding='utf-8') as f:
-                    f.write(driver.page_source)
-                return all_data
+class Sociedade(RegistoOA):
+    __slots__ = ()
 
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'lxml')
-            items = soup.select(css_selector)
 
-            if not items:
-                print("Nenhum item encontrado nesta página.")
-                logging.warning(f"Nenhum item encontrado em {base_url}")
-                return all_data
+class Estagiario(RegistoOA):
+    __slots__ = ()
 
-            print(f"Encontrados {len(items)} itens na página.")
-            for item in items:
-                try:
-                    item_data = extract_item_data(item, base_url, tipo)
-                    if conn and conn.is_connected() and insert_func:
-                        if tipo == 'sociedade':
-                            insert_func(conn,
-                                        item_data.get('Nome', 'N/D'),
-                                        item_data.get('Conselho Regional', 'N/D'),
-                                        item_data.get('Morada', 'N/D'),
-                                        item_data.get('Estado', 'N/D'),
-                                        item_data.get('Telefone', 'N/D'),
-                                        item_data.get('Email', 'N/D'),
-                                        item_data.get('Site', 'N/D'),
-                                        item_data.get('Tipo', tipo),
-                                        item_data.get('Localidade', 'N/D'),
-                                        item_data.get('Registo', 'N/D'),
-                                        item_data.get('Código Postal', 'N/D'),
-                                        item_data.get('Data de Constituição', 'N/D'),
-                                        item_data.get('Fax', 'N/D'))
-                        elif tipo == 'estagiario':
-                            insert_func(conn,
-                                        item_data.get('Nome', 'N/D'),
-                                        item_data.get('Cédula', 'N/D'),
-                                        item_data.get('Conselho Regional', 'N/D'),
-                                        item_data.get('Morada', 'N/D'),
-                                        item_data.get('Estado', 'N/D'),
-                                        item_data.get('Email', 'N/D'),
-                                        item_data.get('Site', 'N/D'),
-                                        item_data.get('Tipo', tipo),
-                                        item_data.get('Localidade', 'N/D'),
-                                        item_data.get('Código Postal', 'N/D'),
-                                        item_data.get('Data de Inscrição', 'N/D'),
-                                        item_data.get('Telefone', 'N/D'),
-                                        item_data.get('Fax', 'N/D'))
-                        else:
-                            insert_func(conn,
-                                        item_data.get('Nome', 'N/D'),
-                                        item_data.get('Cédula', 'N/D'),
-                                        item_data.get('Conselho Regional', 'N/D'),
-                                        item_data.get('Morada', 'N/D'),
-                                        item_data.get('Estado', 'N/D'),
-                                        item_data.get('Email', 'N/D'),
-                                        item_data.get('Site', 'N/D'),
-                                        item_data.get('Tipo', tipo),
-                                        item_data.get('Localidade', 'N/D'),
-                                        item_data.get('Código Postal', 'N/D'),
-                                        item_data.get('Telefone', 'N/D'),
-                                        item_data.get('Data de Inscrição', 'N/D'))
-                    all_data.append(item_data)
-                    print(f"✅ Item {item_data['Nome']} processado com sucesso!")
-                except Exception as e:
-                    print(f"Erro ao processar item: {e}")
-                    logging.error(f"Erro ao processar item: {e}")
-                    continue
 
-        else:
-            current_page = 1
-            max_attempts_without_data = 3
-            attempts_without_data = 0
+class AgenteExecucao(Registo):
+    __slots__ = CAMPOS = ('nome', 'situacao', 'cedula', 'localidade', 'telefone', 'email', 'tipo')
+    COLUNAS = {'nome': 'Nome', 'situacao': 'Situação', 'cedula': 'Cédula', 'localidade': 'Localidade',
+               'telefone': 'Telefone', 'email': 'Email', 'tipo': 'Tipo'}
 
-            while current_page <= max_pages:
-                try:
-                    try:
-                        pagination_info = driver.find_element(By.CSS_SELECTOR,
-                                                              '.pagination, .paging, [role="navigation"]')
-                        total_pages_elements = pagination_info.find_elements(By.CSS_SELECTOR, 'a, span')
-                        total_pages = 1
-                        for elem in total_pages_elements:
-                            text = elem.text.strip()
-                            if text.isdigit():
-                                total_pages = max(total_pages, int(text))
-                        max_pages = min(max_pages, total_pages)
-                        print(f"Total de páginas detectado: {total_pages}")
-                    except NoSuchElementException:
-                        print("Não foi possível determinar o total de páginas. Usando max_pages fornecido.")
-                        logging.warning("Não foi possível determinar o total de páginas.")
-
-                    current_url = driver.current_url
-                    parsed_url = urlparse(current_url)
-                    query_params = parse_qs(parsed_url.query)
-                    query_params['page'] = [str(current_page)]
-                    new_query = urlencode(query_params, doseq=True)
-                    new_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}?{new_query}"
-
-                    print(f"Extraindo dados da página {current_page} ({new_url})...")
-                    driver.get(new_url)
-                    time.sleep(random.uniform(3, 5))
-
-                    if check_captcha(driver):
-                        driver.refresh()
-                        time.sleep(random.uniform(2, 4))
-
-                    for attempt in range(3):
-                        try:
-                            WebDriverWait(driver, 30).until(
-                                EC.visibility_of_any_elements_located((By.CSS_SELECTOR, css_selector))
-                            )
-                            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                            time.sleep(random.uniform(2, 4))
-                            break
-                        except Exception as e:
-                            print(f"Tentativa {attempt + 1} falhou ao carregar página {current_page}. Recarregando...")
-                            logging.error(f"Tentativa {attempt + 1} falhou: {e}")
-                            driver.refresh()
-                            time.sleep(random.uniform(2, 4))
-                    else:
-                        print(f"⚠️ Não foi possível carregar a página {current_page}")
-                        logging.error(f"Não foi possível carregar a página {current_page}")
-                        with open(f"error_page_{base_url.split('/')[-2]}_{current_page}.html", 'w',
-                                  encoding='utf-8') as f:
-                            f.write(driver.page_source)
-                        attempts_without_data += 1
-                        if attempts_without_data >= max_attempts_without_data:
-                            print(
-                                f"⚠️ {max_attempts_without_data} páginas consecutivas sem dados. Encerrando paginação.")
-                            break
-                        current_page += 1
-                        continue
-
-                    html = driver.page_source
-                    soup = BeautifulSoup(html, 'lxml')
-                    items = soup.select(css_selector)
-
-                    if not items:
-                        print(f"Nenhum item encontrado na página {current_page}.")
-                        logging.warning(f"Nenhum item encontrado na página {current_page} de {base_url}")
-                        attempts_without_data += 1
-                        if attempts_without_data >= max_attempts_without_data:
-                            print(
-                                f"⚠️ {max_attempts_without_data} páginas consecutivas sem dados. Encerrando paginação.")
-                            break
-                        current_page += 1
-                        continue
-                    else:
-                        attempts_without_data = 0
-
-                    print(f"Encontrados {len(items)} itens na página {current_page}.")
-                    for item in items:
-                        try:
-                            item_data = extract_item_data(item, base_url, tipo)
-                            if conn and conn.is_connected() and insert_func:
-                                if tipo == 'sociedade':
-                                    insert_func(conn,
-                                                item_data.get('Nome', 'N/D'),
-                                                item_data.get('Conselho Regional', 'N/D'),
-                                                item_data.get('Morada', 'N/D'),
-                                                item_data.get('Estado', 'N/D'),
-                                                item_data.get('Telefone', 'N/D'),
-                                                item_data.get('Email', 'N/D'),
-                                                item_data.get('Site', 'N/D'),
-                                                item_data.get('Tipo', tipo),
-                                                item_data.get('Localidade', 'N/D'),
-                                                item_data.get('Registo', 'N/D'),
-                                                item_data.get('Código Postal', 'N/D'),
-                                                item_data.get('Data de Constituição', 'N/D'),
-                                                item_data.get('Fax', 'N/D'))
-                                elif tipo == 'estagiario':
-                                    insert_func(conn,
-                                                item_data.get('Nome', 'N/D'),
-                                                item_data.get('Cédula', 'N/D'),
-                                                item_data.get('Conselho Regional', 'N/D'),
-                                                item_data.get('Morada', 'N/D'),
-                                                item_data.get('Estado', 'N/D'),
-                                                item_data.get('Email', 'N/D'),
-                                                item_data.get('Site', 'N/D'),
-                                                item_data.get('Tipo', tipo),
-                                                item_data.get('Localidade', 'N/D'),
-                                                item_data.get('Código Postal', 'N/D'),
-                                                item_data.get('Data de Inscrição', 'N/D'),
-                                                item_data.get('Telefone', 'N/D'),
-                                                item_data.get('Fax', 'N/D'))
-                                else:
-                                    insert_func(conn,
-                                                item_data.get('Nome', 'N/D'),
-                                                item_data.get('Cédula', 'N/D'),
-                                                item_data.get('Conselho Regional', 'N/D'),
-                                                item_data.get('Morada', 'N/D'),
-                                                item_data.get('Estado', 'N/D'),
-                                                item_data.get('Email', 'N/D'),
-                                                item_data.get('Site', 'N/D'),
-                                                item_data.get('Tipo', tipo),
-                                                item_data.get('Localidade', 'N/D'),
-                                                item_data.get('Código Postal', 'N/D'),
-                                                item_data.get('Telefone', 'N/D'),
-                                                item_data.get('Data de Inscrição', 'N/D'))
-                            all_data.append(item_data)
-                            print(f"✅ Item {item_data['Nome']} processado com sucesso!")
-                        except Exception as e:
-                            print(f"Erro ao processar item: {e}")
-                            logging.error(f"Erro ao processar item: {e}")
-                            continue
 
-                    try:
-                        next_button = driver.find_element(
-                            By.XPATH,
-                            '//a[contains(@class, "ws-pagination__nav") and .//span[contains(@class, "icon-chevron-right")]]'
-                        )
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-                        driver.execute_script("arguments[0].click();", next_button)
-                        time.sleep(random.uniform(3, 5))
-                    except NoSuchElementException:
-                        if tipo == 'advogado' and current_page >= 6:
-                            print(
-                                "Limite de fallback por URL atingido (página 6) para advogados. Encerrando paginação.")
-                            break
-                        print("Botão 'Próximo' não encontrado. Encerrando paginação.")
-                        break
-
-                    current_page += 1
-                    time.sleep(random.uniform(5, 10))
-
-                except WebDriverException as e:
-                    print(f"Erro ao processar página {current_page}: {e}")
-                    logging.error(f"Erro ao processar página {current_page}: {e}")
-                    attempts_without_data += 1
-                    if attempts_without_data >= max_attempts_without_data:
-                        print(f"⚠️ {max_attempts_without_data} páginas consecutivas sem dados. Encerrando paginação.")
-                        break
-                    current_page += 1
-                    continue
+class Tribunal(Registo):
+    __slots__ = CAMPOS = ('nome', 'morada', 'telefone', 'email', 'tipo')
+    COLUNAS = {'nome': 'Nome', 'morada': 'Morada', 'telefone': 'Telefone', 'email': 'Email', 'tipo': 'Tipo'}
 
-    except Exception as e:
-        print(f"Erro geral ao processar {base_url}: {e}")
-        logging.error(f"Erro geral ao processar {base_url}: {e}")
-        with open(f"error_page_{base_url.split('/')[-2]}.html", 'w', encoding='utf-8') as f:
-            f.write(driver.page_source)
 
-    if all_data:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"dados_{base_url.split('/')[-2]}_{timestamp}.csv"
-        save_to_csv(all_data, filename)
+# Classe do registo de cada tipo das listagens da OA
+CLASSES_OA = {'advogado': Advogado, 'sociedade': Sociedade, 'estagiario': Estagiario}
 
-    return all_data
 
+# Colunas dos coletores que ainda produzem dicionários soltos
+COLUNAS_ANGOLA = ('cidade', 'email', 'nome', 'telefone')
+COLUNAS_ATLAS = ('Email', 'Extra', 'Morada', 'Nome', 'Site', 'Telefone', 'Tipo')
 
-# Função para coletar dados do portal de advogados
-def coletar_advogados_lisboa(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=L&ce=&n=&lo=&m=&cp=&op=&o=0&page=1'
-    driver.get(base_url)
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
+# Esquema fixo do CSV global: a união das colunas de todas as entidades
+def colunas_todos_dados():
+    colunas = set(COLUNAS_ANGOLA) | set(COLUNAS_ATLAS)
+    for classe in (RegistoOA, AgenteExecucao, Tribunal):
+        colunas.update(classe.COLUNAS.values())
+    return sorted(colunas)
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+# Escritor de CSV em streaming, com esquema fixo; seguro entre threads
+class EscritorCSV:
+    """
+    Escreve registos (ou dicionários) num CSV à medida que chegam, sem os
+    guardar em memória. Colunas em falta ficam vazias; colunas fora do
+    esquema são ignoradas.
+
+    Args:
+        caminho: Ficheiro CSV a criar
+        colunas: Colunas do cabeçalho, pela ordem
+    """
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+    def __init__(self, caminho, colunas):
+        self.caminho = caminho
+        self.linhas = 0
+        self._lock = threading.Lock()
+        self._ficheiro = open(caminho, mode='w', newline='', encoding='utf-8-sig')
+        self._writer = csv.DictWriter(self._ficheiro, fieldnames=list(colunas), extrasaction='ignore')
+        self._writer.writeheader()
+
+    def escrever(self, item):
+        linha = item.como_dict() if isinstance(item, Registo) else item
+        with self._lock:
+            self._writer.writerow(linha)
+            self.linhas += 1
+
+    def flush(self):
+        with self._lock:
+            if not self._ficheiro.closed:
+                self._ficheiro.flush()
+
+    def fechar(self):
+        with self._lock:
+            if not self._ficheiro.closed:
+                self._ficheiro.close()
+
+
+# Saída de um coletor: substitui a lista all_data, escrevendo cada registo assim que é extraído
+class SaidaColetor:
+    """
+    Usa-se como a lista all_data (append, len, teste de verdade), mas cada
+    registo vai logo para o CSV do coletor e para o CSV global da execução;
+    em memória fica apenas a contagem. O ficheiro
+    <prefixo>_<coletor>_<timestamp>.csv só é criado com o primeiro registo; o
+    nome do coletor distingue as regiões de uma mesma entidade, que correm em
+    simultâneo. As saídas ainda abertas no fim de um coletor são fechadas pelo
+    agendador.
 
+    Args:
+        prefixo: Início do nome do ficheiro CSV
+        colunas: Esquema do CSV (por omissão, as colunas da classe do primeiro registo)
+    """
 
-def coletar_advogados_porto(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=P&ce=&n=&lo=&m=&cp=&a=on&op=&o=0&g-recaptcha-response='
-    driver.get(base_url)
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+    def __init__(self, prefixo, colunas=None):
+        coletor = coletor_atual()
+        self.prefixo = f"{prefixo}_{coletor}" if coletor else prefixo
+        self.colunas = colunas
+        self.caminho = None
+        self.linhas = 0
+        self._csv = None
+        saidas = getattr(_contexto, 'saidas', None)
+        if saidas is not None:
+            saidas.append(self)
+
+    def append(self, item):
+        if self._csv is None:
+            colunas = self.colunas or sorted(type(item).COLUNAS.values())
+            self.caminho = f"{self.prefixo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            self._csv = EscritorCSV(self.caminho, colunas)
+        self._csv.escrever(item)
+        if SAIDA_TODOS:
+            SAIDA_TODOS.escrever(item)
+        if SAIDA_PARQUET:
+            SAIDA_PARQUET.escrever(item)
+        self.linhas += 1
+
+    def __len__(self):
+        return self.linhas
+
+    # Chamado no fim de cada página: o que já foi extraído fica no disco mesmo que o processo morra
+    def flush(self):
+        if self._csv:
+            self._csv.flush()
+        if SAIDA_TODOS:
+            SAIDA_TODOS.flush()
+
+    def fechar(self):
+        if self._csv is None or self._csv._ficheiro.closed:
+            return
+        self._csv.fechar()
+        if SAIDA_PARQUET:
+            SAIDA_PARQUET.flush()
+        logging.info(f"Dados salvos em CSV: {self.caminho} ({self.linhas} linhas)")
+        print(f"📄 Dados salvos em CSV: {self.caminho} ({self.linhas} linhas)")
+
+
+# Exportação colunar: um dataset Parquet por entidade, particionado por conselho regional e data da execução
+class ExportadorParquet:
+    """
+    Acumula os registos por entidade em lotes de TAMANHO_LOTE_PARQUET e
+    escreve cada lote como ficheiros Parquet em <diretorio>/<entidade>/,
+    particionados (estilo Hive) por conselho_regional, quando a entidade o
+    tem, e por data_execucao. Os valores em falta, '' e 'N/D' ficam null, e
+    as datas dd/mm/aaaa passam a date.
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
+    Args:
+        diretorio: Pasta raiz dos datasets
+        data_execucao: Data da execução (por omissão, hoje)
+    """
 
+    ENTIDADES = {Advogado: 'advogados', Sociedade: 'sociedades', Estagiario: 'estagiarios',
+                 AgenteExecucao: 'agentes_execucao', Tribunal: 'tribunais'}
+    CAMPOS_DATA = ('data_inscricao', 'data_constituicao')
+
+    def __init__(self, diretorio, data_execucao=None):
+        self.diretorio = diretorio
+        self.data_execucao = data_execucao or datetime.now().date().isoformat()
+        self.id_execucao = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._lotes = {}  # classe -> [registos]
+        self._ficheiros = itertools.count()
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def escrever(self, registo):
+        classe = type(registo)
+        if classe not in self.ENTIDADES:
+            return
+        with self._lock:
+            lote = self._lotes.setdefault(classe, [])
+            lote.append(registo)
+            if len(lote) < TAMANHO_LOTE_PARQUET:
+                return
+            self._lotes[classe] = []
+        self._gravar(classe, lote)
+
+    def flush(self):
+        with self._lock:
+            lotes, self._lotes = self._lotes, {}
+        for classe, lote in lotes.items():
+            if lote:
+                self._gravar(classe, lote)
+
+    @staticmethod
+    def _valor(valor):
+        return None if valor in (None, '', 'N/D') else valor
+
+    @staticmethod
+    def _data(valor):
         try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
+            return datetime.strptime(valor, "%d/%m/%Y").date() if valor else None
+        except ValueError:
+            return None
+
+    def _gravar(self, classe, lote):
+        colunas = {}
+        for campo in classe.CAMPOS:
+            valores = [self._valor(getattr(registo, campo)) for registo in lote]
+            if campo in self.CAMPOS_DATA:
+                colunas[campo] = pa.array([self._data(v) for v in valores], type=pa.date32())
+            else:
+                colunas[campo] = pa.array(valores, type=pa.string())
+        colunas['data_execucao'] = pa.array([self.data_execucao] * len(lote), type=pa.string())
+        particoes = (['conselho_regional'] if 'conselho_regional' in classe.CAMPOS else []) + ['data_execucao']
+        entidade = self.ENTIDADES[classe]
+        try:
+            pq.write_to_dataset(pa.table(colunas), os.path.join(self.diretorio, entidade), partition_cols=particoes,
+                                basename_template=f"{self.id_execucao}-{next(self._ficheiros)}-{{i}}.parquet")
+            logging.info(f"Parquet: {len(lote)} registos de {entidade} gravados em {self.diretorio}")
+        except (pa.ArrowException, OSError) as e:
+            logging.error(f"Erro ao gravar {len(lote)} registos de {entidade} em Parquet: {e}")
+            print(f"❌ Erro ao gravar {len(lote)} registos de {entidade} em Parquet: {e}")
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+# Armazém de checkpoints da paginação, para retomar um coletor onde parou
+class ArmazemCheckpoints:
+    """
+    Guarda num ficheiro SQLite local, por coletor e base_url, a última página
+    concluída e as linhas gravadas até lá. Cada operação abre a sua conexão,
+    para poder ser usado pelas várias threads do agendador.
 
+    Args:
+        caminho: Ficheiro SQLite onde ficam os checkpoints
+    """
 
-def coletar_advogados_coimbra(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=C&ce=&n=&lo=&m=&cp=&a=on&op=&o=0&g-recaptcha-response='
-    driver.get(base_url)
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+    def __init__(self, caminho=FICHEIRO_ESTADO):
+        self.caminho = caminho
+        with self._conectar() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    coletor TEXT NOT NULL,
+                    base_url TEXT NOT NULL,
+                    ultima_pagina INTEGER NOT NULL DEFAULT 0,
+                    linhas INTEGER NOT NULL DEFAULT 0,
+                    concluido INTEGER NOT NULL DEFAULT 0,
+                    atualizado_em TEXT,
+                    PRIMARY KEY (coletor, base_url)
+                )
+            """)
+
+    def _conectar(self):
+        return contextlib.closing(sqlite3.connect(self.caminho, timeout=30))
+
+    def obter(self, coletor, base_url):
+        with self._conectar() as db:
+            linha = db.execute(
+                "SELECT ultima_pagina, linhas, concluido FROM checkpoints WHERE coletor = ? AND base_url = ?",
+                (coletor, base_url)).fetchone()
+        if not linha:
+            return None
+        return {'ultima_pagina': linha[0], 'linhas': linha[1], 'concluido': bool(linha[2])}
+
+    def _gravar(self, sql, parametros):
+        with self._conectar() as db, db:
+            db.execute(sql, parametros)
+
+    def registar_pagina(self, coletor, base_url, pagina, linhas):
+        self._gravar("""
+            INSERT INTO checkpoints (coletor, base_url, ultima_pagina, linhas, concluido, atualizado_em)
+            VALUES (?, ?, ?, ?, 0, ?)
+            ON CONFLICT (coletor, base_url) DO UPDATE SET
+                ultima_pagina = excluded.ultima_pagina, linhas = excluded.linhas,
+                concluido = 0, atualizado_em = excluded.atualizado_em
+        """, (coletor, base_url, pagina, linhas, datetime.now().isoformat(timespec='seconds')))
+
+    def concluir(self, coletor, base_url):
+        self._gravar("""
+            INSERT INTO checkpoints (coletor, base_url, concluido, atualizado_em) VALUES (?, ?, 1, ?)
+            ON CONFLICT (coletor, base_url) DO UPDATE SET concluido = 1, atualizado_em = excluded.atualizado_em
+        """, (coletor, base_url, datetime.now().isoformat(timespec='seconds')))
+
+    def reiniciar(self, coletor, base_url=None):
+        if base_url is None:
+            self._gravar("DELETE FROM checkpoints WHERE coletor = ?", (coletor,))
+        else:
+            self._gravar("DELETE FROM checkpoints WHERE coletor = ? AND base_url = ?", (coletor, base_url))
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
+# Deteção de alterações entre execuções: impressão (hash) de cada linha, guardada por chave natural
+class DetetorAlteracoes:
+    """
+    Guarda, no ficheiro SQLite de estado, a impressão de cada linha gravada
+    na base de dados (só depois do commit do lote), identificada pela chave natural da tabela
+    (CHAVES_NATURAIS); as linhas sem chave conhecida não passam pelo detetor. Numa execução
+    seguinte só as linhas novas ou alteradas seguem para a base de dados; as
+    que um coletor completo deixou de ver são dadas como removidas. Todas as
+    alterações vão para o CSV alteracoes_<timestamp>.csv.
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+    Cada thread usa a sua conexão SQLite em autocommit; com WAL e
+    synchronous=NORMAL cada escrita é barata e não prende as outras threads.
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+    Args:
+        caminho: Ficheiro SQLite de estado
+        ficheiro_alteracoes: CSV onde é escrito o registo de alterações
+    """
 
+    COLUNAS_ALTERACOES = ('data', 'coletor', 'tabela', 'chave', 'alteracao')
+
+    def __init__(self, caminho=FICHEIRO_ESTADO, ficheiro_alteracoes=None):
+        self.caminho = caminho
+        self.id_execucao = uuid.uuid4().hex
+        self._local = threading.local()
+        self._contagens = {}  # coletor -> {'novo': n, 'alterado': n, 'inalterado': n}
+        self._lock = threading.Lock()
+        self.alteracoes = EscritorCSV(
+            ficheiro_alteracoes or f"alteracoes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            self.COLUNAS_ALTERACOES)
+        with contextlib.closing(sqlite3.connect(caminho, timeout=30)) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS impressoes_registos (
+                    tabela TEXT NOT NULL,
+                    chave TEXT NOT NULL,
+                    coletor TEXT,
+                    impressao TEXT NOT NULL,
+                    visto_em TEXT,
+                    atualizado_em TEXT,
+                    pagina TEXT,
+                    PRIMARY KEY (tabela, chave)
+                )
+            """)
+            # Ficheiros de estado anteriores à cache de páginas não têm a coluna pagina
+            colunas = {linha[1] for linha in db.execute("PRAGMA table_info(impressoes_registos)")}
+            if 'pagina' not in colunas:
+                db.execute("ALTER TABLE impressoes_registos ADD COLUMN pagina TEXT")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_impressoes_coletor ON impressoes_registos (coletor)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_impressoes_pagina ON impressoes_registos (pagina)")
+            # Estados antigos identificavam as linhas sem chave pela impressão ('#...'); essas já não são seguidas
+            db.execute("DELETE FROM impressoes_registos WHERE chave LIKE '#%'")
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def _normalizar(valor):
+        return '' if valor is None else ' '.join(str(valor).split()).lower()
+
+    # Chave natural da linha (CHAVES_NATURAIS); None se a tabela não a tem ou algum valor é desconhecido
+    @staticmethod
+    def chave_natural(tabela, dados):
+        colunas = COLUNAS_TABELAS.get(tabela, ())
+        valores = [dados[colunas.index(coluna)] for coluna in CHAVES_NATURAIS.get(tabela, ())]
+        if not valores or any(_valor_chave(v) is None for v in valores):
+            return None
+        return '|'.join(str(v) for v in valores)
+
+    def _contar(self, coletor, alteracao):
+        with self._lock:
+            contagem = self._contagens.setdefault(coletor, {'novo': 0, 'alterado': 0, 'inalterado': 0})
+            contagem[alteracao] += 1
+
+    def _registar_alteracao(self, coletor, tabela, chave, alteracao):
+        self.alteracoes.escrever({'data': datetime.now().isoformat(timespec='seconds'), 'coletor': coletor,
+                                  'tabela': tabela, 'chave': chave, 'alteracao': alteracao})
+
+    # Compara a linha com a impressão guardada. Devolve None se não mudou; se é nova ou mudou (e portanto tem de
+    # ser gravada), devolve a impressão pendente, a passar a guardar_impressoes depois de a linha ser gravada.
+    # Só para linhas com chave natural (ver chave_natural)
+    def registar(self, tabela, dados):
+        coletor = coletor_atual() or ''
+        pagina = getattr(_contexto, 'pagina', None)
+        impressao = hashlib.blake2b('\x1f'.join(self._normalizar(v) for v in dados).encode('utf-8'),
+                                    digest_size=16).hexdigest()
+        chave = self.chave_natural(tabela, dados)
+        db = self._db()
+        linha = db.execute("SELECT impressao FROM impressoes_registos WHERE tabela = ? AND chave = ?",
+                           (tabela, chave)).fetchone()
+        agora = datetime.now().isoformat(timespec='seconds')
+        if linha is not None and linha[0] == impressao:
+            db.execute("""
+                UPDATE impressoes_registos SET visto_em = ?, coletor = ?, pagina = ? WHERE tabela = ? AND chave = ?
+            """, (self.id_execucao, coletor, pagina, tabela, chave))
+            self._contar(coletor, 'inalterado')
+            return None
+
+        if linha is None:
+            alteracao = 'novo'
+        else:
+            # A linha foi vista (não conta como removida), mas a impressão antiga fica até a nova estar gravada
+            alteracao = 'alterado'
+            db.execute("""
+                UPDATE impressoes_registos SET visto_em = ?, coletor = ?, pagina = ? WHERE tabela = ? AND chave = ?
+            """, (self.id_execucao, coletor, pagina, tabela, chave))
+        return tabela, chave, coletor, impressao, agora, pagina, alteracao
+
+    # Guarda as impressões pendentes de linhas já gravadas na base de dados e regista as alterações
+    def guardar_impressoes(self, impressoes):
+        self._db().executemany("""
+            INSERT INTO impressoes_registos (tabela, chave, coletor, impressao, visto_em, atualizado_em, pagina)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (tabela, chave) DO UPDATE SET
+                coletor = excluded.coletor, impressao = excluded.impressao, visto_em = excluded.visto_em,
+                atualizado_em = excluded.atualizado_em, pagina = excluded.pagina
+        """, [(tabela, chave, coletor, impressao, self.id_execucao, agora, pagina)
+              for tabela, chave, coletor, impressao, agora, pagina, _ in impressoes])
+        for tabela, chave, coletor, _, _, _, alteracao in impressoes:
+            self._contar(coletor, alteracao)
+            self._registar_alteracao(coletor, tabela, chave, alteracao)
+
+    # Dá como vistas nesta execução as linhas de uma página saltada pela cache de páginas; devolve quantas
+    def marcar_pagina_vista(self, url):
+        cursor = self._db().execute("UPDATE impressoes_registos SET visto_em = ? WHERE pagina = ?",
+                                    (self.id_execucao, url))
+        coletor = coletor_atual() or ''
+        with self._lock:
+            contagem = self._contagens.setdefault(coletor, {'novo': 0, 'alterado': 0, 'inalterado': 0})
+            contagem['inalterado'] += cursor.rowcount
+        return cursor.rowcount
+
+    # Chamado no fim de cada página e de cada coletor: o registo de alterações fica no disco
+    def confirmar(self):
+        self.alteracoes.flush()
+
+    # Fecha o coletor: com detetar_removidos, as linhas dele não vistas nesta execução são dadas como removidas
+    def concluir_coletor(self, coletor, detetar_removidos=True):
+        self.confirmar()
+        removidos = 0
+        if detetar_removidos:
+            with contextlib.closing(sqlite3.connect(self.caminho, timeout=30)) as db, db:
+                linhas = db.execute("""
+                    SELECT tabela, chave FROM impressoes_registos
+                    WHERE coletor = ? AND (visto_em IS NULL OR visto_em != ?)
+                """, (coletor, self.id_execucao)).fetchall()
+                for tabela, chave in linhas:
+                    self._registar_alteracao(coletor, tabela, chave, 'removido')
+                db.executemany("DELETE FROM impressoes_registos WHERE tabela = ? AND chave = ?", linhas)
+                removidos = len(linhas)
+            self.alteracoes.flush()
+        contagem = self._contagens.get(coletor, {'novo': 0, 'alterado': 0, 'inalterado': 0})
+        total = sum(contagem.values())
+        resumo = (f"{coletor}: {contagem['novo']} novos, {contagem['alterado']} alterados, "
+                  f"{contagem['inalterado']} inalterados, {removidos} removidos")
+        if total:
+            resumo += f" ({(contagem['novo'] + contagem['alterado']) / total:.0%} das linhas gravadas)"
+        logging.info(f"Alterações — {resumo}")
+        print(f"🔁 Alterações — {resumo}")
+
+    def fechar(self):
+        self.confirmar()
+        self.alteracoes.fechar()
+
+
+# Cache de páginas entre execuções: impressão do bloco de resultados de cada URL de página
+class CachePaginas:
+    """
+    Guarda, no ficheiro SQLite de estado, a impressão dos resultados de cada
+    página (os <article> da listagem e a presença do botão 'Próximo'), com o
+    número de itens da página. Uma página cuja impressão não mudou desde a
+    execução anterior é saltada sem parse nem inserções.
 
-def coletar_advogados_evora(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=E&ce=&n=&lo=&m=&cp=&a=on&op=&o=0&g-recaptcha-response='
-    driver.get(base_url)
+    Args:
+        caminho: Ficheiro SQLite de estado
+    """
+
+    def __init__(self, caminho=FICHEIRO_ESTADO):
+        self.caminho = caminho
+        self._contagens = {}  # coletor -> {'saltadas': n, 'processadas': n}
+        self._lock = threading.Lock()
+        with self._conectar() as db, db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS cache_paginas (
+                    url TEXT PRIMARY KEY,
+                    coletor TEXT,
+                    impressao TEXT NOT NULL,
+                    itens INTEGER NOT NULL DEFAULT 0,
+                    tem_seguinte INTEGER NOT NULL DEFAULT 0,
+                    atualizado_em TEXT
+                )
+            """)
+
+    def _conectar(self):
+        return contextlib.closing(sqlite3.connect(self.caminho, timeout=30))
+
+    # Impressão do HTML de uma página de resultados, sem o interpretar; None se não tem resultados
+    @staticmethod
+    def impressao(html):
+        if not html:
+            return None
+        artigos = RE_ARTIGOS_OA.findall(html)
+        if not artigos:
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        for artigo in artigos:
+            h.update(artigo.encode('utf-8'))
+        h.update(b'>' if RE_PAGINA_SEGUINTE_OA.search(html) else b'.')
+        return h.hexdigest()
+
+    def obter(self, url):
+        with self._conectar() as db:
+            linha = db.execute("SELECT impressao, itens, tem_seguinte FROM cache_paginas WHERE url = ?",
+                               (url,)).fetchone()
+        if not linha:
+            return None
+        return {'impressao': linha[0], 'itens': linha[1], 'tem_seguinte': bool(linha[2])}
+
+    def registar(self, url, impressao, itens, tem_seguinte):
+        with self._conectar() as db, db:
+            db.execute("""
+                INSERT INTO cache_paginas (url, coletor, impressao, itens, tem_seguinte, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    coletor = excluded.coletor, impressao = excluded.impressao, itens = excluded.itens,
+                    tem_seguinte = excluded.tem_seguinte, atualizado_em = excluded.atualizado_em
+            """, (url, coletor_atual(), impressao, itens, int(tem_seguinte),
+                  datetime.now().isoformat(timespec='seconds')))
+
+    def contar(self, saltada):
+        with self._lock:
+            contagem = self._contagens.setdefault(coletor_atual() or '', {'saltadas': 0, 'processadas': 0})
+            contagem['saltadas' if saltada else 'processadas'] += 1
+
+    # Resumo da taxa de páginas saltadas de um coletor; None se o coletor não passou pela cache
+    def resumo(self, coletor):
+        contagem = self._contagens.get(coletor)
+        if not contagem:
+            return None
+        total = contagem['saltadas'] + contagem['processadas']
+        return (f"{coletor}: {contagem['saltadas']} de {total} páginas sem alterações e saltadas "
+                f"({contagem['saltadas'] / total:.0%})")
+
+
+# Arquivo local das páginas de resultados obtidas, endereçado pelo conteúdo
+class ArquivoHTML:
+    """
+    Guarda o HTML de cada página de resultados em `diretorio/objetos`, num
+    ficheiro comprimido (zstd, ou gzip sem o zstandard) cujo nome é o SHA-256
+    do conteúdo: páginas iguais, na mesma ou noutra execução, ocupam um só
+    ficheiro. O índice `diretorio/indice.sqlite3` liga cada obtenção
+    (execução, coletor, url, página, data) ao hash do seu conteúdo.
+
+    Args:
+        diretorio: Pasta do arquivo (criada se não existir)
+        execucao: Identificador da execução (padrão: timestamp atual)
+    """
+
+    def __init__(self, diretorio, execucao=None):
+        self.diretorio = diretorio
+        self.execucao = execucao or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.caminho_indice = os.path.join(diretorio, 'indice.sqlite3')
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.paginas = 0
+        self.objetos_novos = 0
+        self.bytes_escritos = 0
+        os.makedirs(os.path.join(diretorio, 'objetos'), exist_ok=True)
+        with contextlib.closing(sqlite3.connect(self.caminho_indice, timeout=30)) as db, db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS paginas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    execucao TEXT NOT NULL,
+                    coletor TEXT,
+                    url TEXT NOT NULL,
+                    pagina INTEGER,
+                    obtido_em TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_paginas_execucao ON paginas (execucao, coletor)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_paginas_hash ON paginas (hash)")
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.caminho_indice, timeout=30, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _caminho_objeto(self, hash_conteudo, extensao):
+        return os.path.join(self.diretorio, 'objetos', hash_conteudo[:2], f"{hash_conteudo}.html{extensao}")
+
+    @staticmethod
+    def _comprimir(dados):
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=10).compress(dados), '.zst'
+        return gzip.compress(dados, compresslevel=6), '.gz'
+
+    # Guarda o HTML (se o conteúdo ainda não estiver no arquivo) e regista a obtenção no índice; devolve o hash
+    def guardar(self, url, html, pagina=None, coletor=None):
+        dados = html.encode('utf-8')
+        hash_conteudo = hashlib.sha256(dados).hexdigest()
+        if not any(os.path.exists(self._caminho_objeto(hash_conteudo, ext)) for ext in ('.zst', '.gz')):
+            comprimido, extensao = self._comprimir(dados)
+            destino = self._caminho_objeto(hash_conteudo, extensao)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            # Escrita atómica: um objeto nunca fica meio escrito se o processo for interrompido
+            temporario = f"{destino}.{threading.get_ident()}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(comprimido)
+            os.replace(temporario, destino)
+            with self._lock:
+                self.objetos_novos += 1
+                self.bytes_escritos += len(comprimido)
+        self._db().execute("""
+            INSERT INTO paginas (execucao, coletor, url, pagina, obtido_em, hash, tamanho)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (self.execucao, coletor or coletor_atual(), url, pagina, datetime.now().isoformat(timespec='seconds'),
+              hash_conteudo, len(dados)))
+        with self._lock:
+            self.paginas += 1
+        return hash_conteudo
+
+    # Lê e descomprime o HTML de um objeto do arquivo
+    def ler(self, hash_conteudo):
+        return self.ler_objeto(self.diretorio, hash_conteudo)
+
+    # Versão sem instância, para os processos do reparse lerem objetos sem abrirem o índice
+    @staticmethod
+    def ler_objeto(diretorio, hash_conteudo):
+        base = os.path.join(diretorio, 'objetos', hash_conteudo[:2], f"{hash_conteudo}.html")
+        if os.path.exists(base + '.zst'):
+            if zstandard is None:
+                raise RuntimeError(f"O objeto {hash_conteudo} está em zstd e o zstandard não está instalado")
+            with open(base + '.zst', 'rb') as f:
+                return zstandard.ZstdDecompressor().decompress(f.read()).decode('utf-8')
+        with gzip.open(base + '.gz', 'rb') as f:
+            return f.read().decode('utf-8')
+
+    # Execução mais recente registada no índice
+    def ultima_execucao(self):
+        with contextlib.closing(sqlite3.connect(self.caminho_indice, timeout=30)) as db:
+            return db.execute("SELECT MAX(execucao) FROM paginas").fetchone()[0]
+
+    # Entradas do índice (execucao, coletor, url, pagina, obtido_em, hash), da execução indicada ou de todas
+    def entradas(self, execucao=None, coletor=None):
+        sql = "SELECT execucao, coletor, url, pagina, obtido_em, hash FROM paginas WHERE 1 = 1"
+        parametros = []
+        if execucao:
+            sql += " AND execucao = ?"
+            parametros.append(execucao)
+        if coletor:
+            sql += " AND coletor = ?"
+            parametros.append(coletor)
+        with contextlib.closing(sqlite3.connect(self.caminho_indice, timeout=30)) as db:
+            return db.execute(sql + " ORDER BY id", parametros).fetchall()
+
+    def resumo(self):
+        return (f"{self.paginas} páginas arquivadas, {self.objetos_novos} objetos novos "
+                f"({self.bytes_escritos / 1024 / 1024:.1f} MB comprimidos) em {self.diretorio}")
+
+
+# Guarda uma página obtida no arquivo de HTML, se estiver ativo (--arquivo-html)
+def arquivar_html(url, html, pagina=None):
+    if not ARQUIVO_HTML or not html:
+        return
     try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+        ARQUIVO_HTML.guardar(url, html, pagina)
+    except (OSError, sqlite3.Error) as e:
+        # O arquivo é acessório: uma falha a escrevê-lo não pode parar a coleta
+        logging.warning(f"Não foi possível arquivar o HTML de {url}: {e}")
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
+# Contexto da thread: nome do coletor em execução (usado pelos checkpoints e estatísticas)
+_contexto = threading.local()
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+def coletor_atual():
+    return getattr(_contexto, 'coletor', None)
 
 
-def coletar_advogados_faro(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=F&ce=&n=&lo=&m=&cp=&a=on&op=&o=0&g-recaptcha-response='
-    driver.get(base_url)
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+# Marca a listagem do coletor como completa. Por omissão uma listagem conta como incompleta, e só uma listagem
+# completa serve para o detetor de alterações dar registos como removidos
+def listagem_completa():
+    _contexto.listagem_incompleta = False
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
+# Pedido de paragem (SIGTERM ou Ctrl+C): os coletores verificam-no entre páginas e terminam sem acabar a listagem
+PARAGEM = threading.Event()
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+def paragem_pedida():
+    return PARAGEM.is_set()
 
 
-def coletar_advogados_madeira(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=M&ce=&n=&lo=&m=&cp=&a=on&op=&o=0&g-recaptcha-response='
-    driver.get(base_url)
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+# Controlador de ritmo de um coletor: substitui os time.sleep fixos por pausas adaptativas
+class ControladorRitmo:
+    """
+    Calcula as pausas entre ações de um coletor. Cada pausa é sorteada entre
+    `minimo` e `maximo` e multiplicada pelo fator atual, que desce com as
+    respostas rápidas (até FATOR_RITMO_MIN), sobe com as lentas e sobe
+    exponencialmente com as falhas (até FATOR_RITMO_MAX). Regista o tempo
+    total passado em pausa.
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
+    Args:
+        nome: Nome do coletor
+    """
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
+    def __init__(self, nome):
+        self.nome = nome
+        self.fator = 1.0
+        self.tempo_em_pausa = 0.0
+        self.pausas = 0
+        self.sucessos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+    def _contar_pausa(self, espera):
+        with self._lock:
+            self.tempo_em_pausa += espera
+            self.pausas += 1
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+    def pausar(self, minimo, maximo=None):
+        espera = (random.uniform(minimo, maximo) if maximo is not None else minimo) * self.fator
+        self._contar_pausa(espera)
+        time.sleep(espera)
 
+    # Pausa extra (em segundos) a aplicar quando o coletor está em recuo; 0 em ritmo normal
+    def recuo(self, minimo=2, maximo=4):
+        if self.fator <= 1.0:
+            return 0.0
+        espera = random.uniform(minimo, maximo) * (self.fator - 1.0)
+        self._contar_pausa(espera)
+        return espera
 
-def coletar_advogados_acores(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=A&ce=&n=&lo=&m=&cp=&a=on&op=&o=0&g-recaptcha-response='
-    driver.get(base_url)
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+    # Regista uma resposta sem erros que demorou `duracao` segundos
+    def sucesso(self, duracao):
+        with self._lock:
+            self.sucessos += 1
+            if duracao < RESPOSTA_RAPIDA:
+                self.fator = max(FATOR_RITMO_MIN, self.fator * REDUCAO_RITMO)
+            elif duracao >= RESPOSTA_LENTA:
+                self.fator = min(FATOR_RITMO_MAX, max(1.0, self.fator) * AUMENTO_RITMO_LENTO)
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
+    def falha(self, motivo=''):
+        with self._lock:
+            self.falhas += 1
+            self.fator = min(FATOR_RITMO_MAX, max(1.0, self.fator) * AUMENTO_RITMO)
+        logging.warning(f"{self.nome}: {motivo or 'falha'}; fator de ritmo passa a {self.fator:.2f}")
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
+    def resumo(self):
+        return (f"{self.nome}: {self.tempo_em_pausa:.0f}s em pausa ({self.pausas} pausas), "
+                f"{self.sucessos} sucessos, {self.falhas} falhas, fator final {self.fator:.2f}")
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,  
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+_ritmos = {}
+_ritmos_lock = threading.Lock()
 
 
-def coletar_advogados_braga(driver, conn):
-    logging.info("Iniciando scraping de advogados...")
-    print("🔎 Iniciando scraping de advogados...")
-    base_url = 'https://portal.oa.pt/advogados/pesquisa-de-advogados/?l=&cg=&ce=&n=&lo=BRAGA&m=&cp=&a=on&op=&o=0&g-recaptcha-response='
-    driver.get(base_url)
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+# Devolve o controlador de ritmo de um coletor (por omissão, o da thread atual)
+def obter_ritmo(coletor=None):
+    nome = coletor or coletor_atual() or 'geral'
+    with _ritmos_lock:
+        ritmo = _ritmos.get(nome)
+        if ritmo is None:
+            ritmo = ControladorRitmo(nome)
+            _ritmos[nome] = ritmo
+        return ritmo
 
-        try:
-            apenas_ativos = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH,
-                                            "//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | //input[@type='checkbox' and contains(@id, 'ativos')]"))
-            )
-            if not apenas_ativos.is_selected():
-                driver.execute_script("arguments[0].click();", apenas_ativos)
-                logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
-                print("Opção 'Apenas Ativos' marcada com sucesso!")
-        except Exception as e:
-            logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
-            print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.warning(f"Erro ao clicar no botão de pesquisa: {e}")
-            print(f"Erro ao clicar no botão de pesquisa: {e}")
+# Atalhos usados pelos coletores em vez de time.sleep
+def pausar(minimo, maximo=None):
+    obter_ritmo().pausar(minimo, maximo)
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_advogado, conn=conn)
+def registar_sucesso(duracao):
+    obter_ritmo().sucesso(duracao)
 
 
-# Função para coletar dados de sociedades de advogados
-def coletar_sociedades_lisboa(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados de lisboa...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=L&r=&n=&lo=&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+def registar_falha(motivo=''):
+    obter_ritmo().falha(motivo)
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+# Configurações do Selenium
+_chromedriver_lock = threading.Lock()
+_caminho_chromedriver = None
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
+# Lê a versão de um executável do chromedriver ('ChromeDriver 120.0.6099.109 (...)' -> '120.0.6099.109')
+def versao_chromedriver(caminho):
+    try:
+        saida = subprocess.run([caminho, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    partes = saida.split()
+    return partes[1] if len(partes) > 1 else None
 
 
-def coletar_sociedades_porto(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados do porto...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=P&r=&n=&lo=&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+def _ficheiro_manifesto_chromedriver():
+    return os.path.join(DIRETORIO_CHROMEDRIVER, 'manifesto.json')
 
+
+def _ler_manifesto_chromedriver():
     try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+        with open(_ficheiro_manifesto_chromedriver(), encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifesto if os.path.isfile(manifesto.get('caminho') or '') else None
+
+
+# Regista na cache local o chromedriver instalado, para as execuções seguintes não irem à rede
+def _gravar_manifesto_chromedriver(caminho, versao):
+    os.makedirs(DIRETORIO_CHROMEDRIVER, exist_ok=True)
+    temporario = f"{_ficheiro_manifesto_chromedriver()}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao': versao, 'caminho': os.path.abspath(caminho),
+                   'instalado_em': datetime.now().isoformat(timespec='seconds')}, f, indent=2)
+    os.replace(temporario, _ficheiro_manifesto_chromedriver())
+
+
+# Devolve (caminho, origem) do chromedriver a usar, sem rede sempre que a cache serve
+def _resolver_chromedriver():
+    if CHROMEDRIVER:
+        if not os.path.isfile(CHROMEDRIVER):
+            raise WebDriverException(f"chromedriver não encontrado em {CHROMEDRIVER}")
+        return CHROMEDRIVER, "caminho pré-instalado"
+
+    manifesto = _ler_manifesto_chromedriver()
+    # A versão fixada pode ser parcial ('120' ou '120.0.6099')
+    fixada = VERSAO_CHROMEDRIVER
+    if manifesto and (not fixada or manifesto['versao'] == fixada or manifesto['versao'].startswith(f"{fixada}.")):
+        return manifesto['caminho'], f"cache local, versão {manifesto['versao']}"
+
+    if MODO_OFFLINE_DRIVER:
+        if manifesto:
+            logging.warning(f"Modo offline: a versão fixada {VERSAO_CHROMEDRIVER} não está na cache; "
+                            f"a usar a versão {manifesto['versao']}")
+            return manifesto['caminho'], f"cache local, versão {manifesto['versao']} (offline)"
+        caminho = shutil.which('chromedriver')
+        if caminho:
+            return caminho, "PATH (offline)"
+        raise WebDriverException(f"Modo offline sem chromedriver: indique --chromedriver ou instale-o em "
+                                 f"{DIRETORIO_CHROMEDRIVER} (manifesto.json) ou no PATH")
+
+    if ChromeDriverManager is None:
+        raise WebDriverException("O pacote webdriver-manager não está instalado; indique --chromedriver")
+    caminho = ChromeDriverManager(driver_version=VERSAO_CHROMEDRIVER,
+                                  cache_manager=DriverCacheManager(root_dir=DIRETORIO_CHROMEDRIVER)).install()
+    versao = versao_chromedriver(caminho) or VERSAO_CHROMEDRIVER or 'desconhecida'
+    _gravar_manifesto_chromedriver(caminho, versao)
+    return caminho, f"download pelo webdriver-manager, versão {versao}"
+
+
+# Resolve o chromedriver uma vez por execução; os workers seguintes reutilizam o caminho
+def resolver_chromedriver():
+    global _caminho_chromedriver
+    # Vários workers podem arrancar ao mesmo tempo; a resolução (e um eventual download) não pode ser concorrente
+    with _chromedriver_lock:
+        if _caminho_chromedriver is None:
+            inicio = time.monotonic()
+            _caminho_chromedriver, origem = _resolver_chromedriver()
+            logging.info(f"chromedriver resolvido em {time.monotonic() - inicio:.2f}s ({origem}): "
+                         f"{_caminho_chromedriver}")
+            print(f"🧭 chromedriver: {origem} ({time.monotonic() - inicio:.2f}s)")
+        return _caminho_chromedriver
+
+
+# Descarta o chromedriver da cache quando o Chrome o recusa (tipicamente depois de uma atualização do Chrome),
+# para a resolução seguinte descarregar o que corresponde ao browser instalado. Devolve False quando não há
+# nada a resolver de novo: caminho ou versão indicados pelo utilizador, ou modo offline
+def invalidar_chromedriver(caminho, erro):
+    global _caminho_chromedriver
+    if CHROMEDRIVER or VERSAO_CHROMEDRIVER or MODO_OFFLINE_DRIVER:
+        return False
+    with _chromedriver_lock:
+        # Outro worker pode já ter descartado este chromedriver e resolvido um novo
+        if _caminho_chromedriver == caminho:
+            logging.warning(f"O Chrome recusou o chromedriver {caminho} ({erro.msg}); a descarregar de novo")
+            print("⚠️ O Chrome recusou o chromedriver da cache (Chrome atualizado?); a descarregar de novo...")
+            try:
+                os.remove(_ficheiro_manifesto_chromedriver())
+            except FileNotFoundError:
+                pass
+            _caminho_chromedriver = None
+    return True
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+_captcha_lock = threading.Lock()  # Uma janela de CAPTCHA de cada vez, para um só humano
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
 
+def configurar_driver(headless=False, perfil=None):
+    perfil = perfil or PERFIL_DRIVER
+    rapido = perfil == 'rapido'
+    headless = headless or rapido
+    options = Options()
+    if headless:
+        options.add_argument('--headless=new')
+        # Sem janela o viewport é pequeno; os elementos do formulário têm de estar visíveis para serem clicáveis
+        options.add_argument('--window-size=1366,900')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option('excludeSwitches', ['enable-automation'])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f'user-agent={USER_AGENT}')
+    if rapido:
+        # O driver devolve o controlo com o DOM pronto, sem esperar por imagens e subrecursos
+        options.page_load_strategy = 'eager'
+        for argumento in ('--disable-gpu', '--disable-extensions', '--disable-dev-shm-usage', '--mute-audio',
+                          '--no-first-run', '--disable-default-apps', '--disable-sync',
+                          '--disable-background-networking', '--disable-notifications',
+                          '--blink-settings=imagesEnabled=false'):
+            options.add_argument(argumento)
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+    try:
+        inicio = time.monotonic()
+        caminho_driver = resolver_chromedriver()
+        resolvido = time.monotonic()
+        try:
+            driver = webdriver.Chrome(service=Service(caminho_driver), options=options)
+        except SessionNotCreatedException as e:
+            # O manifesto da cache não acompanha as atualizações do Chrome; tenta uma vez com um chromedriver novo
+            if not invalidar_chromedriver(caminho_driver, e):
+                raise
+            caminho_driver = resolver_chromedriver()
+            resolvido = time.monotonic()
+            driver = webdriver.Chrome(service=Service(caminho_driver), options=options)
+        driver.sem_janela = headless
+        if rapido:
+            _bloquear_recursos(driver)
+        fim = time.monotonic()
+        logging.info(f"WebDriver ({perfil}{', headless' if headless else ''}) pronto em {fim - inicio:.2f}s: "
+                     f"chromedriver {resolvido - inicio:.2f}s, arranque do Chrome {fim - resolvido:.2f}s")
+        return driver
+    except WebDriverException as e:
+        logging.error(f"Erro ao configurar o WebDriver: {e}")
+        print(f"Erro ao configurar o WebDriver: {e}")
+        return None
 
-def coletar_sociedades_coimbra(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados de coimbra...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=C&r=&n=&lo=&m=&cp=&op=&o=0&page=1"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
 
+# Bloqueia, via CDP, os pedidos de imagens, media, fontes e scripts de terceiros
+def _bloquear_recursos(driver):
     try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(URLS_BLOQUEADOS)})
+    except WebDriverException as e:
+        logging.warning(f"Não foi possível bloquear recursos via CDP (continuando sem bloqueio): {e}")
+
+
+# Backend de fetch HTTP direto: sessão keep-alive partilhada pelas páginas de um coletor
+class BuscadorHTTP:
+    """
+    Obtém páginas de resultados por GET numa sessão requests com pool de
+    conexões keep-alive, sem passar pelo Chrome. Os cookies da sessão do
+    Selenium são copiados para que o servidor veja a mesma sessão.
 
+    Args:
+        timeout: Tempo máximo, em segundos, de cada pedido
+    """
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self.ritmo = None
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                max_retries=Retry(total=2, backoff_factor=1, status_forcelist=[502, 503, 504]))
+        self.sessao.mount('https://', adaptador)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'pt-PT,pt;q=0.9,en;q=0.8',
+        })
+
+    def sincronizar_cookies(self, driver):
         try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+            for cookie in driver.get_cookies():
+                self.sessao.cookies.set(cookie['name'], cookie['value'],
+                                        domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        except WebDriverException as e:
+            logging.warning(f"Não foi possível copiar os cookies do WebDriver: {e}")
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+    def obter(self, url):
+        try:
+            inicio = time.monotonic()
+            resposta = self.sessao.get(url, timeout=self.timeout)
+            duracao = time.monotonic() - inicio
+        except requests.RequestException as e:
+            logging.warning(f"Erro no fetch HTTP de {url}: {e}")
+            self._sinalizar(f"erro HTTP ({type(e).__name__})")
+            return None
+        if resposta.status_code != 200:
+            logging.warning(f"Fetch HTTP de {url} devolveu o estado {resposta.status_code}")
+            self._sinalizar(f"HTTP {resposta.status_code}")
+            return None
+        self._sinalizar('CAPTCHA' if tem_captcha(resposta.text) else None, duracao)
+        return resposta.text
+
+    def _sinalizar(self, falha, duracao=None):
+        if self.ritmo is None:
+            return
+        if falha:
+            self.ritmo.falha(falha)
+        else:
+            self.ritmo.sucesso(duracao)
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
 
+# Devolve o BuscadorHTTP da thread atual (None se o requests não estiver instalado)
+def obter_buscador_http(driver=None):
+    if requests is None:
+        return None
+    buscador = getattr(_contexto, 'buscador_http', None)
+    if buscador is None:
+        buscador = BuscadorHTTP()
+        _contexto.buscador_http = buscador
+    buscador.ritmo = obter_ritmo()
+    if driver is not None:
+        buscador.sincronizar_cookies(driver)
+    return buscador
+
+
+# Limitador de taxa por host (token bucket), seguro entre threads e event loops
+class LimitadorTaxa:
+    """
+    Token bucket implementado como GCRA: cada pedido reserva o seu instante
+    de partida, pelo que threads e event loops diferentes podem partilhar o
+    mesmo limitador sem locks do asyncio.
 
-def coletar_sociedades_evora(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados de evora...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=E&r=&n=&lo=&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+    Args:
+        taxa: Pedidos por segundo em regime permanente
+        rajada: Pedidos que podem partir seguidos depois de um período parado
+    """
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+    def __init__(self, taxa, rajada=1):
+        self.intervalo = 1.0 / taxa
+        self.tolerancia = (max(1, rajada) - 1) * self.intervalo
+        self._chegada_teorica = 0.0
+        self._lock = threading.Lock()
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+    # Reserva um token; devolve os segundos a esperar até o poder usar
+    def reservar(self):
+        with self._lock:
+            agora = time.monotonic()
+            chegada = max(self._chegada_teorica, agora)
+            self._chegada_teorica = chegada + self.intervalo
+            return max(0.0, chegada - self.tolerancia - agora)
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+    def esperar(self):
+        espera = self.reservar()
+        if espera:
+            time.sleep(espera)
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
+    async def adquirir(self):
+        espera = self.reservar()
+        if espera:
+            await asyncio.sleep(espera)
 
 
-def coletar_sociedades_faro(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados de faro...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=F&r=&n=&lo=&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+_limitadores = {}
+_limitadores_lock = threading.Lock()
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+# Devolve o limitador partilhado de um host, criando-o na primeira utilização
+def obter_limitador(host):
+    with _limitadores_lock:
+        limitador = _limitadores.get(host)
+        if limitador is None:
+            limitador = LimitadorTaxa(TAXA_POR_HOST.get(host, TAXA_PADRAO_POR_HOST), RAJADA_POR_HOST)
+            _limitadores[host] = limitador
+        return limitador
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
+# Mesma verificação do check_captcha, mas sobre o HTML obtido por HTTP
+def tem_captcha(html):
+    return bool(RE_CAPTCHA.search(html))
 
 
-def coletar_sociedades_madeira(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados da madeira...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=M&r=&n=&lo=&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+# Espera até os resultados estarem estáveis no DOM, em vez de uma pausa fixa após navegar ou clicar
+def esperar_resultados_estaveis(driver, css_selector, timeout=30, antigo=None, estabilidade=0.5):
+    """
+    Se `antigo` for dado (um elemento da página anterior, p.ex. o botão
+    clicado), espera primeiro que fique stale, ou seja, que a navegação ou o
+    postback tenha substituído o DOM. Depois espera que o número de
+    elementos de `css_selector` seja positivo e não mude durante
+    `estabilidade` segundos.
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+    Args:
+        driver: WebDriver
+        css_selector: Seletor CSS dos resultados
+        timeout: Tempo máximo de espera, em segundos
+        antigo: Elemento que deve ficar stale antes de contar os resultados
+        estabilidade: Segundos sem alterações para considerar o DOM estável
+
+    Returns:
+        int: Número de resultados encontrados
 
+    Raises:
+        TimeoutException: Se os resultados não estabilizarem dentro do timeout
+    """
+    if antigo is not None:
         try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+            WebDriverWait(driver, min(timeout, 10)).until(EC.staleness_of(antigo))
+        except TimeoutException:
+            # Atualizações parciais (AJAX) podem manter o elemento; segue para a contagem
+            pass
+
+    contagem = {'n': -1, 'desde': time.monotonic()}
+
+    def estavel(d):
+        n = len(d.find_elements(By.CSS_SELECTOR, css_selector))
+        agora = time.monotonic()
+        if n != contagem['n']:
+            contagem['n'], contagem['desde'] = n, agora
+            return False
+        return n > 0 and agora - contagem['desde'] >= estabilidade
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+    WebDriverWait(driver, timeout, poll_frequency=0.2,
+                  ignored_exceptions=(StaleElementReferenceException,)).until(estavel)
+    return contagem['n']
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
 
+# Espera até um elemento ficar selecionado; é procurado de novo a cada verificação por causa dos postbacks
+def esperar_selecionado(driver, by, valor, timeout=10):
+    WebDriverWait(driver, timeout, ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)).until(
+        lambda d: d.find_element(by, valor).is_selected()
+    )
 
-def coletar_sociedades_acores(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados da madeira...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=A&r=&n=&lo=&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+# Com um driver sem janela, o CAPTCHA é resolvido num Chrome visível aberto só para isso: recebe os cookies
+# da sessão, espera que um humano o resolva e devolve os cookies ao driver original. Devolve True se o CAPTCHA
+# continuar presente
+def _resolver_captcha_com_janela(driver):
+    url = driver.current_url
+    with _captcha_lock:
+        print(f"⚠️ CAPTCHA detectado em modo headless! A abrir uma janela para o resolver manualmente ({url})...")
+        logging.warning(f"CAPTCHA em {url}; a abrir um Chrome visível para resolução manual")
+        visivel = configurar_driver(headless=False, perfil='completo')
+        if not visivel:
+            return True
+        try:
+            visivel.get(url)
+            for cookie in driver.get_cookies():
+                cookie.pop('sameSite', None)
+                try:
+                    visivel.add_cookie(cookie)
+                except WebDriverException:
+                    pass
+            visivel.get(url)
+            print(f"Aguardando até {TEMPO_CAPTCHA} segundos para você resolver o CAPTCHA...")
+            try:
+                WebDriverWait(visivel, TEMPO_CAPTCHA).until_not(
+                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'g-recaptcha')]"))
+                )
+            except TimeoutException:
+                print("⚠️ CAPTCHA ainda presente. Tente novamente ou verifique o navegador.")
+                return True
+            for cookie in visivel.get_cookies():
+                cookie.pop('sameSite', None)
+                try:
+                    driver.add_cookie(cookie)
+                except WebDriverException:
+                    pass
+            print("CAPTCHA resolvido com sucesso!")
+            logging.info(f"CAPTCHA resolvido na janela visível; sessão devolvida ao driver headless ({url})")
+        finally:
+            visivel.quit()
+    driver.refresh()
+    return False
 
+
+# Função auxiliar para verificar CAPTCHA
+def check_captcha(driver):
+    for attempt in range(3):
         try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
+            captcha = WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'g-recaptcha')]"))
             )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+            registar_falha('CAPTCHA')
+            if getattr(driver, 'sem_janela', False):
+                return _resolver_captcha_com_janela(driver)
+            print("⚠️ CAPTCHA detectado! Por favor, resolva o CAPTCHA manualmente no navegador.")
+            print("Aguardando 45 segundos para você resolver o CAPTCHA...")
+            time.sleep(15)
+            try:
+                driver.find_element(By.XPATH, "//div[contains(@class, 'g-recaptcha')]")
+                print("⚠️ CAPTCHA ainda presente. Tente novamente ou verifique o navegador.")
+                return True
+            except NoSuchElementException:
+                print("CAPTCHA resolvido com sucesso!")
+                return False
+        except Exception:
+            print("Nenhum CAPTCHA detectado.")
+            return False
+    print("⚠️ Falha ao lidar com o CAPTCHA após 3 tentativas.")
+    return True
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
+# Tabelas de normalização dos rótulos: padrão (minúsculas, sem acentos) -> atributo do RegistoOA.
+# Em cada cadeia vence o primeiro padrão contido no rótulo; a cadeia comum aplica-se sempre
+# e a segunda depende de o tipo ser estagiário ou não
+CAMPOS_ROTULO_COMUNS = (
+    ('cedula', 'cedula'),
+    ('conselho regional', 'conselho_regional'),
+    ('morada', 'morada'),
+    ('localidade', 'localidade'),
+)
+CAMPOS_ROTULO_ESTAGIARIO = (
+    ('data de inscricao', 'data_inscricao'),
+    ('fax', 'fax'),
+    ('telefone', 'telefone'),
+    ('email', 'email'),
+    ('codigo postal', 'codigo_postal'),
+)
+CAMPOS_ROTULO_OUTROS = (
+    ('telefone', 'telefone'),
+    ('email', 'email'),
+    ('registo', 'registo'),
+    ('codigo postal', 'codigo_postal'),
+    ('data de constituicao', 'data_constituicao'),
+    ('fax', 'fax'),
+    ('data de inscricao', 'data_inscricao'),
+)
 
 
-def coletar_sociedades_braga(driver, conn):
-    logging.info("Iniciando scraping de sociedades de advogados da madeira...")
-    print("🔎 Iniciando scraping de sociedades de advogados...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/?cg=&r=&n=&lo=BRAGA&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+def _sem_acentos(texto):
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+# Resolve o texto de um rótulo nos campos que ele preenche; memorizado, porque os rótulos distintos são poucos
+@functools.lru_cache(maxsize=512)
+def _campos_do_rotulo(rotulo, estagiario):
+    chave = _sem_acentos(rotulo.strip().lower())
+    campos = []
+    for cadeia in (CAMPOS_ROTULO_COMUNS, CAMPOS_ROTULO_ESTAGIARIO if estagiario else CAMPOS_ROTULO_OUTROS):
+        for padrao, campo in cadeia:
+            if padrao in chave:
+                campos.append(campo)
+                break
+    return tuple(campos)
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_sociedades, conn=conn)
+# Função auxiliar para extrair dados de um item
+def extract_item_data(item, base_url, tipo):
+    item_data = CLASSES_OA.get(tipo, Advogado)(estado="Sem estado", tipo=tipo)
+    estagiario = tipo == 'estagiario'
+    tem_nome = tem_estado = False
+
+    # Uma única travessia da árvore do item: título, estado e linhas de detalhe
+    for tag in item.find_all(('li', 'h4', 'div')):
+        classes = tag.get('class') or ()
+        if tag.name == 'li':
+            if 'search-results__details-list-item' not in classes:
+                continue
+            label = tag.find('span', class_='search-results__details-list-item-label')
+            value = tag.find('span', class_='search-results__details-list-item-description')
+            if label and value:
+                value_text = value.text.strip()
+                if estagiario:
+                    logging.debug(f"Rótulo extraído: '{label.text.strip()}', valor: '{value_text}'")
+                for campo in _campos_do_rotulo(label.text, estagiario):
+                    setattr(item_data, campo, value_text)
+        elif not tem_nome and tag.name == 'h4' and 'search-results__article-person-title' in classes:
+            item_data.nome = tag.text.strip()
+            tem_nome = True
+        elif not tem_estado and tag.name == 'div' and 'search-results__article-person-status' in classes:
+            item_data.estado = tag.text.strip()
+            tem_estado = True
 
+    return item_data
 
-# Função para coletar dados de advogados estagiários
-def coletar_estagiarios_lisboa(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=L&ce=&n=&lo=&m=&cp=&a=on&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
 
+# Backend lxml das listagens da OA: as mesmas regras do extract_item_data, sobre uma árvore lxml pura,
+# com as expressões XPath compiladas uma vez
+def _xpath_classe(classe):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {classe} ')"
+
+
+# Equivalentes em XPath dos seletores CSS usados com BeautifulSoup; um seletor sem equivalente usa o bs4
+XPATH_POR_SELETOR = {
+    CSS_RESULTADOS_OA: etree.XPath(
+        f"//article[{_xpath_classe('search-results__article-person')}]"
+        f" | //*[{_xpath_classe('search-results')}]//article"
+        f" | //*[{_xpath_classe('result-item')}]"),
+}
+XPATH_ROTULO_OA = etree.XPath(f"(descendant::span[{_xpath_classe('search-results__details-list-item-label')}])[1]")
+XPATH_VALOR_OA = etree.XPath(
+    f"(descendant::span[{_xpath_classe('search-results__details-list-item-description')}])[1]")
+XPATH_PAGINA_SEGUINTE_OA = etree.XPath(
+    f"boolean(//a[{_xpath_classe('ws-pagination__nav')}]//span[{_xpath_classe('icon-chevron-right')}])")
+XPATH_TEXTO = etree.XPath("string()", smart_strings=False)
+XPATH_PAGINACAO_OA = etree.XPath(
+    f"//*[{_xpath_classe('pagination')} or {_xpath_classe('paging')} or @role='navigation']"
+    f"//*[self::a or self::span]")
+RE_PARAMETRO_PAGINA = re.compile(r"[?&]page=(\d+)")
+
+
+def _arvore_lxml(html):
     try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+        return etree.HTML(html)
+    except ValueError:
+        # O lxml só aceita HTML com declaração de encoding em bytes
+        return etree.HTML(html.encode('utf-8'), etree.HTMLParser(encoding='utf-8'))
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+# Total de páginas de uma listagem, lido uma vez da paginação de uma página de resultados (números das ligações
+# e parâmetros page= dos seus URLs); None se o HTML não tiver paginação
+def total_paginas_oa(html):
+    arvore = _arvore_lxml(html) if html else None
+    if arvore is None:
+        return None
+    numeros = []
+    for elem in XPATH_PAGINACAO_OA(arvore):
+        texto = XPATH_TEXTO(elem).strip()
+        if texto.isdigit():
+            numeros.append(int(texto))
+        correspondencia = RE_PARAMETRO_PAGINA.search(elem.get('href') or '')
+        if correspondencia:
+            numeros.append(int(correspondencia.group(1)))
+    return max(numeros) if numeros else None
+
+
+# Versão lxml do extract_item_data; `item` é um elemento lxml de um resultado
+def extract_item_data_lxml(item, base_url, tipo):
+    item_data = CLASSES_OA.get(tipo, Advogado)(estado="Sem estado", tipo=tipo)
+    estagiario = tipo == 'estagiario'
+    tem_nome = tem_estado = False
+
+    for tag in item.iterdescendants('li', 'h4', 'div'):
+        classes = (tag.get('class') or '').split()
+        if tag.tag == 'li':
+            if 'search-results__details-list-item' not in classes:
+                continue
+            label = XPATH_ROTULO_OA(tag)
+            value = XPATH_VALOR_OA(tag)
+            if label and value:
+                rotulo = XPATH_TEXTO(label[0])
+                value_text = XPATH_TEXTO(value[0]).strip()
+                if estagiario:
+                    logging.debug(f"Rótulo extraído: '{rotulo.strip()}', valor: '{value_text}'")
+                for campo in _campos_do_rotulo(rotulo, estagiario):
+                    setattr(item_data, campo, value_text)
+        elif not tem_nome and tag.tag == 'h4' and 'search-results__article-person-title' in classes:
+            item_data.nome = XPATH_TEXTO(tag).strip()
+            tem_nome = True
+        elif not tem_estado and tag.tag == 'div' and 'search-results__article-person-status' in classes:
+            item_data.estado = XPATH_TEXTO(tag).strip()
+            tem_estado = True
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
+    return item_data
 
 
-def coletar_estagiarios_porto(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=P&ce=&n=&lo=&m=&cp=&a=on&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+# Insere um registo extraído com a função de inserção do respetivo tipo
+def _inserir_item(insert_func, conn, item_data, tipo):
+    if tipo == 'sociedade':
+        insert_func(conn, item_data.nome, item_data.conselho_regional, item_data.morada, item_data.estado,
+                    item_data.telefone, item_data.email, item_data.site, item_data.tipo or tipo,
+                    item_data.localidade, item_data.registo, item_data.codigo_postal, item_data.data_constituicao,
+                    item_data.fax)
+    elif tipo == 'estagiario':
+        insert_func(conn, item_data.nome, item_data.cedula, item_data.conselho_regional, item_data.morada,
+                    item_data.estado, item_data.email, item_data.site, item_data.tipo or tipo,
+                    item_data.localidade, item_data.codigo_postal, item_data.data_inscricao, item_data.telefone,
+                    item_data.fax)
+    else:
+        insert_func(conn, item_data.nome, item_data.cedula, item_data.conselho_regional, item_data.morada,
+                    item_data.estado, item_data.email, item_data.site, item_data.tipo or tipo,
+                    item_data.localidade, item_data.codigo_postal, item_data.telefone, item_data.data_inscricao)
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
 
+# Insere e escreve na saída os registos já extraídos de uma página; devolve o número de registos gravados
+def _gravar_registos(registos, tipo, insert_func, conn, all_data):
+    processados = 0
+    for item_data in registos:
         try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
+            if conexao_ativa(conn) and insert_func:
+                _inserir_item(insert_func, conn, item_data, tipo)
+            all_data.append(item_data)
+            print(f"✅ Item {item_data.nome} processado com sucesso!")
+            processados += 1
         except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+            print(f"Erro ao processar item: {e}")
+            logging.error(f"Erro ao processar item: {e}")
+            continue
+    return processados
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
+# Extrai os registos de uma página de resultados (corre num processo do pool de parse)
+# Devolve (registos, tem_seguinte), ou None se o HTML está vazio ou é um CAPTCHA
+def _extrair_pagina(html, css_selector, base_url, tipo, parser=None):
+    if not html or tem_captcha(html):
+        return None
+    if (parser or PARSER_PAGINAS) == 'lxml' and css_selector in XPATH_POR_SELETOR:
+        return _extrair_pagina_lxml(html, css_selector, base_url, tipo)
+    soup = BeautifulSoup(html, 'lxml')
+    registos = []
+    for item in soup.select(css_selector):
+        try:
+            registos.append(extract_item_data(item, base_url, tipo))
+        except Exception as e:
+            print(f"Erro ao processar item: {e}")
+            logging.error(f"Erro ao processar item: {e}")
+    # O botão 'Próximo' é lido do HTML já obtido, sem navegar para a página seguinte
+    return registos, _tem_pagina_seguinte(soup)
+
+
+def _extrair_pagina_lxml(html, css_selector, base_url, tipo):
+    arvore = _arvore_lxml(html)
+    if arvore is None:
+        return [], False
+    registos = []
+    for item in XPATH_POR_SELETOR[css_selector](arvore):
+        try:
+            registos.append(extract_item_data_lxml(item, base_url, tipo))
+        except Exception as e:
+            print(f"Erro ao processar item: {e}")
+            logging.error(f"Erro ao processar item: {e}")
+    return registos, XPATH_PAGINA_SEGUINTE_OA(arvore)
+
 
+_pool_parse = None
+_lock_pool_parse = threading.Lock()
 
-def coletar_estagiarios_coimbra(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=C&ce=&n=&lo=&m=&cp=&a=on&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
 
+# Pool de processos do parse, partilhado por todos os coletores; None com PROCESSOS_PARSE = 0
+def obter_pool_parse():
+    global _pool_parse
+    if PROCESSOS_PARSE < 1:
+        return None
+    with _lock_pool_parse:
+        if _pool_parse is None:
+            # spawn: os processos não herdam as threads do agendador (WebDrivers, conexões, SQLite)
+            _pool_parse = ProcessPoolExecutor(max_workers=PROCESSOS_PARSE,
+                                              mp_context=multiprocessing.get_context('spawn'),
+                                              initializer=_iniciar_processo_log, initargs=(FICHEIRO_LOG,))
+        return _pool_parse
+
+
+def fechar_pool_parse():
+    global _pool_parse
+    with _lock_pool_parse:
+        pool, _pool_parse = _pool_parse, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+# Submete a extração de uma página ao pool de processos; sem pool, extrai já e devolve um futuro resolvido
+def submeter_extracao(html, css_selector, base_url, tipo):
+    pool = obter_pool_parse()
+    if pool is not None:
+        # O backend vai explícito: os processos do pool não veem as configurações alteradas no main
+        return pool.submit(_extrair_pagina, html, css_selector, base_url, tipo, PARSER_PAGINAS)
+    futuro = Future()
     try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+        futuro.set_result(_extrair_pagina(html, css_selector, base_url, tipo, PARSER_PAGINAS))
+    except Exception as e:
+        futuro.set_exception(e)
+    return futuro
+
+
+# Futuro já resolvido com um resultado ou uma exceção, para seguir pela fila como as páginas extraídas
+def _futuro_resolvido(resultado=None, excecao=None):
+    futuro = Future()
+    if excecao is not None:
+        futuro.set_exception(excecao)
+    else:
+        futuro.set_result(resultado)
+    return futuro
+
 
+# Carrega uma página de resultados no Selenium; devolve o HTML ou None se os resultados não aparecerem
+def _carregar_pagina_selenium(driver, url, css_selector, rotulo=''):
+    inicio = time.monotonic()
+    # A pesquisa direta já deixa a primeira página carregada no browser
+    if driver.current_url != url:
+        driver.get(url)
+
+    for attempt in range(3):
         try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
+            esperar_resultados_estaveis(driver, css_selector)
+            registar_sucesso(time.monotonic() - inicio)
+            return driver.page_source
         except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+            registar_falha('timeout a carregar resultados')
+            print(f"Tentativa {attempt + 1} falhou ao carregar página{rotulo}. Recarregando...")
+            logging.error(f"Tentativa {attempt + 1} falhou: {e}")
+            # O CAPTCHA só é procurado quando os resultados não aparecem, para não pagar a sua espera em cada página
+            check_captcha(driver)
+            driver.refresh()
+            inicio = time.monotonic()
+    return None
+
+
+# Verifica, sem fazer o parse, se o HTML obtido por HTTP serve (não vazio, sem CAPTCHA e com resultados)
+def _tem_resultados(html):
+    return bool(html) and not tem_captcha(html) and RE_RESULTADOS_OA.search(html) is not None
+
+
+# Obtém o HTML de uma página de resultados: primeiro por HTTP direto, com fallback para o Selenium
+# Devolve o HTML (já arquivado), ou None se a página não carregou. `html` é o HTML já obtido por HTTP, se houver
+def _obter_html(driver, url, css_selector, buscador=None, rotulo='', html=None, numero=None):
+    if buscador:
+        if html is None:
+            html = buscador.obter(url)
+            arquivar_html(url, html, numero)
+        if _tem_resultados(html):
+            return html
+        logging.info(f"Fetch HTTP sem resultados ou com CAPTCHA em {url}; a usar o Selenium")
+        print(f"↩️ Fetch HTTP sem resultados ou com CAPTCHA{rotulo}; a usar o Selenium...")
+    html = _carregar_pagina_selenium(driver, url, css_selector, rotulo)
+    if html is not None:
+        arquivar_html(url, html, numero)
+    return html
+
+
+# Verifica, no HTML já obtido, se existe o botão de página seguinte
+def _tem_pagina_seguinte(soup):
+    for link in soup.select('a.ws-pagination__nav'):
+        if link.select_one('span.icon-chevron-right'):
+            return True
+    return False
+
+
+# Constrói o URL de uma página a partir do URL dos resultados da pesquisa
+def _url_pagina(search_url, numero):
+    parsed_url = urlparse(search_url)
+    query_params = parse_qs(parsed_url.query)
+    query_params['page'] = [str(numero)]
+    new_query = urlencode(query_params, doseq=True)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}?{new_query}"
+
+
+# Estado da paginação de uma listagem: contadores, checkpoints e critério de paragem
+class PaginacaoOA:
+    """
+    Trata o resultado de cada página de uma listagem paginada, pela ordem
+    das páginas, seja qual for a forma como foram obtidas (loop sequencial
+    ou pipeline assíncrono).
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+    Args:
+        driver: WebDriver do coletor (usado para guardar páginas de erro)
+        base_url: URL base do coletor
+        tipo: Tipo de registo ('advogado', 'sociedade' ou 'estagiario')
+        insert_func: Função de inserção na base de dados
+        conn: Conexão ou EscritorEmLote
+        all_data: SaidaColetor onde são escritos os itens extraídos
+    """
+
+    max_paginas_sem_dados = 3
+
+    def __init__(self, driver, base_url, tipo, insert_func, conn, all_data):
+        self.driver = driver
+        self.base_url = base_url
+        self.tipo = tipo
+        self.insert_func = insert_func
+        self.conn = conn
+        self.all_data = all_data
+        self.coletor = coletor_atual() or base_url
+        self.pagina_inicial = 1
+        self.search_url = base_url
+        self.max_pages = None
+        self.total_paginas = None
+        self.inicio = time.monotonic()
+        self.linhas_gravadas = 0
+        self.paginas_sem_dados = 0
+        self.concluida = False
+        self._impressoes = {}  # numero -> (url, impressao) das páginas a registar na cache depois de gravadas
+
+    # Lê o checkpoint do coletor; devolve False se já foi concluído numa execução anterior
+    def preparar(self):
+        if not CHECKPOINTS:
+            return True
+        estado = CHECKPOINTS.obter(self.coletor, self.base_url) if MODO_RETOMAR else None
+        if estado and estado['concluido']:
+            print(f"⏭️ {self.coletor} já concluído numa execução anterior ({estado['linhas']} linhas).")
+            logging.info(f"{self.coletor} já concluído numa execução anterior; a saltar {self.base_url}")
+            return False
+        if estado:
+            self.pagina_inicial = estado['ultima_pagina'] + 1
+            self.linhas_gravadas = estado['linhas']
+            print(f"↪️ A retomar {self.coletor} na página {self.pagina_inicial} "
+                  f"({self.linhas_gravadas} linhas já gravadas).")
+            logging.info(f"A retomar {self.coletor} na página {self.pagina_inicial} de {self.base_url}")
+        else:
+            CHECKPOINTS.reiniciar(self.coletor, self.base_url)
+        return True
+
+    # Lista de trabalho da listagem: (número, URL) de cada página, da página inicial à última indicada pela
+    # paginação da primeira página (ou até max_pages, se o total não for conhecido)
+    def planear(self, search_url, max_pages, total_paginas):
+        self.search_url = search_url
+        self.max_pages = max_pages
+        self.total_paginas = total_paginas
+        ultima = min(max_pages, total_paginas) if total_paginas else max_pages
+        if total_paginas:
+            print(f"Total de páginas detectado: {total_paginas}")
+        else:
+            print("Não foi possível determinar o total de páginas. Usando max_pages fornecido.")
+            logging.warning(f"Não foi possível determinar o total de páginas de {self.base_url}.")
+        paginas = [(numero, _url_pagina(search_url, numero)) for numero in range(self.pagina_inicial, ultima + 1)]
+        logging.info(f"{self.coletor}: {len(paginas)} páginas a obter ({self.pagina_inicial}-{ultima})")
+        return paginas
+
+    # Acrescenta a página seguinte à lista de trabalho, quando a última da lista ainda tem botão 'Próximo'
+    # (paginação em janela, que não mostra o número da última página). Devolve False acima de max_pages:
+    # a listagem fica por acabar e não conta como concluída
+    def estender(self, paginas):
+        numero = paginas[-1][0] + 1 if paginas else self.pagina_inicial
+        if numero > self.max_pages:
+            print(f"⚠️ Limite de {self.max_pages} páginas atingido em {self.base_url}; a listagem fica incompleta.")
+            logging.warning(f"{self.coletor}: limite de {self.max_pages} páginas atingido; listagem incompleta")
+            return False
+        paginas.append((numero, _url_pagina(self.search_url, numero)))
+        if self.total_paginas:
+            self.total_paginas = max(self.total_paginas, numero)
+        return True
+
+    # Progresso da listagem e estimativa do tempo restante, a partir do total de páginas
+    def progresso(self, numero):
+        if not self.total_paginas:
+            return f"página {numero}"
+        ultima = min(self.total_paginas, self.max_pages or self.total_paginas)
+        feitas = numero - self.pagina_inicial + 1
+        restantes = max(0, ultima - numero)
+        decorrido = time.monotonic() - self.inicio
+        estimativa = f", ~{decorrido / feitas * restantes / 60:.1f} min restantes" if feitas > 0 else ""
+        return f"página {numero}/{ultima} ({100 * numero / ultima:.0f}%{estimativa})"
+
+    # Conta uma página sem dados; devolve False quando se atinge o limite de páginas consecutivas
+    def registar_pagina_vazia(self):
+        self.paginas_sem_dados += 1
+        if self.paginas_sem_dados >= self.max_paginas_sem_dados:
+            print(f"⚠️ {self.max_paginas_sem_dados} páginas consecutivas sem dados. Encerrando paginação.")
+            return False
+        return True
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
+    # Verifica, sem mexer no estado da paginação, se a página está igual na cache de páginas
+    @staticmethod
+    def em_cache(url, html):
+        if not CACHE_PAGINAS:
+            return False
+        impressao = CachePaginas.impressao(html)
+        if impressao is None:
+            return False
+        anterior = CACHE_PAGINAS.obter(url)
+        return anterior is not None and anterior['impressao'] == impressao
+
+    # Consulta a cache de páginas antes do parse. Devolve None se a página tem de ser processada; se não mudou
+    # desde a execução anterior, salta-a e devolve True se a paginação deve continuar
+    def saltar_se_inalterada(self, numero, url, html):
+        if not CACHE_PAGINAS:
+            return None
+        impressao = CachePaginas.impressao(html)
+        if impressao is None:
+            return None
+        anterior = CACHE_PAGINAS.obter(url)
+        if not anterior or anterior['impressao'] != impressao:
+            self._impressoes[numero] = (url, impressao)
+            CACHE_PAGINAS.contar(saltada=False)
+            return None
+
+        CACHE_PAGINAS.contar(saltada=True)
+        print(f"⏩ Página {numero} sem alterações desde a última execução ({anterior['itens']} itens); a saltar.")
+        logging.info(f"Página {numero} de {self.base_url} sem alterações; parse e inserções saltados")
+        self.paginas_sem_dados = 0
+        self.linhas_gravadas += anterior['itens']
+        if DETETOR_ALTERACOES:
+            DETETOR_ALTERACOES.marcar_pagina_vista(url)
+        if CHECKPOINTS:
+            CHECKPOINTS.registar_pagina(self.coletor, self.base_url, numero, self.linhas_gravadas)
+        if not anterior['tem_seguinte']:
+            self.concluida = True
+            print("Botão 'Próximo' não encontrado. Encerrando paginação.")
+            return False
+        return True
+
+    # Trata o resultado (registos, tem_seguinte) de uma página; devolve True se a paginação deve continuar
+    # `html_erro` é o HTML a guardar se a página falhou, quando o driver está entregue a outra thread
+    def tratar(self, numero, pagina, url=None, html_erro=None):
+        if pagina is None:
+            print(f"⚠️ Não foi possível carregar a página {numero}")
+            logging.error(f"Não foi possível carregar a página {numero}")
+            with open(f"error_page_{self.base_url.split('/')[-2]}_{numero}.html", 'w', encoding='utf-8') as f:
+                f.write(html_erro if html_erro is not None else self.driver.page_source)
+            return self.registar_pagina_vazia()
+
+        registos, tem_seguinte = pagina
+        if not registos:
+            print(f"Nenhum item encontrado na página {numero}.")
+            logging.warning(f"Nenhum item encontrado na página {numero} de {self.base_url}")
+            return self.registar_pagina_vazia()
+        self.paginas_sem_dados = 0
+
+        print(f"Encontrados {len(registos)} itens na página {numero}. 📈 {self.progresso(numero)}")
+        escritor = self.conn if isinstance(self.conn, EscritorEmLote) else None
+        falhadas_antes = escritor.linhas_falhadas if escritor else 0
+        # As linhas ficam associadas ao URL da página, para a cache de páginas as poder dar como vistas
+        _contexto.pagina = url
+        try:
+            gravadas = _gravar_registos(registos, self.tipo, self.insert_func, self.conn, self.all_data)
+        finally:
+            _contexto.pagina = None
+        self.linhas_gravadas += gravadas
+        self.all_data.flush()
+
+        if CHECKPOINTS or CACHE_PAGINAS:
+            # A página só conta como concluída depois de as suas linhas estarem gravadas
+            if escritor:
+                escritor.flush()
+        if CHECKPOINTS:
+            CHECKPOINTS.registar_pagina(self.coletor, self.base_url, numero, self.linhas_gravadas)
+        if DETETOR_ALTERACOES:
+            DETETOR_ALTERACOES.confirmar()
+
+        if numero in self._impressoes:
+            url_cache, impressao = self._impressoes.pop(numero)
+            # Com linhas por gravar (erro no item ou enviadas para o JSONL), a página não entra na cache, para
+            # ser processada de novo na execução seguinte
+            if gravadas == len(registos) and (not escritor or escritor.linhas_falhadas == falhadas_antes):
+                CACHE_PAGINAS.registar(url_cache, impressao, len(registos), tem_seguinte)
+            else:
+                logging.warning(f"Página {numero} de {self.base_url} com linhas por gravar; fica fora da cache")
+        if not tem_seguinte:
+            self.concluida = True
+            if self.tipo == 'advogado' and numero >= 6:
+                print("Limite de fallback por URL atingido (página 6) para advogados. Encerrando paginação.")
+                return False
+            print("Botão 'Próximo' não encontrado. Encerrando paginação.")
+            return False
+        return True
+
+    def finalizar(self):
+        if not self.concluida:
+            return
+        if CHECKPOINTS:
+            CHECKPOINTS.concluir(self.coletor, self.base_url)
+        listagem_completa()
+
+
+# Pipeline assíncrono da paginação: até `concorrencia` páginas em voo, ao ritmo do limitador do host.
+# O parse de cada página começa no pool de processos assim que chega, sobreposto aos downloads seguintes e à
+# gravação das anteriores; os resultados são gravados pela ordem das páginas para os checkpoints continuarem
+# corretos.
+async def _pipeline_paginas(paginacao, driver, paginas, css_selector, buscador, concorrencia):
+    limitador = obter_limitador(urlparse(paginacao.base_url).netloc)
+
+    ritmo = obter_ritmo(paginacao.coletor)
+
+    def obter_e_submeter(url):
+        html = buscador.obter(url)
+        if not _tem_resultados(html) or paginacao.em_cache(url, html):
+            return html, None
+        return html, submeter_extracao(html, css_selector, paginacao.base_url, paginacao.tipo)
+
+    async def buscar(url):
+        await limitador.adquirir()
+        espera = ritmo.recuo()
+        if espera:
+            await asyncio.sleep(espera)
+        return await asyncio.to_thread(obter_e_submeter, url)
+
+    def tratar(numero, url, html, futuro):
+        # As threads do to_thread não herdam o threading.local do coletor
+        _contexto.coletor = paginacao.coletor
+        print(f"Extraindo dados da página {numero} ({url})...")
+        try:
+            arquivar_html(url, html, numero)
+            continuar = paginacao.saltar_se_inalterada(numero, url, html)
+            if continuar is not None:
+                return continuar
+            if futuro is None:
+                logging.info(f"Fetch HTTP sem resultados ou com CAPTCHA em {url}; a usar o Selenium")
+                print(f"↩️ Fetch HTTP sem resultados ou com CAPTCHA na página {numero}; a usar o Selenium...")
+                limitador.esperar()
+                html = _obter_html(driver, url, css_selector, rotulo=f" {numero}", numero=numero)
+                if html is not None:
+                    continuar = paginacao.saltar_se_inalterada(numero, url, html)
+                    if continuar is not None:
+                        return continuar
+                    futuro = submeter_extracao(html, css_selector, paginacao.base_url, paginacao.tipo)
+            return paginacao.tratar(numero, futuro.result() if futuro else None, url)
+        except WebDriverException as e:
+            print(f"Erro ao processar página {numero}: {e}")
+            logging.error(f"Erro ao processar página {numero}: {e}")
+            return paginacao.registar_pagina_vazia()
+
+    # Índices na lista de trabalho: a próxima página a tratar e a próxima a pedir
+    em_voo = {}
+    atual = proxima = 0
+    try:
+        while atual < len(paginas):
+            if paragem_pedida():
+                return
+            while proxima < len(paginas) and len(em_voo) < concorrencia:
+                numero, url = paginas[proxima]
+                em_voo[numero] = asyncio.create_task(buscar(url))
+                proxima += 1
+            numero, url = paginas[atual]
+            html, futuro = await em_voo.pop(numero)
+            if not await asyncio.to_thread(tratar, numero, url, html, futuro):
+                return
+            atual += 1
+            if atual == len(paginas):
+                paginacao.estender(paginas)
+        # Sem 'Próximo' na última página, tratar() já marcou a listagem como concluída; parar no limite de
+        # max_pages deixa-a incompleta
+    finally:
+        # Páginas pedidas para lá do fim da listagem são descartadas
+        for tarefa in em_voo.values():
+            tarefa.cancel()
+
+
+# Paginação sequencial em produtor/consumidor: a thread do coletor só obtém páginas (HTTP ou Selenium) e
+# põe o HTML numa fila limitada, com o parse já submetido ao pool de processos; uma thread de gravação
+# consome a fila pela ordem das páginas e grava os registos no escritor em lote do coletor.
+def _paginas_produtor_consumidor(paginacao, driver, paginas, css_selector, buscador):
+    fila = queue.Queue(maxsize=FILA_PAGINAS)
+    parar = threading.Event()
+
+    def consumir():
+        _contexto.coletor = paginacao.coletor
+        while True:
+            entrada = fila.get()
+            if entrada is None:
+                return
+            if parar.is_set():
+                # Continua a esvaziar a fila para o produtor nunca ficar bloqueado
+                continue
+            numero, url, html_pagina, futuro, html_erro = entrada
+            try:
+                continuar = paginacao.saltar_se_inalterada(numero, url, html_pagina)
+                if continuar is None:
+                    continuar = paginacao.tratar(numero, futuro.result() if futuro else None, url, html_erro)
+            except Exception as e:
+                print(f"Erro ao processar página {numero}: {e}")
+                logging.error(f"Erro ao processar página {numero}: {e}")
+                continuar = paginacao.registar_pagina_vazia()
+            if not continuar:
+                parar.set()
+
+    consumidor = threading.Thread(target=consumir, name=f"gravacao-{paginacao.coletor}", daemon=True)
+    consumidor.start()
+    atual = 0
+    try:
+        while atual < len(paginas) and not parar.is_set():
+            if paragem_pedida():
+                parar.set()
+                break
+            current_page, new_url = paginas[atual]
+            html_http = html = html_erro = None
+            try:
+                print(f"Extraindo dados da página {current_page} ({new_url})...")
+                if buscador:
+                    html_http = buscador.obter(new_url)
+                    arquivar_html(new_url, html_http, current_page)
+                if paginacao.em_cache(new_url, html_http):
+                    futuro = None
+                else:
+                    html = _obter_html(driver, new_url, css_selector, buscador, f" {current_page}", html_http,
+                                       current_page)
+                    if html is None:
+                        html_erro = driver.page_source
+                        futuro = _futuro_resolvido(None)
+                    elif paginacao.em_cache(new_url, html):
+                        # A cache vale também para o HTML obtido pelo Selenium (--fetch selenium ou fallback)
+                        futuro = None
+                    else:
+                        futuro = submeter_extracao(html, css_selector, paginacao.base_url, paginacao.tipo)
+            except WebDriverException as e:
+                futuro = _futuro_resolvido(excecao=e)
+            fila.put((current_page, new_url, html or html_http, futuro, html_erro))
+
+            atual += 1
+            # O fim da listagem lê-se do HTML em bruto, para não carregar páginas para lá da última
+            obtido = html or html_http
+            if _tem_resultados(obtido) and not RE_PAGINA_SEGUINTE_OA.search(obtido):
+                break
+            if atual == len(paginas):
+                paginacao.estender(paginas)
+            if _tem_resultados(html):
+                pausar(5, 10)
+    finally:
+        fila.put(None)
+        consumidor.join()
 
 
-def coletar_estagiarios_evora(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=E&ce=&n=&lo=&m=&cp=&a=on&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+# Função para processar todas as páginas de uma só vez
+def process_all_pages_at_once(driver, base_url, css_selector, max_pages=100, insert_func=None, conn=None,
+                              single_page=False, search_url=None):
+    print(f"Processando dados de {base_url}...")
+    all_data = SaidaColetor(f"dados_{base_url.split('/')[-2]}")
+    # Determine the type based on the insert function provided
+    if insert_func == inserir_estagiario:
+        tipo = 'estagiario'
+    elif insert_func == inserir_sociedades:
+        tipo = 'sociedade'
+    else:
+        # Fallback to URL-based determination for other types if needed
+        tipo = 'sociedade' if 'sociedades' in base_url.lower() else 'advogado'
+
+    buscador = obter_buscador_http(driver) if BACKEND_FETCH == 'http' else None
 
     try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+        if single_page:
+            print(f"Processando página única: {base_url}")
+            html = _obter_html(driver, base_url, css_selector, buscador, numero=1)
+            pagina = _extrair_pagina(html, css_selector, base_url, tipo) if html else None
+            if pagina is None:
+                print(f"⚠️ Não foi possível carregar a página: {base_url}")
+                logging.error(f"Não foi possível carregar a página: {base_url}")
+                with open(f"error_page_{base_url.split('/')[-2]}.html", 'w', encoding='utf-8') as f:
+                    f.write(driver.page_source)
+                return all_data
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+            registos, _ = pagina
+            if not registos:
+                print("Nenhum item encontrado nesta página.")
+                logging.warning(f"Nenhum item encontrado em {base_url}")
+                return all_data
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+            print(f"Encontrados {len(registos)} itens na página.")
+            _gravar_registos(registos, tipo, insert_func, conn, all_data)
+            listagem_completa()
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
+        else:
+            paginacao = PaginacaoOA(driver, base_url, tipo, insert_func, conn, all_data)
+            if not paginacao.preparar():
+                return all_data
 
+            # Os URLs das páginas partem do URL direto da pesquisa ou, sem ele, do URL a que o formulário levou
+            search_url = search_url or driver.current_url
+            # O total de páginas lê-se uma só vez, da paginação da primeira página de resultados já carregada
+            # no browser, e dá a lista de trabalho com os URLs de todas as páginas
+            paginas = paginacao.planear(search_url, max_pages, total_paginas_oa(driver.page_source))
 
-def coletar_estagiarios_faro(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=F&ce=&n=&lo=&m=&cp=&a=on&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+            if buscador and CONCORRENCIA_PAGINAS > 1:
+                print(f"⚡ Pipeline assíncrono com {CONCORRENCIA_PAGINAS} páginas em voo para {base_url}")
+                asyncio.run(_pipeline_paginas(paginacao, driver, paginas, css_selector, buscador,
+                                              CONCORRENCIA_PAGINAS))
+                paginacao.finalizar()
+                return _guardar_dados_coletor(all_data, base_url)
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+            _paginas_produtor_consumidor(paginacao, driver, paginas, css_selector, buscador)
+            paginacao.finalizar()
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+    except Exception as e:
+        print(f"Erro geral ao processar {base_url}: {e}")
+        logging.error(f"Erro geral ao processar {base_url}: {e}")
+        with open(f"error_page_{base_url.split('/')[-2]}.html", 'w', encoding='utf-8') as f:
+            f.write(driver.page_source)
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+    return _guardar_dados_coletor(all_data, base_url)
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
 
+# Fecha o CSV de um coletor e devolve a sua saída
+def _guardar_dados_coletor(all_data, base_url):
+    all_data.fechar()
+    return all_data
 
-def coletar_estagiarios_madeira(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=M&ce=&n=&lo=&m=&cp=&a=on&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
 
+# Registo declarativo das pesquisas do portal da OA: as entidades (com o URL e a função de inserção) e os
+# conselhos regionais (com os parâmetros que os filtram). Cada combinação é uma região, recolhida pelo motor
+# genérico coletar_regiao_oa; os ajustes de uma região (max_pages, prioridade no agendador, ...) são configuração.
+ENTIDADES_OA = {
+    'advogados': {
+        'descricao': 'advogados',
+        'url': 'https://portal.oa.pt/advogados/pesquisa-de-advogados/',
+        'parametros': {'l': '', 'cg': '', 'ce': '', 'n': '', 'lo': '', 'm': '', 'cp': '', 'a': 'on', 'op': '',
+                       'o': '0'},
+        'insercao': inserir_advogado,
+        'apenas_ativos': True,  # Marca a checkbox 'Apenas Ativos' do formulário antes de pesquisar
+    },
+    'sociedades': {
+        'descricao': 'sociedades de advogados',
+        'url': 'https://portal.oa.pt/advogados/pesquisa-de-sociedades-de-advogados/',
+        'parametros': {'cg': '', 'r': '', 'n': '', 'lo': '', 'm': '', 'cp': '', 'op': '', 'o': '0'},
+        'insercao': inserir_sociedades,
+        'apenas_ativos': False,
+    },
+    'estagiarios': {
+        'descricao': 'estagiários',
+        'url': 'https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/',
+        'parametros': {'cg': '', 'ce': '', 'n': '', 'lo': '', 'm': '', 'cp': '', 'a': 'on', 'op': '', 'o': '0'},
+        'insercao': inserir_estagiario,
+        'apenas_ativos': False,
+    },
+}
+
+# Conselhos regionais: região -> parâmetros da pesquisa (Braga não tem conselho próprio; filtra-se pela localidade)
+CONSELHOS_OA = {
+    'lisboa': {'cg': 'L'},
+    'porto': {'cg': 'P'},
+    'coimbra': {'cg': 'C'},
+    'evora': {'cg': 'E'},
+    'faro': {'cg': 'F'},
+    'madeira': {'cg': 'M'},
+    'acores': {'cg': 'A'},
+    'braga': {'lo': 'BRAGA'},
+}
+
+MAX_PAGINAS_OA = 100
+
+# Ajustes por região, pelo nome do coletor: p.ex. {'coletar_advogados_lisboa': {'max_pages': 150, 'prioridade': 1}}
+# As regiões com maior prioridade arrancam primeiro no agendador
+AJUSTES_REGIOES_OA = {}
+
+
+def _regiao_oa(entidade, regiao):
+    config = ENTIDADES_OA[entidade]
+    nome = f"coletar_{entidade}_{regiao}"
+    entrada = {
+        'nome': nome,
+        'entidade': entidade,
+        'regiao': regiao,
+        'descricao': config['descricao'],
+        'url': f"{config['url']}?{urlencode(dict(config['parametros'], **CONSELHOS_OA[regiao]))}",
+        'insercao': config['insercao'],
+        'apenas_ativos': config['apenas_ativos'],
+        'max_pages': MAX_PAGINAS_OA,
+        'prioridade': 0,
+        'site': SITE_OA,
+    }
+    entrada.update(AJUSTES_REGIOES_OA.get(nome, {}))
+    return entrada
+
+
+REGIOES_OA = [_regiao_oa(entidade, regiao) for entidade in ENTIDADES_OA for regiao in CONSELHOS_OA]
+
+XPATH_APENAS_ATIVOS = ("//label[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), "
+                       "'apenas ativos')]/preceding-sibling::input[@type='checkbox'] | "
+                       "//input[@type='checkbox' and contains(@id, 'ativos')]")
+CSS_BOTAO_PESQUISA_OA = 'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'
+
+
+# Marca a checkbox 'Apenas Ativos' do formulário de pesquisa, se ainda não estiver marcada
+def _marcar_apenas_ativos(driver):
     try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
+        apenas_ativos = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, XPATH_APENAS_ATIVOS))
         )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+        if not apenas_ativos.is_selected():
+            driver.execute_script("arguments[0].click();", apenas_ativos)
+            logging.info("Opção 'Apenas Ativos' marcada com sucesso!")
+            print("Opção 'Apenas Ativos' marcada com sucesso!")
+    except Exception as e:
+        logging.warning(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
+        print(f"Erro ao marcar 'Apenas Ativos' (continuando sem marcar): {e}")
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
+# Constrói o URL direto da página `numero` de uma pesquisa da região, sem passar pelo formulário
+def url_pesquisa_oa(regiao, numero=1):
+    return _url_pagina(regiao['url'], numero)
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
 
+# Página pela qual a listagem de um coletor vai começar (a seguinte à do checkpoint, com --resume)
+def _pagina_inicial_oa(base_url):
+    if not (CHECKPOINTS and MODO_RETOMAR):
+        return 1
+    estado = CHECKPOINTS.obter(coletor_atual() or base_url, base_url)
+    if estado and not estado['concluido']:
+        return estado['ultima_pagina'] + 1
+    return 1
+
+
+# Abre diretamente o URL de resultados da pesquisa. Devolve o URL se a página trouxe resultados, ou None para
+# o coletor voltar ao formulário
+def _pesquisa_direta_oa(driver, regiao):
+    url = url_pesquisa_oa(regiao, _pagina_inicial_oa(regiao['url']))
+    inicio = time.monotonic()
+    driver.get(url)
+    try:
+        esperar_resultados_estaveis(driver, CSS_RESULTADOS_OA, timeout=TIMEOUT_PESQUISA_DIRETA)
+        registar_sucesso(time.monotonic() - inicio)
+        logging.info(f"Pesquisa direta com resultados: {url}")
+        return url
+    except TimeoutException:
+        check_captcha(driver)
+        logging.warning(f"Pesquisa direta sem resultados em {url}; a usar o formulário")
+        print(f"↩️ Pesquisa direta sem resultados ({regiao['nome']}); a usar o formulário...")
+        return None
 
-def coletar_estagiarios_acores(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=A&ce=&n=&lo=&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
 
+# Preenche e submete o formulário de pesquisa da região (caminho antigo, usado quando o URL direto falha)
+def _pesquisa_formulario_oa(driver, regiao):
+    base_url = regiao['url']
+    driver.get(base_url)
     try:
         WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
         )
         if check_captcha(driver):
             driver.refresh()
-            time.sleep(random.uniform(2, 4))
+            pausar(2, 4)
+
+        if regiao['apenas_ativos']:
+            _marcar_apenas_ativos(driver)
 
         try:
             search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
+                EC.element_to_be_clickable((By.CSS_SELECTOR, CSS_BOTAO_PESQUISA_OA))
             )
             driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
+            esperar_resultados_estaveis(driver, CSS_RESULTADOS_OA, antigo=search_button)
         except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+            logging.warning(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
             print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
 
     except TimeoutException as e:
+        registar_falha('timeout no formulário')
         logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
         print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
 
+# Motor genérico dos coletores do portal da OA: abre os resultados da região (pelo URL direto ou pelo
+# formulário) e pagina-os
+def coletar_regiao_oa(driver, conn, regiao):
+    """
+    Recolhe uma região do registo REGIOES_OA. Com PESQUISA_DIRETA_OA, salta o
+    formulário e abre logo o URL dos resultados; o formulário só é usado se
+    esse URL não trouxer resultados.
 
-def coletar_estagiarios_braga(driver, conn):
-    logging.info("Iniciando scraping de estagiários...")
-    print("🔎 Iniciando scraping de estagiários...")
-    base_url = "https://portal.oa.pt/advogados/pesquisa-de-advogados-estagiarios/?cg=&ce=&n=&lo=BRAGA&m=&cp=&op=&o=0"
-    driver.get(base_url)
-    time.sleep(random.uniform(3, 5))
+    Args:
+        driver: WebDriver do coletor
+        conn: Conexão ou EscritorEmLote
+        regiao: Entrada de REGIOES_OA (URL, função de inserção, max_pages, ...)
 
-    try:
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'form'))
-        )
-        if check_captcha(driver):
-            driver.refresh()
-            time.sleep(random.uniform(2, 4))
+    Returns:
+        SaidaColetor: Registos recolhidos
+    """
+    logging.info(f"Iniciando scraping de {regiao['descricao']} ({regiao['regiao']})...")
+    print(f"🔎 Iniciando scraping de {regiao['descricao']} ({regiao['regiao']})...")
+    search_url = _pesquisa_direta_oa(driver, regiao) if PESQUISA_DIRETA_OA else None
+    if search_url is None:
+        _pesquisa_formulario_oa(driver, regiao)
 
-        try:
-            search_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR,
-                                            'button[type="submit"], input[type="submit"], button.search-button, button.btn-primary'))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(random.uniform(3, 5))
-        except Exception as e:
-            logging.error(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
-            print(f"Erro ao clicar no botão de pesquisa para {base_url}: {e}")
+    return process_all_pages_at_once(driver, regiao['url'], CSS_RESULTADOS_OA, max_pages=regiao['max_pages'],
+                                     insert_func=regiao['insercao'], conn=conn, search_url=search_url)
 
-    except TimeoutException as e:
-        logging.warning(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
-        print(f"Formulário de pesquisa não encontrado, prosseguindo com a coleta de dados: {e}")
 
-    return process_all_pages_at_once(driver, base_url,
-                                     'article.search-results__article-person, .search-results article, .result-item',
-                                     max_pages=100,
-                                     insert_func=inserir_estagiario, conn=conn)
+# Cria a função coletora de uma região; o nome (coletar_<entidade>_<região>) identifica o coletor nos
+# checkpoints, no detetor de alterações e nos logs
+def _criar_coletor_oa(regiao):
+    def coletor(driver, conn):
+        return coletar_regiao_oa(driver, conn, regiao)
+
+    coletor.__name__ = coletor.__qualname__ = regiao['nome']
+    coletor.__doc__ = f"Coletor de {regiao['descricao']} ({regiao['regiao']}), gerado a partir de REGIOES_OA."
+    return coletor
+
+
+COLETORES_OA = {regiao['nome']: _criar_coletor_oa(regiao) for regiao in REGIOES_OA}
+# Mantém os nomes de sempre (coletar_advogados_lisboa, ...) acessíveis no módulo
+globals().update(COLETORES_OA)
 
 
 # Função para coletar dados de tribunais
@@ -1684,11 +3008,10 @@ def coletar_tribunais(driver, conn):
     logging.info("Iniciando scraping de tribunais...")
     print("🔎 Iniciando scraping de tribunais...")
     base_url = "https://www.citius.mj.pt/portal/contactostribunais.aspx"
-    all_data = []
+    all_data = SaidaColetor("dados_tribunais")
 
     # Carrega a página uma vez para pegar as localidades
     driver.get(base_url)
-    time.sleep(2)
     select_region_initial = WebDriverWait(driver, 30).until(
         EC.element_to_be_clickable((By.CSS_SELECTOR, 'select[name*="ddlLocalidade"], select[id*="ddlLocalidade"]'))
     )
@@ -1696,33 +3019,35 @@ def coletar_tribunais(driver, conn):
     region_values = [option.get_attribute('value') for option in options if
                      option.get_attribute('value') and option.get_attribute('value') != '0']
 
+    completa = True
     for region_value in region_values:
+        if paragem_pedida():
+            completa = False
+            break
         try:
             print(f"🔄 Tentando selecionar localidade: {region_value}")
             driver.get(base_url)
-            time.sleep(2)
             select_element = WebDriverWait(driver, 30).until(
                 EC.element_to_be_clickable(
                     (By.CSS_SELECTOR, 'select[name*="ddlLocalidade"], select[id*="ddlLocalidade"]'))
             )
             dropdown = Select(select_element)
             dropdown.select_by_value(region_value)
-            time.sleep(2)  # Aguarda o postback
 
-            # Aguarda os resultados aparecerem
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '.pesquisaresultado'))
-            )
+            # Aguarda o postback substituir o formulário e os resultados estabilizarem
+            esperar_resultados_estaveis(driver, '.pesquisaresultado', antigo=select_element)
 
             html = driver.page_source
-            soup = BeautifulSoup(html, 'lxml')
+            arquivar_html(driver.current_url, html)
+            # Só os blocos de resultados entram na árvore, em vez da página inteira a cada localidade
+            soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer('div', class_='pesquisaresultado'))
             resultados = soup.find_all('div', class_='pesquisaresultado')
             print(f"Encontrados {len(resultados)} blocos de tribunal na localidade {region_value}.")
 
             for resultado in resultados:
                 try:
-                    nome = resultado.find('h1').text.strip() if resultado.find('h1') else 'N/D'
-                    morada = 'N/D'
+                    nome = resultado.find('h1').text.strip() if resultado.find('h1') else None
+                    morada = None
                     morada_element = resultado.find('strong', string='Morada: ')
                     if morada_element:
                         morada_parts = []
@@ -1732,7 +3057,7 @@ def coletar_tribunais(driver, conn):
                             if isinstance(sibling, str):
                                 morada_parts.append(sibling.strip())
                         morada = ' '.join([p for p in morada_parts if p]).replace('\xa0', ' ').replace(' ,', ',')
-                    telefone = 'N/D'
+                    telefone = None
                     telefone_element = resultado.find('strong', string='Telefone: ')
                     if telefone_element:
                         telefone_parts = []
@@ -1744,59 +3069,60 @@ def coletar_tribunais(driver, conn):
                         telefone = ' '.join([p for p in telefone_parts if p])
                     email_element = resultado.find('strong', string='Correio Electrónico: ')
                     email = email_element.find_next('a').text.strip() if email_element and email_element.find_next(
-                        'a') else 'N/D'
-                    tribunal_data = {
-                        'Nome': nome,
-                        'Morada': morada,
-                        'Telefone': telefone,
-                        'Email': email,
-                        'Tipo': 'tribunal'
-                    }
-                    if conn and conn.is_connected():
-                        inserir_tribunal(conn, tribunal_data['Nome'], tribunal_data['Morada'],
-                                         tribunal_data['Telefone'], tribunal_data['Email'])
+                        'a') else None
+                    tribunal_data = Tribunal(nome=nome, morada=morada, telefone=telefone, email=email,
+                                             tipo='tribunal')
+                    if conexao_ativa(conn):
+                        inserir_tribunal(conn, tribunal_data.nome, tribunal_data.morada,
+                                         tribunal_data.telefone, tribunal_data.email)
                     all_data.append(tribunal_data)
-                    logging.info(f"Tribunal {tribunal_data['Nome']} processado com sucesso!")
-                    print(f"✅ Tribunal {tribunal_data['Nome']} processado com sucesso!")
+                    logging.info(f"Tribunal {tribunal_data.nome} processado com sucesso!")
+                    print(f"✅ Tribunal {tribunal_data.nome} processado com sucesso!")
                 except Exception as e:
                     logging.error(f"Erro ao processar tribunal: {e}")
                     print(f"Erro ao processar tribunal: {e}")
+                    completa = False
                     continue
         except Exception as e:
             print(f"Erro ao selecionar localidade {region_value}: {e}")
+            completa = False
             continue
 
-    if all_data:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"dados_tribunais_{timestamp}.csv"
-        save_to_csv(all_data, filename)
-        logging.info(f"Dados salvos em CSV: {filename}")
-        print(f"✅ Dados salvos em CSV: {filename}")
-        return all_data
+    if completa:
+        listagem_completa()
+    all_data.fechar()
+    return all_data
 
 
 def coletar_julgados(driver, conn):
     logging.info("Iniciando scraping de julgados de paz detalhados...")
     print("🔎 Iniciando scraping de julgados de paz detalhados...")
     base_url = "https://dgpj.justica.gov.pt/resolucao-de-litigios/julgados-de-paz/encontrar-um-julgado-de-paz"
-    all_data = []
+    all_data = SaidaColetor("julgados")
 
     driver.get(base_url)
-    time.sleep(2)
+    completa = True
+    try:
+        esperar_resultados_estaveis(driver, "a[id^='dnn_ctr19541_FAQs_lstFAQs_Q2_']")
+    except TimeoutException:
+        logging.warning("Agrupamentos de julgados de paz não encontrados a tempo")
+        completa = False
 
     # Encontra todos os links de agrupamentos (títulos clicáveis)
     agrupamentos_links = driver.find_elements(By.CSS_SELECTOR, "a[id^='dnn_ctr19541_FAQs_lstFAQs_Q2_']")
     print(f"Encontrados {len(agrupamentos_links)} agrupamentos de julgados de paz.")
 
     for i, link in enumerate(agrupamentos_links):
+        if paragem_pedida():
+            completa = False
+            break
         try:
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", link)
             link.click()
-            time.sleep(2)  # Aguarda expandir
 
             # Após expandir, pega o painel de conteúdo expandido relacionado a este agrupamento
             panel_id = link.get_attribute("id").replace("Q2", "pnl")
-            panel = driver.find_element(By.ID, panel_id)
+            panel = WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.ID, panel_id)))
             detalhes_html = panel.get_attribute("innerHTML")
             detalhes_soup = BeautifulSoup(detalhes_html, 'lxml')
 
@@ -1819,18 +3145,14 @@ def coletar_julgados(driver, conn):
                     elif txt and not txt.startswith('Fax') and not txt.startswith('Não instalados'):
                         if p.find('strong'):
                             if localidade and morada:
-                                tribunal_data = {
-                                    'Nome': f"{nome_agrup} - {localidade}",
-                                    'Morada': ' '.join(morada),
-                                    'Telefone': telefone,
-                                    'Email': email,
-                                    'Tipo': 'julgado_paz'
-                                }
-                                if conn and conn.is_connected():
-                                    inserir_tribunal(conn, tribunal_data['Nome'], tribunal_data['Morada'],
-                                                     tribunal_data['Telefone'], tribunal_data['Email'])
+                                tribunal_data = Tribunal(nome=f"{nome_agrup} - {localidade}",
+                                                         morada=' '.join(morada), telefone=telefone,
+                                                         email=email, tipo='julgado_paz')
+                                if conexao_ativa(conn):
+                                    inserir_tribunal(conn, tribunal_data.nome, tribunal_data.morada,
+                                                     tribunal_data.telefone, tribunal_data.email)
                                 all_data.append(tribunal_data)
-                                print(f"✅ Julgado de Paz {tribunal_data['Nome']} processado com sucesso!")
+                                print(f"✅ Julgado de Paz {tribunal_data.nome} processado com sucesso!")
                             localidade = txt
                             morada = []
                             telefone = ''
@@ -1838,29 +3160,24 @@ def coletar_julgados(driver, conn):
                         else:
                             morada.append(txt)
             if localidade and morada:
-                tribunal_data = {
-                    'Nome': f"{nome_agrup} - {localidade}",
-                    'Morada': ' '.join(morada),
-                    'Telefone': telefone,
-                    'Email': email,
-                    'Tipo': 'julgado_paz'
-                }
-                if conn and conn.is_connected():
-                    inserir_tribunal(conn, tribunal_data['Nome'], tribunal_data['Morada'], tribunal_data['Telefone'],
-                                     tribunal_data['Email'])
+                tribunal_data = Tribunal(nome=f"{nome_agrup} - {localidade}", morada=' '.join(morada),
+                                         telefone=telefone, email=email, tipo='julgado_paz')
+                if conexao_ativa(conn):
+                    inserir_tribunal(conn, tribunal_data.nome, tribunal_data.morada, tribunal_data.telefone,
+                                     tribunal_data.email)
                 all_data.append(tribunal_data)
-                print(f"✅ Julgado de Paz {tribunal_data['Nome']} processado com sucesso!")
+                print(f"✅ Julgado de Paz {tribunal_data.nome} processado com sucesso!")
         except Exception as e:
             print(f"Erro ao processar agrupamento {i}: {e}")
+            completa = False
             continue
 
-    # Salva e retorna os dados como já faz
-    if all_data:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        save_to_csv(all_data, f"julgados_{timestamp}.csv")
+    if completa:
+        listagem_completa()
+    all_data.fechar()
 
     print(f"✅ Total de julgados de paz coletados: {len(all_data)}")
-    time.sleep(2)  # Pequeno delay para visualizar a mensagem
+    pausar(2)  # Pequeno delay para visualizar a mensagem
     return all_data
 
 
@@ -1875,22 +3192,11 @@ def extract_osae_data(item, base_url, tipo):
         tipo: Tipo de registro
 
     Returns:
-        dict: Dicionário com os dados extraídos
+        AgenteExecucao: Registo com os dados extraídos (None nos campos em falta)
     """
-    item_data = {}
-
     # Extrai o nome
     nome_tag = item.find(['h4', 'h5', 'strong', '.nome', '.name'])
-    nome = nome_tag.get_text(strip=True) if nome_tag else 'N/D'
-    item_data['Nome'] = nome
-
-    # Inicializa outros campos
-    item_data['Situação'] = 'N/D'
-    item_data['Cédula'] = 'N/D'
-    item_data['Localidade'] = 'N/D'
-    item_data['Telefone'] = 'N/D'
-    item_data['Email'] = 'N/D'
-    item_data['Tipo'] = tipo
+    item_data = AgenteExecucao(nome=nome_tag.get_text(strip=True) if nome_tag else None, tipo=tipo)
 
     # Procura por informações em listas e parágrafos
     for element in item.find_all(['p', 'li', 'div']):
@@ -1898,39 +3204,71 @@ def extract_osae_data(item, base_url, tipo):
 
         # Extrai situação
         if 'Situação:' in text:
-            item_data['Situação'] = text.replace('Situação:', '').strip()
+            item_data.situacao = text.replace('Situação:', '').strip()
 
         # Extrai cédula
         elif 'Cédula:' in text:
-            item_data['Cédula'] = text.replace('Cédula:', '').strip()
+            item_data.cedula = text.replace('Cédula:', '').strip()
 
         # Extrai localidade
         elif 'Localidade:' in text:
-            item_data['Localidade'] = text.replace('Localidade:', '').strip()
+            item_data.localidade = text.replace('Localidade:', '').strip()
 
         # Extrai contatos
         elif 'Contactos:' in text:
             contatos = text.replace('Contactos:', '').strip()
             if '-' in contatos:
                 telefone, email = contatos.split('-', 1)
-                item_data['Telefone'] = telefone.strip()
-                item_data['Email'] = email.strip()
+                item_data.telefone = telefone.strip()
+                item_data.email = email.strip()
             else:
-                item_data['Telefone'] = contatos.strip()
+                item_data.telefone = contatos.strip()
 
         # Tenta extrair email se estiver em um link
         elif element.find('a', href=lambda x: x and 'mailto:' in x):
             email_link = element.find('a', href=lambda x: x and 'mailto:' in x)
-            item_data['Email'] = email_link['href'].replace('mailto:', '').strip()
+            item_data.email = email_link['href'].replace('mailto:', '').strip()
 
         # Tenta extrair telefone se estiver em um link
         elif element.find('a', href=lambda x: x and 'tel:' in x):
             tel_link = element.find('a', href=lambda x: x and 'tel:' in x)
-            item_data['Telefone'] = tel_link['href'].replace('tel:', '').strip()
+            item_data.telefone = tel_link['href'].replace('tel:', '').strip()
 
     return item_data
 
 
+# Insere um registo da OSAE: agentes na tabela própria, sociedades de execução na tabela de sociedades
+def _inserir_osae(conn, item_data, tipo, base_url):
+    if tipo == 'sociedade_execucao':
+        inserir_sociedades(
+            conn,
+            item_data.nome,  # name
+            'N/D',  # conselho_regional
+            'N/D',  # morada
+            item_data.situacao,  # estado
+            item_data.telefone,
+            item_data.email,
+            base_url,  # site
+            'sociedade_execucao',  # tipo
+            item_data.localidade,
+            'N/D',  # registo
+            'N/D',  # codigo_postal
+            'N/D',  # data_constituicao
+            'N/D'  # fax
+        )
+    else:
+        inserir_agente_execucao(
+            conn,
+            item_data.nome,
+            item_data.situacao,
+            item_data.cedula,
+            item_data.localidade,
+            item_data.telefone,
+            item_data.email,
+            item_data.tipo
+        )
+
+
 def scrape_osae(driver=None, conn=None):
     """
     Função para coletar dados dos Agentes de Execução do site OSAE.
@@ -1948,14 +3286,12 @@ def scrape_osae(driver=None, conn=None):
         # Acessa a página
         print("🌐 Acessando site OSAE...")
         driver.get(base_url)
-        time.sleep(5)  # Aguarda carregamento inicial
 
         # Espera a página carregar completamente
         print("⏳ Aguardando carregamento da página...")
         WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "form, .search-form, #ContentPlaceHolder1_RadioPesquisa2"))
         )
-        time.sleep(3)
 
         # Seleciona Agentes de Execução
         print("📋 Selecionando Agentes de Execução...")
@@ -1965,7 +3301,7 @@ def scrape_osae(driver=None, conn=None):
             )
             if not radio.is_selected():
                 driver.execute_script("arguments[0].click();", radio)
-                time.sleep(2)
+                esperar_selecionado(driver, By.ID, "ContentPlaceHolder1_RadioPesquisa2")
                 logging.info("Opção 'Agentes de Execução' selecionada com sucesso!")
                 print("✅ Opção 'Agentes de Execução' selecionada com sucesso!")
         except Exception as e:
@@ -1975,7 +3311,7 @@ def scrape_osae(driver=None, conn=None):
                 radio = driver.find_element(By.CSS_SELECTOR, "input[type='radio'][value='2']")
                 if not radio.is_selected():
                     driver.execute_script("arguments[0].click();", radio)
-                    time.sleep(2)
+                    esperar_selecionado(driver, By.CSS_SELECTOR, "input[type='radio'][value='2']")
             except Exception as e2:
                 logging.error(f"Método alternativo falhou: {e2}")
                 print(f"❌ Método alternativo falhou: {e2}")
@@ -1987,7 +3323,7 @@ def scrape_osae(driver=None, conn=None):
             checkbox = driver.find_element(By.CSS_SELECTOR, "input[type='checkbox'][id*='cb2']")
             if not checkbox.is_selected():
                 driver.execute_script("arguments[0].click();", checkbox)
-                time.sleep(2)
+                esperar_selecionado(driver, By.CSS_SELECTOR, "input[type='checkbox'][id*='cb2']")
             logging.info("Opção 'Ativos' marcada com sucesso!")
             print("✅ Opção 'Ativos' marcada com sucesso!")
         except Exception as e:
@@ -2001,7 +3337,6 @@ def scrape_osae(driver=None, conn=None):
                 EC.presence_of_element_located((By.ID, "ContentPlaceHolder1_bt1"))
             )
             driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(5)
             logging.info("Pesquisa iniciada com sucesso!")
             print("✅ Pesquisa iniciada com sucesso!")
         except Exception as e:
@@ -2010,7 +3345,6 @@ def scrape_osae(driver=None, conn=None):
             try:
                 search_button = driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value*='Pesquisar']")
                 driver.execute_script("arguments[0].click();", search_button)
-                time.sleep(5)
             except Exception as e2:
                 logging.error(f"Método alternativo falhou: {e2}")
                 print(f"❌ Método alternativo falhou: {e2}")
@@ -2018,10 +3352,14 @@ def scrape_osae(driver=None, conn=None):
 
         # Aguarda os resultados
         print("⏳ Aguardando resultados...")
-        time.sleep(5)
+        try:
+            esperar_resultados_estaveis(driver, "div.solicitador", antigo=search_button)
+        except TimeoutException:
+            logging.warning(f"Resultados não apareceram a tempo em {base_url}")
 
         # Extrai os dados da página atual (única página)
         html = driver.page_source
+        arquivar_html(driver.current_url, html)
         soup = BeautifulSoup(html, 'lxml')
         items = soup.select("div.solicitador")
 
@@ -2029,31 +3367,22 @@ def scrape_osae(driver=None, conn=None):
             print("Nenhum item encontrado na página.")
         else:
             print(f"Encontrados {len(items)} itens na página.")
-            all_data = []
+            all_data = SaidaColetor("dados_agentes_execucao")
+            completa = True
             for item in items:
                 try:
                     item_data = extract_osae_data(item, base_url, 'agente_execucao')
-                    if conn and conn.is_connected():
-                        inserir_agente_execucao(
-                            conn,
-                            item_data.get('Nome', 'N/D'),
-                            item_data.get('Situação', 'N/D'),
-                            item_data.get('Cédula', 'N/D'),
-                            item_data.get('Localidade', 'N/D'),
-                            item_data.get('Telefone', 'N/D'),
-                            item_data.get('Email', 'N/D'),
-                            item_data.get('Tipo', 'N/D')
-                        )
+                    if conexao_ativa(conn):
+                        _inserir_osae(conn, item_data, 'agente_execucao', base_url)
                     all_data.append(item_data)
-                    print(f"✅ Agente de Execução {item_data['Nome']} processado com sucesso!")
+                    print(f"✅ Agente de Execução {item_data.nome} processado com sucesso!")
                 except Exception as e:
                     logging.error(f"Erro ao processar agente de execução: {e}")
                     print(f"❌ Erro ao processar agente de execução: {e}")
-            if all_data:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"dados_agentes_execucao_{timestamp}.csv"
-                save_to_csv(all_data, filename)
-                print(f"✅ Dados salvos em CSV: {filename}")
+                    completa = False
+            if completa:
+                listagem_completa()
+            all_data.fechar()
             print(f"✅ Total de agentes de execução coletados: {len(all_data)}")
             return all_data
 
@@ -2075,19 +3404,17 @@ def scrape_osae_sociedades(driver=None, conn=None):
     logging.info("Iniciando scraping de sociedades de execução...")
     print("🔎 Iniciando scraping de sociedades de execução...")
     base_url = "https://osae.pt/pt/pesquisas/1/1/2"
-    all_data = []
+    all_data = SaidaColetor("dados_sociedades_execucao")
     try:
         # Acessa a página
         print("🌐 Acessando site OSAE (Sociedades)...")
         driver.get(base_url)
-        time.sleep(5)
 
         # Espera a página carregar completamente
         print("⏳ Aguardando carregamento da página...")
         WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "form, .search-form, #ContentPlaceHolder1_RadioPesquisa3"))
         )
-        time.sleep(3)
 
         # Seleciona Sociedades de Execução
         print("📋 Selecionando Sociedades de Execução...")
@@ -2097,7 +3424,7 @@ def scrape_osae_sociedades(driver=None, conn=None):
             )
             if not radio.is_selected():
                 driver.execute_script("arguments[0].click();", radio)
-                time.sleep(2)
+                esperar_selecionado(driver, By.ID, "ContentPlaceHolder1_RadioPesquisa3")
                 logging.info("Opção 'Sociedades de Execução' selecionada com sucesso!")
                 print("✅ Opção 'Sociedades de Execução' selecionada com sucesso!")
         except Exception as e:
@@ -2107,7 +3434,7 @@ def scrape_osae_sociedades(driver=None, conn=None):
                 radio = driver.find_element(By.CSS_SELECTOR, "input[type='radio'][value='3']")
                 if not radio.is_selected():
                     driver.execute_script("arguments[0].click();", radio)
-                    time.sleep(2)
+                    esperar_selecionado(driver, By.CSS_SELECTOR, "input[type='radio'][value='3']")
             except Exception as e2:
                 logging.error(f"Método alternativo falhou: {e2}")
                 print(f"❌ Método alternativo falhou: {e2}")
@@ -2119,7 +3446,7 @@ def scrape_osae_sociedades(driver=None, conn=None):
             checkbox = driver.find_element(By.CSS_SELECTOR, "input[type='checkbox'][id*='cb2']")
             if not checkbox.is_selected():
                 driver.execute_script("arguments[0].click();", checkbox)
-                time.sleep(2)
+                esperar_selecionado(driver, By.CSS_SELECTOR, "input[type='checkbox'][id*='cb2']")
             logging.info("Opção 'Ativos' marcada com sucesso!")
             print("✅ Opção 'Ativos' marcada com sucesso!")
         except Exception as e:
@@ -2133,7 +3460,6 @@ def scrape_osae_sociedades(driver=None, conn=None):
                 EC.presence_of_element_located((By.ID, "ContentPlaceHolder1_bt1"))
             )
             driver.execute_script("arguments[0].click();", search_button)
-            time.sleep(5)
             logging.info("Pesquisa iniciada com sucesso!")
             print("✅ Pesquisa iniciada com sucesso!")
         except Exception as e:
@@ -2142,7 +3468,6 @@ def scrape_osae_sociedades(driver=None, conn=None):
             try:
                 search_button = driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value*='Pesquisar']")
                 driver.execute_script("arguments[0].click();", search_button)
-                time.sleep(5)
             except Exception as e2:
                 logging.error(f"Método alternativo falhou: {e2}")
                 print(f"❌ Método alternativo falhou: {e2}")
@@ -2150,10 +3475,14 @@ def scrape_osae_sociedades(driver=None, conn=None):
 
         # Aguarda os resultados
         print("⏳ Aguardando resultados...")
-        time.sleep(5)
+        try:
+            esperar_resultados_estaveis(driver, "div.solicitador", antigo=search_button)
+        except TimeoutException:
+            logging.warning(f"Resultados não apareceram a tempo em {base_url}")
 
         # Extrai os dados da página atual (única página)
         html = driver.page_source
+        arquivar_html(driver.current_url, html)
         soup = BeautifulSoup(html, 'lxml')
         items = soup.select("div.solicitador")
 
@@ -2161,36 +3490,21 @@ def scrape_osae_sociedades(driver=None, conn=None):
             print("Nenhum item encontrado na página.")
         else:
             print(f"Encontrados {len(items)} itens na página.")
+            completa = True
             for item in items:
                 try:
                     item_data = extract_osae_data(item, base_url, 'sociedade_execucao')
-                    if conn and conn.is_connected():
-                        inserir_sociedades(
-                            conn,
-                            item_data.get('Nome', 'N/D'),  # name
-                            'N/D',  # conselho_regional
-                            'N/D',  # morada
-                            item_data.get('Situação', 'N/D'),  # estado
-                            item_data.get('Telefone', 'N/D'),
-                            item_data.get('Email', 'N/D'),
-                            base_url,  # site
-                            'sociedade_execucao',  # tipo
-                            item_data.get('Localidade', 'N/D'),
-                            'N/D',  # registo
-                            'N/D',  # codigo_postal
-                            'N/D',  # data_constituicao
-                            'N/D'  # fax
-                        )
+                    if conexao_ativa(conn):
+                        _inserir_osae(conn, item_data, 'sociedade_execucao', base_url)
                     all_data.append(item_data)
-                    print(f"✅ Sociedade de Execução {item_data['Nome']} processada com sucesso!")
+                    print(f"✅ Sociedade de Execução {item_data.nome} processada com sucesso!")
                 except Exception as e:
                     logging.error(f"Erro ao processar sociedade de execução: {e}")
                     print(f"❌ Erro ao processar sociedade de execução: {e}")
-            if all_data:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"dados_sociedades_execucao_{timestamp}.csv"
-                save_to_csv(all_data, filename)
-                print(f"✅ Dados salvos em CSV: {filename}")
+                    completa = False
+            if completa:
+                listagem_completa()
+            all_data.fechar()
             print(f"✅ Total de sociedades de execução coletadas: {len(all_data)}")
         return all_data
     except Exception as e:
@@ -2208,14 +3522,18 @@ def coletar_advogados_angola(driver, conn):
     logging.info("Iniciando scraping de advogados de Angola...")
     print("🔎 Iniciando scraping de advogados de Angola...")
     base_url = "http://www.oaang.org/content/listagem-advogados-letra"
-    all_data = []
+    all_data = SaidaColetor("dados_advogados_angola", COLUNAS_ANGOLA)
 
     letras = ["a"] + [chr(i) for i in range(ord('b'), ord('z') + 1)]
+    completa = True
     for idx, letra in enumerate(letras):
         if letra == "a":
             current_url = base_url
         else:
             current_url = f"{base_url}-{letra}"
+        if paragem_pedida():
+            completa = False
+            break
         print(f"Acessando página: {current_url}")
         try:
             driver.get(current_url)
@@ -2224,12 +3542,13 @@ def coletar_advogados_angola(driver, conn):
             )
             if check_captcha(driver):
                 driver.refresh()
-                time.sleep(random.uniform(2, 4))
+                pausar(2, 4)
 
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(random.uniform(2, 4))
+            pausar(2, 4)
 
             html = driver.page_source
+            arquivar_html(driver.current_url, html)
             soup = BeautifulSoup(html, 'lxml')
             rows = soup.select('table tr')
 
@@ -2249,7 +3568,7 @@ def coletar_advogados_angola(driver, conn):
                     }
                     all_data.append(advogado_data)
 
-                    if conn:
+                    if conexao_ativa(conn):
                         inserir_advogado(
                             conn,
                             nome=nome,
@@ -2263,18 +3582,17 @@ def coletar_advogados_angola(driver, conn):
                         )
 
             print(f"✅ Dados coletados para letra {letra.upper()}")
-            time.sleep(random.uniform(2, 4))
+            pausar(2, 4)
 
         except Exception as e:
             logging.error(f"Erro ao processar letra {letra.upper()}: {str(e)}")
             print(f"❌ Erro ao processar letra {letra.upper()}: {str(e)}")
+            completa = False
             continue
 
-    if all_data:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"dados_advogados_angola_{timestamp}.csv"
-        save_to_csv(all_data, filename)
-        print(f"✅ Dados salvos em CSV: {filename}")
+    if completa:
+        listagem_completa()
+    all_data.fechar()
     print(f"✅ Total de advogados coletados: {len(all_data)}")
     return all_data
 
@@ -2284,21 +3602,23 @@ def coletar_atlas_cplp(driver, conn):
     logging.info("Iniciando scraping do Atlas CPLP...")
     print("🔎 Iniciando scraping do Atlas CPLP...")
     base_url = "https://www.atlascplp.csm.org.pt/"
-    all_data = []
+    all_data = SaidaColetor("atlas_cplp", COLUNAS_ATLAS)
 
     driver.get(base_url)
+    completa = True
     try:
         WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.ID, "navbar"))
         )
         if check_captcha(driver):
             driver.refresh()
-            time.sleep(random.uniform(2, 4))
+            pausar(2, 4)
 
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(random.uniform(2, 4))
+        pausar(2, 4)
 
         html = driver.page_source
+        arquivar_html(driver.current_url, html)
         soup = BeautifulSoup(html, 'lxml')
 
         countries = soup.select("ol.flags a")
@@ -2317,7 +3637,7 @@ def coletar_atlas_cplp(driver, conn):
                     'Tipo': 'atlas_cplp_country',
                     'Extra': f"Flag: {flag_src}"
                 }
-                if conn and conn.is_connected():
+                if conexao_ativa(conn):
                     inserir_advogado(conn, country_name, 'N/D', 'N/D', href, 'N/D', 'N/D', base_url,
                                      'atlas_cplp_country', 'N/D', country_data['Telefone'])  # Pass Telefone here
                 all_data.append(country_data)
@@ -2326,6 +3646,7 @@ def coletar_atlas_cplp(driver, conn):
             except Exception as e:
                 logging.error(f"Erro ao processar país: {e}")
                 print(f"Erro ao processar país: {e}")
+                completa = False
 
         topics = soup.select("a.home-subjects")
         for topic in topics:
@@ -2343,7 +3664,7 @@ def coletar_atlas_cplp(driver, conn):
                     'Tipo': 'atlas_cplp_topic',
                     'Extra': f"Data-ID: {data_id}, Icon: {icon_class}"
                 }
-                if conn and conn.is_connected():
+                if conexao_ativa(conn):
                     inserir_advogado(conn, title, 'N/D', 'N/D', 'N/D', 'N/D', 'N/D', base_url,
                                      'atlas_cplp_topic', 'N/D', topic_data['Telefone'])  # Pass Telefone here
                 all_data.append(topic_data)
@@ -2352,6 +3673,7 @@ def coletar_atlas_cplp(driver, conn):
             except Exception as e:
                 logging.error(f"Erro ao processar tema judicial: {e}")
                 print(f"Erro ao processar tema judicial: {e}")
+                completa = False
 
         internal_links = soup.select("#home-page-interns a")
         for link in internal_links:
@@ -2367,7 +3689,7 @@ def coletar_atlas_cplp(driver, conn):
                     'Site': base_url,
                     'Tipo': 'atlas_cplp_internal_link'
                 }
-                if conn and conn.is_connected():
+                if conexao_ativa(conn):
                     inserir_advogado(conn, link_text, 'N/D', 'N/D', href, 'N/D', 'N/D', base_url,
                                      'atlas_cplp_internal_link', 'N/D',
                                      internal_link_data['Telefone'])  # Pass Telefone here
@@ -2377,6 +3699,7 @@ def coletar_atlas_cplp(driver, conn):
             except Exception as e:
                 logging.error(f"Erro ao processar link interno: {e}")
                 print(f"Erro ao processar link interno: {e}")
+                completa = False
 
         footer = soup.find("footer")
         footer_links = footer.find_all("a") if footer else []
@@ -2393,7 +3716,7 @@ def coletar_atlas_cplp(driver, conn):
                     'Site': base_url,
                     'Tipo': 'atlas_cplp_footer_link'
                 }
-                if conn and conn.is_connected():
+                if conexao_ativa(conn):
                     inserir_advogado(conn, alt_text, 'N/D', 'N/D', href, 'N/D', 'N/D', base_url,
                                      'atlas_cplp_footer_link', 'N/D',
                                      footer_link_data['Telefone'])  # Pass Telefone here
@@ -2403,42 +3726,38 @@ def coletar_atlas_cplp(driver, conn):
             except Exception as e:
                 logging.error(f"Erro ao processar link do footer: {e}")
                 print(f"Erro ao processar link do footer: {e}")
+                completa = False
 
     except Exception as e:
         logging.error(f"Erro ao carregar dados do Atlas CPLP: {e}")
         print(f"Erro ao carregar dados do Atlas CPLP: {e}")
+        completa = False
         with open(f"error_page_atlas_cplp.html", 'w', encoding='utf-8') as f:
             f.write(driver.page_source)
 
-    if all_data:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        save_to_csv(all_data, f"atlas_cplp_{timestamp}.csv")
+    if completa:
+        listagem_completa()
+    all_data.fechar()
 
     logging.info(f"Total de itens do Atlas CPLP coletados: {len(all_data)}")
     print(f"✅ Total de itens do Atlas CPLP coletados: {len(all_data)}")
     return all_data
 
 
-def inserir_tribunal(conexao, nome, morada, telefone, email):
+def inserir_tribunal(conexao, nome, morada, telefone, email, upsert=None):
     try:
-        cursor = conexao.cursor()
-        query = """
-            INSERT INTO tribunais (nome, morada, telefone, email)
-            VALUES (%s, %s, %s, %s)
-        """
+        upsert = MODO_UPSERT if upsert is None else upsert
+        query = _query_insercao('tribunais', upsert)
         dados = (
-            str(nome or 'N/D'),
+            _valor_chave(nome),
             str(morada or 'N/D'),
             str(telefone or 'N/D'),
             str(email or 'N/D')
         )
-        cursor.execute(query, dados)
-        conexao.commit()
-        cursor.close()
-        print(f"✅ Tribunal {nome} inserido na tabela tribunais!")
+        _enviar_linha(conexao, 'tribunais', query, dados)
     except Exception as e:
         print(f"❌ Erro ao inserir tribunal {nome}: {e}")
-        conexao.rollback()
+        _desfazer_insercao(conexao)
 
 
 def marcar_todos_checkboxes(driver, timeout=20):
@@ -2458,91 +3777,517 @@ def marcar_todos_checkboxes(driver, timeout=20):
                 lambda d: d.find_elements(By.CSS_SELECTOR, 'input[type="checkbox"][id*="chkCategory"]')[i].is_selected()
             )
             print(f"Checkbox {i + 1} marcado. Aguardando 10 segundos para o recarregamento...")
-            time.sleep(10)
+            pausar(10)
         else:
             print(f"Checkbox {i + 1} já estava marcado.")
 
 
-# Função principal
-def main():
-    logging.info("Iniciando o script de scraping...")
-    print(f"🏁 Iniciando o script de scraping às {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}...")
-    conn = conectar_mysql()
-    todos_dados = []
-
-    funcoes_scraping = [
-         (coletar_advogados_lisboa, False),
-           (coletar_advogados_porto, False),
-           (coletar_advogados_coimbra, False),
-         (coletar_advogados_evora, False),
-          (coletar_advogados_faro, False),
-         (coletar_advogados_madeira, False),
-         (coletar_advogados_acores, False),
-         (coletar_advogados_braga, False),
-         (coletar_sociedades_lisboa, False),
-         (coletar_sociedades_porto, False),
-         (coletar_sociedades_coimbra, False),
-         (coletar_sociedades_evora, False),
-         (coletar_sociedades_faro, False),
-         (coletar_sociedades_madeira, False),
-         (coletar_sociedades_acores, False),
-         (coletar_sociedades_braga, False),
-         (coletar_estagiarios_lisboa, False),
-           (coletar_estagiarios_porto, False),
-          (coletar_estagiarios_coimbra, False),
-          (coletar_estagiarios_evora, False),
-         (coletar_estagiarios_faro, False),
-          (coletar_estagiarios_madeira, False),
-          (coletar_estagiarios_acores, False),
-          (coletar_estagiarios_braga, False),
-         (coletar_tribunais, True),
-        (coletar_julgados, True),
-         (scrape_osae, True),
-         (scrape_osae_sociedades, True),
-        (coletar_advogados_angola, True),
-         (coletar_atlas_cplp, True)
-    ]
+# Recursos de cada worker do agendador: um WebDriver e uma conexão própria por thread
+class PoolRecursos:
+    """
+    Cria de forma preguiçosa, em cada thread do agendador, um WebDriver, uma
+    conexão do pool MySQL e o respetivo escritor em lote, reutilizando-os nos
+    coletores seguintes que essa thread executar.
+    """
 
-    driver = configurar_driver()
-    if not driver:
-        print("Falha ao iniciar o WebDriver. Encerrando...")
-        return
+    def __init__(self, headless=False):
+        self.headless = headless
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._criados = []
+
+    def obter(self):
+        driver = getattr(self._local, 'driver', None)
+        if driver is not None and not _driver_vivo(driver):
+            logging.warning("WebDriver deixou de responder; a criar um novo.")
+            print("⚠️ WebDriver deixou de responder; a criar um novo.")
+            self._descartar_driver(driver)
+            driver = None
+        if driver is None:
+            driver = configurar_driver(headless=self.headless)
+            if not driver:
+                raise WebDriverException("Falha ao iniciar o WebDriver")
+            self._local.driver = driver
+            with self._lock:
+                self._criados.append(driver)
+        if not hasattr(self._local, 'escritor'):
+            conexao = conectar_mysql()
+            self._local.escritor = EscritorEmLote(conexao) if conexao else None
+            with self._lock:
+                self._criados.append(self._local.escritor)
+        return driver, self._local.escritor
+
+    def _descartar_driver(self, driver):
+        with self._lock:
+            if driver in self._criados:
+                self._criados.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
 
-    try:
-        for func, single_page in funcoes_scraping:
+    def fechar(self):
+        with self._lock:
+            criados, self._criados = self._criados, []
+        for recurso in criados:
             try:
-                logging.info(f"Iniciando: {func.__name__}")
-                print(f"\n{'=' * 50}")
-                print(f"🏁 Iniciando: {func.__name__}")
-                dados = func(driver, conn)
+                if isinstance(recurso, EscritorEmLote):
+                    recurso.fechar()
+                    recurso.conexao.close()
+                else:
+                    recurso.quit()
+            except Exception as e:
+                logging.error(f"Erro ao libertar recurso do agendador: {e}")
+        logging.info("Recursos do agendador libertados.")
+
+
+def _driver_vivo(driver):
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
+# Executa um coletor numa thread do agendador, com o driver e a conexão dessa thread
+def _executar_coletor(func, recursos):
+    if CHECKPOINTS:
+        if MODO_RETOMAR:
+            estado = CHECKPOINTS.obter(func.__name__, CHECKPOINT_COLETOR)
+            if estado and estado['concluido']:
+                logging.info(f"{func.__name__} já concluído numa execução anterior; a saltar")
+                print(f"⏭️ {func.__name__} já concluído numa execução anterior; a saltar")
+                return []
+        else:
+            CHECKPOINTS.reiniciar(func.__name__)
+
+    if paragem_pedida():
+        return []
+    driver, conn = recursos.obter()
+    logging.info(f"Iniciando: {func.__name__}")
+    print(f"\n{'=' * 50}")
+    print(f"🏁 Iniciando: {func.__name__}")
+    inicio = time.monotonic()
+    _contexto.coletor = func.__name__
+    _contexto.saidas = []
+    # Só o coletor sabe se chegou ao fim da listagem sem erros; até o dizer, a listagem conta como incompleta
+    _contexto.listagem_incompleta = True
+    try:
+        dados = func(driver, conn)
+        if conn:
+            conn.flush()
+        completa = not _contexto.listagem_incompleta
+        if DETETOR_ALTERACOES:
+            # Com --resume parte das linhas foi vista na execução interrompida; não se detetam removidos
+            DETETOR_ALTERACOES.concluir_coletor(
+                func.__name__, detetar_removidos=bool(dados) and not MODO_RETOMAR and completa)
+        if CHECKPOINTS and completa:
+            CHECKPOINTS.concluir(func.__name__, CHECKPOINT_COLETOR)
+        resumo_cache = CACHE_PAGINAS.resumo(func.__name__) if CACHE_PAGINAS else None
+        if resumo_cache:
+            logging.info(f"Cache de páginas — {resumo_cache}")
+            print(f"📑 Cache de páginas — {resumo_cache}")
+        return dados
+    finally:
+        _contexto.coletor = None
+        # Fecha os CSV que o coletor deixou abertos (p.ex. ao sair por exceção)
+        for saida in _contexto.saidas:
+            saida.fechar()
+        _contexto.saidas = None
+        if conn:
+            conn.flush()
+        if DETETOR_ALTERACOES:
+            DETETOR_ALTERACOES.confirmar()
+        logging.info(f"{func.__name__} terminou em {time.monotonic() - inicio:.0f}s")
+        resumo = obter_ritmo(func.__name__).resumo()
+        logging.info(f"Ritmo — {resumo}")
+        print(f"⏱️ Ritmo — {resumo}")
+
+
+# Handler do SIGTERM: marca a paragem para os coletores e interrompe o agendador na thread principal
+def _pedir_paragem(signum, frame):
+    PARAGEM.set()
+    logging.warning(f"Sinal {signum} recebido; a parar a execução")
+    print(f"🛑 Sinal {signum} recebido; a parar a execução...")
+    sys.exit(1)
+
+
+# Agendador: corre os coletores independentes em paralelo, respeitando o limite de cada site
+def executar_coletores(tarefas, workers, headless=False, limites_por_site=None):
+    """
+    Executa os coletores num pool de `workers` threads, cada uma com o seu
+    WebDriver e a sua conexão. Um coletor só arranca quando o seu site tem uma
+    vaga livre (LIMITES_POR_SITE), para não sobrecarregar o portal.oa.pt.
+
+    Args:
+        tarefas: Lista de (função coletora, página única, site)
+        workers: Número máximo de WebDrivers em simultâneo
+        headless: Inicia os WebDrivers sem janela
+        limites_por_site: Coletores simultâneos permitidos por site
+
+    Returns:
+        int: Total de registos devolvidos por todos os coletores
+    """
+    limites = dict(LIMITES_POR_SITE, **(limites_por_site or {}))
+    pendentes = list(tarefas)
+    em_curso = {}  # future -> (func, site)
+    por_site = {}
+    total_registos = 0
+    recursos = PoolRecursos(headless=headless)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="coletor")
+    try:
+        while pendentes or em_curso:
+            # Arranca as tarefas cujo site ainda tem vaga, pela ordem da lista
+            for tarefa in list(pendentes):
+                if len(em_curso) >= workers:
+                    break
+                func, single_page, site = tarefa
+                if por_site.get(site, 0) >= limites.get(site, LIMITE_PADRAO_POR_SITE):
+                    continue
+                pendentes.remove(tarefa)
+                por_site[site] = por_site.get(site, 0) + 1
+                em_curso[executor.submit(_executar_coletor, func, recursos)] = (func, site)
+
+            # Acorda periodicamente para a thread principal poder atender um SIGTERM
+            concluidas, _ = wait(em_curso, timeout=1, return_when=FIRST_COMPLETED)
+            for future in concluidas:
+                func, site = em_curso.pop(future)
+                por_site[site] -= 1
+                try:
+                    dados = future.result()
+                except Exception as e:
+                    logging.error(f"Erro em {func.__name__}: {str(e)}")
+                    print(f"❌ Erro em {func.__name__}: {str(e)}")
+                    continue
 
                 if dados:
                     logging.info(f"{func.__name__} completado com {len(dados)} registros")
                     print(f"✅ {func.__name__} completado com {len(dados)} registros")
-                    todos_dados.extend(dados)
+                    total_registos += len(dados)
                 else:
                     logging.warning(f"{func.__name__} retornou 0 registros")
                     print(f"⚠️ {func.__name__} retornou 0 registros")
+    except BaseException:
+        # SIGTERM (SystemExit) ou Ctrl+C: não se espera que os coletores em curso acabem as listagens
+        PARAGEM.set()
+        raise
+    finally:
+        if paragem_pedida():
+            logging.warning("Paragem pedida: a cancelar os coletores pendentes e a gravar os buffers")
+            print("🛑 Paragem pedida: a cancelar os coletores pendentes e a gravar os buffers...")
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            executor.shutdown(wait=True)
+        # Grava explicitamente os escritores em lote antes de sair; os coletores em curso param na próxima página
+        recursos.fechar()
 
-            except Exception as e:
-                logging.error(f"Erro em {func.__name__}: {str(e)}")
-                print(f"❌ Erro em {func.__name__}: {str(e)}")
+    return total_registos
+
+
+# Reinterpretação offline: reconstrói a base de dados a partir de páginas de resultados guardadas
+
+TIPOS_REPARSE = ('advogado', 'sociedade', 'estagiario', 'agente_execucao', 'sociedade_execucao')
+
+
+# Deduz o tipo de registo de uma página guardada a partir do nome do coletor, do URL ou do nome do ficheiro
+# Devolve None para os coletores cuja extração não passa por extract_item_data nem extract_osae_data
+def _tipo_reparse(*nomes):
+    nome = ' '.join(n for n in nomes if n).lower()
+    if 'angola' in nome or 'oaang' in nome:
+        return None
+    if 'osae' in nome:
+        return 'sociedade_execucao' if 'sociedades' in nome or nome.rstrip('/').endswith('/2') \
+            else 'agente_execucao'
+    if 'estagiario' in nome:
+        return 'estagiario'
+    if 'sociedade' in nome:
+        return 'sociedade'
+    if 'advogado' in nome:
+        return 'advogado'
+    return None
+
+
+# Erros de leitura de uma página guardada: ficheiro ou objeto em falta, gzip/zstd corrompido, HTML que não é
+# UTF-8 ou objeto em zstd sem o zstandard instalado
+ERROS_LEITURA_REPARSE = (OSError, ValueError, RuntimeError) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+# Trabalho de um processo do reparse: lê uma página guardada e extrai os seus registos
+# `origem` é ('arquivo', diretorio, hash) ou ('ficheiro', caminho); devolve (registos, erros), ou None se a
+# página não pôde ser lida (uma página ilegível não pode parar o reparse das restantes)
+def _reinterpretar_pagina(tarefa):
+    origem, tipo, url = tarefa
+    try:
+        if origem[0] == 'arquivo':
+            html = ArquivoHTML.ler_objeto(origem[1], origem[2])
+        else:
+            with open(origem[1], encoding='utf-8') as f:
+                html = f.read()
+    except ERROS_LEITURA_REPARSE as e:
+        fonte = origem[1] if origem[0] == 'ficheiro' else f"objeto {origem[2]} de {origem[1]} ({url})"
+        logging.error(f"Reparse: não foi possível ler {fonte}: {e}")
+        return None
+    soup = BeautifulSoup(html, 'lxml')
+    if tipo in ('agente_execucao', 'sociedade_execucao'):
+        items, extrator = soup.select("div.solicitador"), extract_osae_data
+    else:
+        items, extrator = soup.select(CSS_RESULTADOS_OA), extract_item_data
+    registos = []
+    erros = 0
+    for item in items:
+        try:
+            registos.append(extrator(item, url, tipo))
+        except Exception as e:
+            logging.error(f"Erro ao reinterpretar item de {url}: {e}")
+            erros += 1
+    return registos, erros
+
+
+# Lista as páginas a reinterpretar: (origem, tipo, url) de cada página do arquivo e dos ficheiros indicados
+def _tarefas_reparse(args):
+    tarefas = []
+    if args.arquivo:
+        arquivo = ArquivoHTML(args.arquivo)
+        execucao = None if args.execucao == 'todas' else (args.execucao or arquivo.ultima_execucao())
+        vistos = set()
+        for _, coletor, url, _, _, hash_conteudo in arquivo.entradas(execucao):
+            tipo = args.tipo or _tipo_reparse(coletor, url)
+            # O mesmo conteúdo obtido várias vezes dá os mesmos registos: basta reinterpretá-lo uma vez
+            if tipo is None or (hash_conteudo, tipo) in vistos:
+                continue
+            vistos.add((hash_conteudo, tipo))
+            tarefas.append((('arquivo', args.arquivo, hash_conteudo), tipo, url))
+        print(f"🗄️ Arquivo {args.arquivo}: execução {execucao or 'todas'}, {len(tarefas)} páginas distintas")
+    for caminho in args.paginas:
+        ficheiros = sorted(glob.glob(os.path.join(caminho, '*.html'))) if os.path.isdir(caminho) else [caminho]
+        for ficheiro in ficheiros:
+            tipo = args.tipo or _tipo_reparse(os.path.basename(ficheiro))
+            if tipo is None:
+                print(f"⚠️ Não foi possível deduzir o tipo de {ficheiro}; use --tipo. A ignorar.")
+                logging.warning(f"Reparse: tipo desconhecido para {ficheiro}")
                 continue
+            tarefas.append((('ficheiro', ficheiro), tipo, ficheiro))
+    return tarefas
+
+
+# Subcomando `main.py reparse`: corre os extratores sobre páginas guardadas num pool de processos e
+# grava os registos em lote, sem abrir nenhum browser
+def main_reparse(argv):
+    parser = argparse.ArgumentParser(prog="main.py reparse",
+                                     description="Reconstrói a base de dados a partir de páginas de resultados "
+                                                 "guardadas, sem aceder aos sites")
+    parser.add_argument('paginas', nargs='*',
+                        help="Ficheiros .html (p.ex. error_page_*.html) ou pastas com eles")
+    parser.add_argument('--arquivo', metavar='DIR', default=None,
+                        help="Arquivo de HTML criado com --arquivo-html")
+    parser.add_argument('--execucao', default=None,
+                        help="Execução do arquivo a reinterpretar (padrão: a mais recente; 'todas' para todas)")
+    parser.add_argument('--tipo', choices=TIPOS_REPARSE, default=None,
+                        help="Tipo de registo das páginas, quando não se deduz do coletor ou do nome do ficheiro")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processos de parse (padrão: um por core)")
+    parser.add_argument('--sem-bd', action='store_true', help="Só escreve o CSV, sem gravar na base de dados")
+    args = parser.parse_args(argv)
+    if not args.arquivo and not args.paginas:
+        parser.error("indique páginas .html ou um arquivo com --arquivo")
+
+    tarefas = _tarefas_reparse(args)
+    if not tarefas:
+        print("Nenhuma página para reinterpretar.")
+        return
+
+    escritor = None
+    if not args.sem_bd:
+        conexao = conectar_mysql()
+        if conexao:
+            escritor = EscritorEmLote(conexao, tamanho_lote=TAMANHO_LOTE_REPARSE)
+        else:
+            logging.warning("Reparse sem conexão à base de dados; só é escrito o CSV.")
+            print("⚠️ Sem conexão à base de dados; só é escrito o CSV.")
+    saida = EscritorCSV(f"reparse_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", colunas_todos_dados())
+    insercoes = {'advogado': inserir_advogado, 'sociedade': inserir_sociedades, 'estagiario': inserir_estagiario}
+
+    workers = max(1, args.workers)
+    print(f"🔁 A reinterpretar {len(tarefas)} páginas com {workers} processos...")
+    inicio = time.monotonic()
+    total = erros = saltadas = 0
+    try:
+        # O parse corre nos processos; as inserções ficam neste, num único escritor em lote
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo_log,
+                                 initargs=(FICHEIRO_LOG,)) as executor:
+            for (origem, tipo, url), resultado in zip(
+                    tarefas, executor.map(_reinterpretar_pagina, tarefas, chunksize=4)):
+                if resultado is None:
+                    print(f"⚠️ Página ilegível, a saltar: {url}")
+                    saltadas += 1
+                    continue
+                registos, erros_pagina = resultado
+                erros += erros_pagina
+                for registo in registos:
+                    if escritor:
+                        if tipo in insercoes:
+                            _inserir_item(insercoes[tipo], escritor, registo, tipo)
+                        else:
+                            _inserir_osae(escritor, registo, tipo, url)
+                    saida.escrever(registo)
+                total += len(registos)
+    finally:
+        saida.fechar()
+        if escritor:
+            escritor.fechar()
+            escritor.conexao.close()
+
+    duracao = time.monotonic() - inicio
+    resumo = (f"{len(tarefas)} páginas ({saltadas} ilegíveis saltadas), {total} registos, {erros} erros "
+              f"em {duracao:.1f}s ({len(tarefas) / max(duracao, 1e-9):.0f} páginas/s); CSV: {saida.caminho}")
+    if saltadas:
+        logging.warning(f"Reparse: {saltadas} páginas ilegíveis saltadas; os caminhos estão no log")
+    logging.info(f"Reparse concluído: {resumo}")
+    print(f"✅ Reparse concluído: {resumo}")
 
-        if todos_dados:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            save_to_csv(todos_dados, f"todos_dados_{timestamp}.csv")
-            logging.info(f"Todos os dados salvos em CSV com timestamp: {timestamp}")
-            print(f"✅ Todos os dados salvos em CSV com timestamp: {timestamp}")
 
+# Função principal
+def main():
+    global CHECKPOINTS, MODO_RETOMAR, BACKEND_FETCH, CONCORRENCIA_PAGINAS, SAIDA_TODOS, SAIDA_PARQUET, \
+        DETETOR_ALTERACOES, CACHE_PAGINAS, ARQUIVO_HTML, PROCESSOS_PARSE, \
+        PARSER_PAGINAS, PESQUISA_DIRETA_OA, PERFIL_DRIVER, CHROMEDRIVER, VERSAO_CHROMEDRIVER, MODO_OFFLINE_DRIVER
+    parser = argparse.ArgumentParser(description="Scraping de advogados, sociedades, estagiários e tribunais")
+    parser.add_argument('--workers', type=int, default=WORKERS_PADRAO,
+                        help=f"Número de WebDrivers em paralelo (padrão: {WORKERS_PADRAO})")
+    parser.add_argument('--headless', action='store_true', help="Inicia os WebDrivers sem janela")
+    parser.add_argument('--chromedriver', metavar='CAMINHO', default=CHROMEDRIVER,
+                        help="Usa este chromedriver pré-instalado, sem o resolver nem descarregar")
+    parser.add_argument('--versao-chromedriver', metavar='VERSAO', default=VERSAO_CHROMEDRIVER,
+                        help="Versão fixada do chromedriver na cache local (padrão: a que estiver na cache)")
+    parser.add_argument('--offline-driver', action='store_true', default=MODO_OFFLINE_DRIVER,
+                        help="Nunca vai à rede pelo chromedriver: usa a cache local ou o chromedriver do PATH")
+    parser.add_argument('--perfil-driver', choices=['rapido', 'completo'], default=PERFIL_DRIVER,
+                        help="'rapido': headless e sem imagens/fontes/media; 'completo': Chrome normal, com janela "
+                             f"salvo --headless (padrão: {PERFIL_DRIVER})")
+    parser.add_argument('--db-pool-size', type=int, default=None,
+                        help="Número de conexões no pool MySQL (padrão: workers + 1)")
+    parser.add_argument('--fetch', choices=['http', 'selenium'], default=BACKEND_FETCH,
+                        help=f"Backend de fetch das páginas de resultados (padrão: {BACKEND_FETCH})")
+    parser.add_argument('--concorrencia', type=int, default=CONCORRENCIA_PAGINAS,
+                        help=f"Páginas em voo por coletor com o backend HTTP; 1 desativa o pipeline "
+                             f"(padrão: {CONCORRENCIA_PAGINAS})")
+    parser.add_argument('--resume', action='store_true',
+                        help="Retoma cada coletor a partir da última página concluída")
+    parser.add_argument('--estado', default=FICHEIRO_ESTADO,
+                        help=f"Ficheiro SQLite dos checkpoints (padrão: {FICHEIRO_ESTADO})")
+    parser.add_argument('--completo', action='store_true',
+                        help="Processa todas as páginas e grava todas as linhas na base de dados, "
+                             "sem cache de páginas nem deteção de alterações")
+    parser.add_argument('--cache-paginas', action='store_true',
+                        help="Salta as páginas iguais às da execução anterior (sem parse nem gravação). Os CSV e o "
+                             "Parquet ficam só com os registos das páginas alteradas; a base de dados continua "
+                             "completa")
+    parser.add_argument('--parquet', metavar='DIR', default=None,
+                        help="Exporta também um dataset Parquet por entidade para DIR (requer pyarrow)")
+    parser.add_argument('--processos-parse', type=int, default=PROCESSOS_PARSE,
+                        help=f"Processos de parse das páginas de resultados; 0 faz o parse na thread do coletor "
+                             f"(padrão: {PROCESSOS_PARSE})")
+    parser.add_argument('--parser', choices=['lxml', 'bs4'], default=PARSER_PAGINAS,
+                        help=f"Backend do parse das listagens da OA (padrão: {PARSER_PAGINAS})")
+    parser.add_argument('--arquivo-html', metavar='DIR', default=None,
+                        help="Guarda cada página de resultados obtida, comprimida, no arquivo DIR")
+    parser.add_argument('--formulario', action='store_true',
+                        help="Pesquisa a OA pelo formulário em vez de abrir diretamente o URL dos resultados")
+    parser.add_argument('--coletores', metavar='PADRAO[,...]', default=None,
+                        help="Só executa os coletores cujo nome corresponde a um dos padrões "
+                             "(p.ex. 'coletar_advogados_*,coletar_*_braga')")
+    args = parser.parse_args()
+    workers = max(1, args.workers)
+
+    if args.fetch == 'http' and requests is None:
+        logging.warning("O pacote requests não está instalado; a usar o backend Selenium.")
+        print("⚠️ O pacote requests não está instalado; a usar o backend Selenium.")
+        args.fetch = 'selenium'
+    BACKEND_FETCH = args.fetch
+    CONCORRENCIA_PAGINAS = max(1, args.concorrencia)
+    PROCESSOS_PARSE = max(0, args.processos_parse)
+    PARSER_PAGINAS = args.parser
+    PESQUISA_DIRETA_OA = not args.formulario
+    PERFIL_DRIVER = args.perfil_driver
+    CHROMEDRIVER = args.chromedriver
+    VERSAO_CHROMEDRIVER = args.versao_chromedriver
+    MODO_OFFLINE_DRIVER = args.offline_driver
+    if args.parquet:
+        if pa is None:
+            logging.warning("O pacote pyarrow não está instalado; a exportação Parquet fica desligada.")
+            print("⚠️ O pacote pyarrow não está instalado; a exportação Parquet fica desligada.")
+        else:
+            SAIDA_PARQUET = ExportadorParquet(args.parquet)
+    if args.arquivo_html:
+        ARQUIVO_HTML = ArquivoHTML(args.arquivo_html)
+    CHECKPOINTS = ArmazemCheckpoints(args.estado)
+    if not args.completo:
+        DETETOR_ALTERACOES = DetetorAlteracoes(args.estado)
+        if args.cache_paginas:
+            CACHE_PAGINAS = CachePaginas(args.estado)
+            if args.parquet:
+                logging.warning("--cache-paginas com --parquet: o dataset só terá os registos das páginas alteradas")
+                print("⚠️ Com --cache-paginas, o Parquet (e os CSV) só têm os registos das páginas alteradas.")
+    MODO_RETOMAR = args.resume
+    if MODO_RETOMAR:
+        logging.info(f"Modo --resume: a retomar a partir de {args.estado}")
+        print(f"↪️ Modo --resume: a retomar a partir de {args.estado}")
+
+    logging.info("Iniciando o script de scraping...")
+    print(f"🏁 Iniciando o script de scraping às {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}...")
+    # Cada worker usa a sua conexão; o pool tem de ter pelo menos uma por worker
+    obter_pool(args.db_pool_size or max(DB_POOL_SIZE, workers + 1))
+    # SIGTERM pede a paragem e termina via SystemExit: o agendador não espera pelos coletores em curso e grava
+    # os buffers antes de sair
+    signal.signal(signal.SIGTERM, _pedir_paragem)
+
+    # As regiões da OA vêm do registo, pela ordem de prioridade; os restantes sites seguem depois
+    regioes = sorted(REGIOES_OA, key=lambda regiao: -regiao['prioridade'])
+    funcoes_scraping = [(COLETORES_OA[regiao['nome']], False, regiao['site']) for regiao in regioes] + [
+        (coletar_tribunais, True, 'www.citius.mj.pt'),
+        (coletar_julgados, True, 'dgpj.justica.gov.pt'),
+        (scrape_osae, True, 'osae.pt'),
+        (scrape_osae_sociedades, True, 'osae.pt'),
+        (coletar_advogados_angola, True, 'www.oaang.org'),
+        (coletar_atlas_cplp, True, 'www.atlascplp.csm.org.pt')
+    ]
+    if args.coletores:
+        padroes = [padrao.strip() for padrao in args.coletores.split(',') if padrao.strip()]
+        funcoes_scraping = [tarefa for tarefa in funcoes_scraping
+                            if any(fnmatch.fnmatch(tarefa[0].__name__, padrao) for padrao in padroes)]
+        logging.info(f"Coletores selecionados ({len(funcoes_scraping)}): {[t[0].__name__ for t in funcoes_scraping]}")
+        print(f"🎯 {len(funcoes_scraping)} coletores selecionados por --coletores")
+
+    # O CSV global é escrito em streaming pelos coletores, com a união fixa das colunas de todas as entidades
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    SAIDA_TODOS = EscritorCSV(f"todos_dados_{timestamp}.csv", colunas_todos_dados())
+    inicio = time.monotonic()
+    try:
+        total_registos = executar_coletores(funcoes_scraping, workers, headless=args.headless)
     finally:
-        if driver:
-            driver.quit()
-        if conn and conn.is_connected():
-            conn.close()
-            logging.info("Conexão com o banco de dados fechada.")
-            print("Conexão com o banco de dados fechada.")
+        fechar_pool_parse()
+        SAIDA_TODOS.fechar()
+        if DETETOR_ALTERACOES:
+            DETETOR_ALTERACOES.fechar()
+        if SAIDA_PARQUET:
+            SAIDA_PARQUET.flush()
+    if ARQUIVO_HTML:
+        logging.info(f"Arquivo HTML: {ARQUIVO_HTML.resumo()}")
+        print(f"🗄️ Arquivo HTML: {ARQUIVO_HTML.resumo()}")
+    logging.info(f"Execução completa em {time.monotonic() - inicio:.0f}s com {workers} workers")
+    print(f"⏱️ Execução completa em {time.monotonic() - inicio:.0f}s com {workers} workers")
+    tempo_em_pausa = sum(ritmo.tempo_em_pausa for ritmo in _ritmos.values())
+    logging.info(f"Tempo total em pausa (somado entre coletores): {tempo_em_pausa:.0f}s")
+    print(f"💤 Tempo total em pausa (somado entre coletores): {tempo_em_pausa:.0f}s")
+
+    logging.info(f"Todos os dados salvos em CSV com timestamp: {timestamp} ({total_registos} registos)")
+    print(f"✅ Todos os dados salvos em CSV com timestamp: {timestamp} ({total_registos} registos)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    configurar_logging()
+    if sys.argv[1:2] == ['reparse']:
+        main_reparse(sys.argv[2:])
+    else:
+        main()